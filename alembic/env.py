@@ -3,21 +3,21 @@ Alembic Environment Configuration
 Supports both sync and async migrations for SQLAlchemy 2.0
 """
 import asyncio
+import os
+import re
+from typing import Optional
 from logging.config import fileConfig
 
-from sqlalchemy import pool, engine_from_config
+from sqlalchemy import pool, engine_from_config, text
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
 
-# Import app configuration and models
+# Import app configuration (models are loaded lazily, see _load_metadata)
 from app.core.config import get_settings
 from app.db.base import Base
 
-# Import all models to register them with Base.metadata
-from app.models import User, Email, AuditLog, RAGQuery, VectorRecord  # noqa: F401
-
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -25,9 +25,6 @@ config = context.config
 # Get database URL from application settings
 settings = get_settings()
 
-# Add your model's MetaData object here for 'autogenerate' support
-target_metadata = Base.metadata
-
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -39,6 +36,26 @@ if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
 
+def _is_autogenerate() -> bool:
+    """
+    Type/server-default comparison only matters when diffing for
+    `alembic revision --autogenerate`; on upgrade/downgrade it just adds
+    catalog introspection queries. Set ALEMBIC_AUTOGEN=1 to force it on.
+    """
+    if os.getenv("ALEMBIC_AUTOGEN"):
+        return True
+    return bool(getattr(config.cmd_opts, "autogenerate", False))
+
+
+def _load_metadata():
+    """
+    Import all models to register them with Base.metadata.
+    Deferred until a migration actually runs so CLI startup stays cheap.
+    """
+    from app.models import User, Email, AuditLog, RAGQuery, VectorRecord  # noqa: F401
+    return Base.metadata
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -53,24 +70,42 @@ def run_migrations_offline() -> None:
     url = settings.get_database_url(async_driver=False)
     context.configure(
         url=url,
-        target_metadata=target_metadata,
+        target_metadata=_load_metadata(),
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
-        compare_type=True,
-        compare_server_default=True,
+        compare_type=_is_autogenerate(),
+        compare_server_default=_is_autogenerate(),
     )
 
     with context.begin_transaction():
         context.run_migrations()
 
 
+def _get_tenant_schema() -> Optional[str]:
+    """
+    Read the optional tenant schema passed as `alembic -x schema=<name> ...`.
+    Used by alembic/run_multitenant_migrations.py for schema-per-tenant setups.
+    """
+    schema = context.get_x_argument(as_dictionary=True).get("schema")
+    if schema and not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]{0,62}", schema):
+        raise ValueError(f"Invalid tenant schema name: {schema!r}")
+    return schema
+
+
 def do_run_migrations(connection: Connection) -> None:
     """Run migrations with the given connection."""
+    schema = _get_tenant_schema()
+    if schema:
+        # Point unqualified DDL (and alembic_version) at the tenant schema
+        connection.execute(text(f'SET search_path TO "{schema}"'))
+        connection.commit()
+        connection.dialect.default_schema_name = schema
+    
     context.configure(
         connection=connection,
-        target_metadata=target_metadata,
-        compare_type=True,
-        compare_server_default=True,
+        target_metadata=_load_metadata(),
+        compare_type=_is_autogenerate(),
+        compare_server_default=_is_autogenerate(),
     )
 
     with context.begin_transaction():
@@ -87,10 +122,14 @@ def run_migrations_online() -> None:
     configuration = config.get_section(config.config_ini_section, {})
     configuration["sqlalchemy.url"] = settings.get_database_url(async_driver=False)
     
+    # Single pooled connection, reused across every op.* call and revision
     connectable = engine_from_config(
         configuration,
         prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
+        poolclass=pool.QueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_pre_ping=True,
     )
 
     with connectable.connect() as connection:
@@ -0,0 +1,134 @@
+"""
+Multi-tenant Alembic Runner
+Upgrades many tenant schemas to head in parallel
+
+InboxMind isolates tenants by org_id/user_id columns in a single schema, so
+a plain `alembic upgrade head` is enough for the default deployment. This
+runner is for schema-per-tenant deployments, where upgrading tenants one by
+one is O(tenants) sequential.
+
+Usage:
+    python alembic/run_multitenant_migrations.py tenant_a tenant_b
+    python alembic/run_multitenant_migrations.py --all --workers 6
+"""
+import argparse
+import logging
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.core.config import get_settings  # noqa: E402
+
+logger = logging.getLogger("alembic.multitenant")
+
+SYSTEM_SCHEMAS = ("public", "information_schema")
+BATCH_SIZE = 50
+
+
+def _alembic_config(schema: Optional[str] = None) -> Config:
+    """Build an Alembic Config, passing the tenant schema as `-x schema=...`"""
+    cfg = Config(str(ROOT_DIR / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT_DIR / "alembic"))
+    cfg.cmd_opts = argparse.Namespace(x=[f"schema={schema}"] if schema else [])
+    return cfg
+
+
+def _list_tenant_schemas(engine) -> List[str]:
+    """List all non-system schemas in the database"""
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT schema_name FROM information_schema.schemata "
+            "WHERE schema_name NOT LIKE 'pg_%'"
+        ))
+        return [row[0] for row in rows if row[0] not in SYSTEM_SCHEMAS]
+
+
+def _pending_schemas(engine, schemas: List[str], head: str) -> List[str]:
+    """Filter out schemas that are already at head"""
+    pending = []
+    with engine.connect() as conn:
+        for schema in schemas:
+            context = MigrationContext.configure(
+                conn, opts={"version_table_schema": schema}
+            )
+            if context.get_current_revision() != head:
+                pending.append(schema)
+    return pending
+
+
+def _upgrade_schema(schema: str) -> Tuple[str, Optional[str]]:
+    """Worker: upgrade a single tenant schema. Returns (schema, error)."""
+    try:
+        command.upgrade(_alembic_config(schema), "head")
+        return schema, None
+    except Exception as e:
+        return schema, f"{type(e).__name__}: {e}"
+
+
+def _run_batch(schemas: List[str], workers: int) -> List[Tuple[str, str]]:
+    """Upgrade a batch of schemas in parallel, returning failures"""
+    failures = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_upgrade_schema, schema) for schema in schemas]
+        for future in as_completed(futures):
+            schema, error = future.result()
+            if error:
+                logger.error(f"Migration failed for schema={schema}: {error}")
+                failures.append((schema, error))
+            else:
+                logger.info(f"Migrated schema={schema}")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("schemas", nargs="*", help="Tenant schemas to upgrade")
+    parser.add_argument("--all", action="store_true", help="Upgrade every non-system schema")
+    parser.add_argument("--workers", type=int, default=6, help="Parallel worker processes")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-5.5s [%(name)s] %(message)s")
+    
+    settings = get_settings()
+    engine = create_engine(settings.get_database_url(async_driver=False), poolclass=NullPool)
+    head = ScriptDirectory.from_config(_alembic_config()).get_current_head()
+    
+    schemas = _list_tenant_schemas(engine) if args.all else args.schemas
+    if not schemas:
+        parser.error("pass tenant schema names or --all")
+    
+    pending = _pending_schemas(engine, schemas, head)
+    engine.dispose()
+    logger.info(f"{len(pending)} of {len(schemas)} schemas need upgrading to {head}")
+    
+    failures = []
+    for i in range(0, len(pending), BATCH_SIZE):
+        batch = pending[i:i + BATCH_SIZE]
+        batch_failures = _run_batch(batch, args.workers)
+        
+        # Retry failed schemas once, serially, to rule out transient errors
+        for schema, _ in batch_failures:
+            schema, error = _upgrade_schema(schema)
+            if error:
+                failures.append((schema, error))
+    
+    for schema, error in failures:
+        print(f"FAILED {schema}: {error}", file=sys.stderr)
+    
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
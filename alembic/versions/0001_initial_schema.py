@@ -45,7 +45,7 @@ def upgrade() -> None:
         sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True, comment='Last successful login'),
         sa.Column('last_sync_at', sa.DateTime(timezone=True), nullable=True, comment='Last email sync time'),
     )
-
+    
     # Create emails table
     op.create_table(
         'emails',
@@ -79,8 +79,8 @@ def upgrade() -> None:
     
     # Create index for emails tenant isolation
     op.create_index('ix_emails_org_user', 'emails', ['org_id', 'user_id'])
-    op.create_index('ix_emails_org_user_sent', 'emails', ['org_id', 'user_id', 'sent_at'])
-
+    # Tenant-scoped composite indexes are built concurrently in 0002
+    
     # Create audit_logs table
     op.create_table(
         'audit_logs',
@@ -102,11 +102,8 @@ def upgrade() -> None:
         sa.Column('success', sa.Boolean(), default=True, nullable=False, comment='Whether action succeeded'),
         sa.Column('error_message', sa.Text(), nullable=True, comment='Error message if failed'),
     )
+    # Audit log query indexes are built concurrently in 0002
     
-    # Create index for audit log queries
-    op.create_index('ix_audit_logs_org_created', 'audit_logs', ['org_id', 'created_at'])
-    op.create_index('ix_audit_logs_user_created', 'audit_logs', ['user_id', 'created_at'])
-
     # Create rag_queries table
     op.create_table(
         'rag_queries',
@@ -130,10 +127,8 @@ def upgrade() -> None:
         sa.Column('feedback_rating', sa.Integer(), nullable=True, comment='User feedback rating (1-5)'),
         sa.Column('feedback_text', sa.Text(), nullable=True, comment='User feedback text'),
     )
+    # RAG query history index is built concurrently in 0002
     
-    # Create index for rag queries
-    op.create_index('ix_rag_queries_org_user_created', 'rag_queries', ['org_id', 'user_id', 'created_at'])
-
     # Create vector_records table
     op.create_table(
         'vector_records',
@@ -151,10 +146,7 @@ def upgrade() -> None:
         sa.Column('embedding_model', sa.String(100), nullable=True, comment='Model used for embedding'),
         sa.Column('metadata_json', sa.Text(), nullable=True, comment='Additional metadata stored in Pinecone (JSON)'),
     )
-    
-    # Create index for vector records
-    op.create_index('ix_vector_records_org_user', 'vector_records', ['org_id', 'user_id'])
-    op.create_index('ix_vector_records_email_chunk', 'vector_records', ['email_id', 'chunk_index'])
+    # Vector record lookup indexes are built concurrently in 0002
 
 
 def downgrade() -> None:
@@ -0,0 +1,67 @@
+"""concurrent_secondary_indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-16
+
+Builds the secondary composite indexes outside the table-creation
+transaction using CREATE INDEX CONCURRENTLY, so writers to large tables
+(emails, audit_logs, vector_records) are not blocked while they build.
+Primary keys and unique constraints stay in 0001 since they cannot be
+created concurrently.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns, partial-index predicate)
+SECONDARY_INDEXES = [
+    # Every email lookup is tenant-scoped
+    ('ix_emails_org_user_sent', 'emails', ['org_id', 'user_id', 'sent_at'], None),
+    ('ix_emails_org_user_message', 'emails', ['org_id', 'user_id', 'message_id'], None),
+    ('ix_emails_org_user_sent_live', 'emails', ['org_id', 'user_id', 'sent_at'], 'is_deleted = false'),
+    # Composites also serve plain org/user lookups
+    ('ix_audit_logs_org_created', 'audit_logs', ['org_id', 'created_at'], None),
+    ('ix_audit_logs_user_created', 'audit_logs', ['user_id', 'created_at'], None),
+    # Small partial indexes for the common "find failed events" queries
+    ('ix_audit_logs_org_failed', 'audit_logs', ['org_id', 'created_at'], 'success = false'),
+    ('ix_audit_logs_user_failed', 'audit_logs', ['user_id', 'created_at'], 'success = false'),
+    ('ix_rag_queries_org_user_created', 'rag_queries', ['org_id', 'user_id', 'created_at'], None),
+    ('ix_vector_records_org_user', 'vector_records', ['org_id', 'user_id'], None),
+    ('ix_vector_records_email_chunk', 'vector_records', ['email_id', 'chunk_index'], None),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in SECONDARY_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                sqlite_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(SECONDARY_INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,41 @@
+"""sender_trigram_index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-16
+
+Trigram GIN index on lower(sender) so the substring sender filter on
+GET /emails (lower(sender) LIKE '%...%') uses a bitmap index scan instead
+of scanning every row of the tenant's mailbox. PostgreSQL only.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_emails_sender_trgm '
+            'ON emails USING gin (lower(sender) gin_trgm_ops)'
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    
+    with op.get_context().autocommit_block():
+        op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_emails_sender_trgm')
@@ -0,0 +1,59 @@
+"""email_page_order_index
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-16
+
+Replaces ix_emails_org_user_sent (org_id, user_id, sent_at) with
+(org_id, user_id, sent_at DESC, id DESC), the exact order of the email
+list pages. The id tiebreaker makes page order deterministic for emails
+sharing a sent_at, and lets Postgres walk the index forward and stop
+after offset + limit rows instead of sorting the mailbox.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_emails_org_user_sent_id',
+            'emails',
+            ['org_id', 'user_id', sa.text('sent_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        # Same leading columns; the new index serves every query the old one did
+        op.drop_index(
+            'ix_emails_org_user_sent',
+            table_name='emails',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_emails_org_user_sent',
+            'emails',
+            ['org_id', 'user_id', 'sent_at'],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_emails_org_user_sent_id',
+            table_name='emails',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
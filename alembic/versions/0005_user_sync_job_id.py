@@ -0,0 +1,32 @@
+"""user_sync_job_id
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-16
+
+Remembers each user's most recent background sync job so
+GET /emails/sync/status can report its progress and POST /emails/sync
+can avoid queueing a second job while one is still pending.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('sync_job_id', sa.String(100), nullable=True, comment='Most recent background sync job (Celery task ID)'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'sync_job_id')
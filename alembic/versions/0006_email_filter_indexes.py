@@ -0,0 +1,63 @@
+"""email_filter_indexes
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-16
+
+Indexes for the attachment and label filters planned for the email list:
+
+- ix_emails_org_user_sent_attach: partial (org_id, user_id, sent_at DESC,
+  id DESC) WHERE has_attachments, the page order of ix_emails_org_user_sent_id
+  restricted to emails with attachments.
+- ix_emails_labels_gin: GIN on string_to_array(labels, ','). labels is
+  comma-separated text (Gmail ids such as CATEGORY_PERSONAL), so an array
+  keeps matches exact where a tsvector would split on '_'. Filters must use
+  the same expression: string_to_array(labels, ',') @> ARRAY[:label].
+  PostgreSQL only.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+    
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_emails_org_user_sent_attach',
+            'emails',
+            ['org_id', 'user_id', sa.text('sent_at DESC'), sa.text('id DESC')],
+            postgresql_where=sa.text('has_attachments'),
+            sqlite_where=sa.text('has_attachments'),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        if is_postgres:
+            op.execute(
+                'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_emails_labels_gin '
+                "ON emails USING gin (string_to_array(labels, ','))"
+            )
+
+
+def downgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == 'postgresql'
+    
+    with op.get_context().autocommit_block():
+        if is_postgres:
+            op.execute('DROP INDEX CONCURRENTLY IF EXISTS ix_emails_labels_gin')
+        op.drop_index(
+            'ix_emails_org_user_sent_attach',
+            table_name='emails',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
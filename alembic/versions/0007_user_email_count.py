@@ -0,0 +1,39 @@
+"""user_email_count
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-16
+
+Per-user count of stored emails, incremented by the sync service in the
+same transaction as each insert, so GET /emails/sync/status reads a column
+instead of counting the mailbox. Existing users are backfilled on every
+dialect: at this revision users.id and emails.user_id are both the dashed
+varchar form (0011 converts users.id later), so the ids join directly.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'users',
+        sa.Column('email_count', sa.Integer(), nullable=False, server_default='0', comment='Synced emails stored for this user (kept current by the sync service)'),
+    )
+    
+    op.execute(
+        'UPDATE users SET email_count = '
+        '(SELECT count(*) FROM emails WHERE emails.user_id = users.id)'
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'email_count')
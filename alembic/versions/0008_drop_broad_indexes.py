@@ -0,0 +1,62 @@
+"""drop_broad_indexes
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-16
+
+Drops the broad indexes from the initial schema that the tenant-scoped
+and partial indexes built in 0002 replace:
+
+- emails: the standalone message_id, thread_id and sender indexes (every
+  email lookup is tenant-scoped; ix_emails_org_user_message serves the
+  sync dedupe and ix_emails_sender_trgm the sender filter) and
+  ix_emails_org_user, a prefix of ix_emails_org_user_sent_id.
+- audit_logs: the single-column org_id and user_id indexes, covered by
+  the (org_id|user_id, created_at) composites.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, columns) as created by 0001
+BROAD_INDEXES = [
+    ('ix_emails_org_user', 'emails', ['org_id', 'user_id']),
+    ('ix_emails_message_id', 'emails', ['message_id']),
+    ('ix_emails_thread_id', 'emails', ['thread_id']),
+    ('ix_emails_sender', 'emails', ['sender']),
+    ('ix_audit_logs_org_id', 'audit_logs', ['org_id']),
+    ('ix_audit_logs_user_id', 'audit_logs', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, _ in BROAD_INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(BROAD_INDEXES):
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
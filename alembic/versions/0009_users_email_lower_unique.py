@@ -0,0 +1,42 @@
+"""users_email_lower_unique
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-16
+
+Makes users.email unique case-insensitively: the plain unique index
+from 0001 is replaced by uq_users_email_lower on lower(email), the
+conflict target of the register and OAuth upserts (ON CONFLICT
+(lower(email))). Existing addresses are lowercased to match what the
+application now stores.
+
+The new index is built before anything changes, so a database holding
+two accounts that differ only in case fails here, untouched, and the
+duplicates can be merged by hand first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('uq_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+    op.execute('UPDATE users SET email = lower(email) WHERE email <> lower(email)')
+    
+    op.drop_index('ix_users_email', table_name='users', if_exists=True)
+    if op.get_bind().dialect.name == 'postgresql':
+        # Schemas built with create_all may carry it as a constraint instead
+        op.execute('ALTER TABLE users DROP CONSTRAINT IF EXISTS users_email_key')
+
+
+def downgrade() -> None:
+    op.create_index('ix_users_email', 'users', ['email'], unique=True, if_not_exists=True)
+    op.drop_index('uq_users_email_lower', table_name='users')
@@ -0,0 +1,57 @@
+"""drop_prefix_covered_indexes
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-16
+
+Drops single-column indexes whose column already leads a composite
+index, which serves the same lookups by prefix:
+
+- org_id on emails, rag_queries and vector_records (every tenant table
+  has an (org_id, user_id, ...) composite)
+- vector_records.email_id, covered by ix_vector_records_email_chunk
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, column) as created by 0001
+COVERED_INDEXES = [
+    ('ix_emails_org_id', 'emails', 'org_id'),
+    ('ix_rag_queries_org_id', 'rag_queries', 'org_id'),
+    ('ix_vector_records_org_id', 'vector_records', 'org_id'),
+    ('ix_vector_records_email_id', 'vector_records', 'email_id'),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, _ in COVERED_INDEXES:
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, column in reversed(COVERED_INDEXES):
+            op.create_index(
+                name,
+                table,
+                [column],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
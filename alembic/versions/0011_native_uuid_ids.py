@@ -0,0 +1,81 @@
+"""native_uuid_ids
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-16
+
+Converts the varchar(36) UUID columns from 0001 to the types the models
+bind (sa.Uuid): native uuid on PostgreSQL, 16 bytes instead of 37 and
+compared without collation. Covers every table's id and
+vector_records.email_id; the vector_records -> emails foreign key is
+dropped around the change since both sides must switch together.
+
+SQLite has no uuid type; sa.Uuid stores 32-character hex there, so the
+existing dashed values are rewritten in place.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column) holding UUIDs
+UUID_COLUMNS = [
+    ('users', 'id'),
+    ('emails', 'id'),
+    ('audit_logs', 'id'),
+    ('rag_queries', 'id'),
+    ('vector_records', 'id'),
+    ('vector_records', 'email_id'),
+]
+
+EMAIL_FK = 'vector_records_email_id_fkey'
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        for table, column in UUID_COLUMNS:
+            op.execute(f"UPDATE {table} SET {column} = replace({column}, '-', '') WHERE length({column}) = 36")
+        return
+    
+    op.drop_constraint(EMAIL_FK, 'vector_records', type_='foreignkey')
+    for table, column in UUID_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.Uuid(as_uuid=False),
+            existing_type=sa.String(36),
+            postgresql_using=f'{column}::uuid',
+        )
+    op.create_foreign_key(EMAIL_FK, 'vector_records', 'emails', ['email_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        # Re-insert the dashes: 8-4-4-4-12
+        for table, column in UUID_COLUMNS:
+            op.execute(
+                f"UPDATE {table} SET {column} = "
+                f"substr({column}, 1, 8) || '-' || substr({column}, 9, 4) || '-' || "
+                f"substr({column}, 13, 4) || '-' || substr({column}, 17, 4) || '-' || substr({column}, 21) "
+                f"WHERE length({column}) = 32"
+            )
+        return
+    
+    op.drop_constraint(EMAIL_FK, 'vector_records', type_='foreignkey')
+    for table, column in UUID_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.String(36),
+            existing_type=sa.Uuid(as_uuid=False),
+            postgresql_using=f'{column}::text',
+        )
+    op.create_foreign_key(EMAIL_FK, 'vector_records', 'emails', ['email_id'], ['id'], ondelete='CASCADE')
@@ -0,0 +1,88 @@
+"""unique_email_message
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-16
+
+Makes (org_id, user_id, message_id) unique on emails so overlapping syncs
+cannot store the same message twice; the sync inserts with ON CONFLICT DO
+NOTHING against it. The plain ix_emails_org_user_message from 0002 has the
+same columns and is dropped.
+
+Duplicates already stored are removed first (the oldest id survives;
+their vector_records go with them through the cascade), and
+users.email_count is recounted since they were counted twice.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = ['org_id', 'user_id', 'message_id']
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM emails
+        WHERE EXISTS (
+            SELECT 1 FROM emails AS keep
+            WHERE keep.org_id = emails.org_id
+              AND keep.user_id = emails.user_id
+              AND keep.message_id = emails.message_id
+              AND keep.id < emails.id
+        )
+        """
+    )
+    # After 0011 users.id is native uuid on PostgreSQL and bare hex on
+    # SQLite, while emails.user_id keeps the dashed text form
+    if op.get_bind().dialect.name == 'postgresql':
+        user_match = 'emails.user_id = users.id::text'
+    else:
+        user_match = "replace(emails.user_id, '-', '') = users.id"
+    op.execute(
+        f"UPDATE users SET email_count = "
+        f"(SELECT count(*) FROM emails WHERE {user_match})"
+    )
+    
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_emails_org_user_message',
+            'emails',
+            COLUMNS,
+            unique=True,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_emails_org_user_message',
+            table_name='emails',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_emails_org_user_message',
+            'emails',
+            COLUMNS,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'uq_emails_org_user_message',
+            table_name='emails',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,71 @@
+"""
+OpenAPI Examples
+Documentation-only payload examples, merged into the schema by custom_openapi()
+"""
+from typing import Any, Dict
+
+
+# Component schema name -> example payload. Kept out of the Pydantic models
+# so per-model schema generation carries no documentation-only data.
+SCHEMA_EXAMPLES: Dict[str, Dict[str, Any]] = {
+    "RAGQueryRequest": {
+        "query": "What decisions were made about the Q4 budget?",
+        "filters": {
+            "date_from": "2024-10-01",
+            "date_to": "2024-12-31",
+            "sender": "finance@company.com"
+        }
+    },
+    "RAGQueryResponse": {
+        "answer": "Based on the retrieved emails, three key decisions were made...",
+        "sources": [
+            {
+                "email_id": "3f2b1c9e-8a4d-4e6f-9b1a-2c3d4e5f6a7b",
+                "subject": "Q4 Budget Approval",
+                "sender": "cfo@company.com",
+                "date": "2024-11-15T10:30:00Z",
+                "relevance_score": 0.92
+            }
+        ],
+        "metadata": {
+            "request_id": "5b0e6f7a-1c2d-4e3f-8a9b-0c1d2e3f4a5b",
+            "retrieval_count": 15,
+            "processing_time_ms": 1253,
+            "answer_complete": True
+        }
+    },
+    "TestRAGQueryRequest": {
+        "query": "What decisions were made about the Q4 budget?",
+        "filters": {
+            "date_from": "2024-10-01",
+            "date_to": "2024-12-31"
+        },
+        "user_id": "test_user_001",
+        "org_id": "test_org_001"
+    },
+    "TestInfoResponse": {
+        "message": "Test routes are enabled (development mode)",
+        "warning": "These routes bypass authentication. Do NOT use in production.",
+        "demo_credentials": {
+            "user_id": "test_user_001",
+            "org_id": "test_org_001"
+        },
+        "available_endpoints": {
+            "GET /api/v1/test/info": "This endpoint"
+        },
+        "quick_start": "Visit /api/v1/test/connect-gmail to authorize Gmail access",
+        "instructions": ["Step 1: Open connect-gmail endpoint"],
+        "next_steps": {"1_connect": "http://localhost:8000/api/v1/test/connect-gmail"}
+    },
+}
+
+
+def apply_schema_examples(openapi_schema: Dict[str, Any]) -> None:
+    """Attach SCHEMA_EXAMPLES to the matching component schemas in place"""
+    schemas = openapi_schema.get("components", {}).get("schemas", {})
+    for name, example in SCHEMA_EXAMPLES.items():
+        if name in schemas:
+            schemas[name]["example"] = example
+
+
+__all__ = ["SCHEMA_EXAMPLES", "apply_schema_examples"]
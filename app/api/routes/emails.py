@@ -20,24 +20,33 @@ To access your emails, you need to:
 4. **Access Emails**: List and read your synced emails
    - GET /api/v1/emails (list emails)
    - GET /api/v1/emails/{id} (get email details)
+   - GET /api/v1/emails/stream (all emails as NDJSON, for exports)
 
 All endpoints require Bearer token authentication.
 """
+import asyncio
+import base64
 import logging
-from typing import Optional, List
+import uuid
+from typing import Optional, List, Tuple
 from datetime import datetime
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response, StreamingResponse
+import orjson
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import Row, bindparam, select, func, tuple_
+from sqlalchemy.orm import load_only
 
-from app.db.session import get_async_db
+from app.db.session import AsyncSessionLocal, get_async_db
 from app.models.email import Email
 from app.models.user import User
-from app.core.security import get_current_user
-from app.services.email_sync_service import get_email_sync_service
+from app.core.security import get_current_user, get_current_user_id
+from app.services.email_cache import get_email_cache
+from app.services.sync_lock import get_sync_lock
+from app.workers.tasks import sync_emails_task
 from app.ui import (
     get_connect_gmail_page,
     get_email_list_page,
@@ -57,7 +66,7 @@ class EmailListItem(BaseModel):
     subject: Optional[str] = None
     sender: str
     sender_name: Optional[str] = None
-    sent_at: str
+    sent_at: datetime
     has_attachments: bool = False
     labels: Optional[str] = None
 
@@ -67,6 +76,7 @@ class EmailListResponse(BaseModel):
     emails: List[EmailListItem]
     count: int
     total: int
+    next_cursor: Optional[str] = None
 
 
 class EmailDetailResponse(BaseModel):
@@ -79,7 +89,7 @@ class EmailDetailResponse(BaseModel):
     sender_name: Optional[str] = None
     recipients_to: Optional[str] = None
     recipients_cc: Optional[str] = None
-    sent_at: str
+    sent_at: datetime
     body_text: Optional[str] = None
     body_html: Optional[str] = None
     has_attachments: bool = False
@@ -95,12 +105,30 @@ class SyncResponse(BaseModel):
     message: str
 
 
+class SyncJobResponse(BaseModel):
+    """Accepted email sync job"""
+    job_id: str
+    status: str
+    message: str
+    status_url: str
+
+
+class SyncJobStatusResponse(BaseModel):
+    """Email sync job progress"""
+    job_id: str
+    status: str  # queued | running | completed | failed
+    result: Optional[SyncResponse] = None
+    error: Optional[str] = None
+
+
 class SyncStatusResponse(BaseModel):
     """Sync status response"""
     last_sync: Optional[datetime] = None
     email_count: int
     sync_enabled: bool
     gmail_connected: bool
+    sync_job_id: Optional[str] = None
+    sync_job_status: Optional[str] = None  # queued | running | completed | failed | unknown
 
 
 class GmailConnectionGuide(BaseModel):
@@ -176,11 +204,99 @@ async def gmail_connection_guide_ui(
     return HTMLResponse(content=html_content)
 
 
+# Columns the list views render; bodies (often tens of KB, TOASTed) are
+# never read there. The list routes select them as plain rows, skipping ORM
+# identity-map and attribute-instrumentation work per email; LIST_COLUMNS
+# is the same set for queries that still load Email entities, where
+# raiseload turns an accidental access into a clear error.
+LIST_FIELDS = (
+    Email.id, Email.message_id, Email.subject, Email.sender, Email.sender_name,
+    Email.sent_at, Email.has_attachments, Email.labels,
+)
+LIST_COLUMNS = load_only(*LIST_FIELDS, raiseload=True)
+
+
+def _sender_matches(sender: str):
+    """Case-insensitive substring match on sender, served by ix_emails_sender_trgm"""
+    # Same expression as the trigram index so Postgres can use it
+    return func.lower(Email.sender).like(f"%{sender.lower()}%")
+
+
+def _encode_cursor(last: Row, total: int) -> str:
+    """Opaque page cursor: the last row's sort key plus the first page's total"""
+    raw = f"{last.sent_at.isoformat()}|{last.id}|{total}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        sent_at, email_id, total = raw.split("|")
+        return datetime.fromisoformat(sent_at), str(UUID(email_id)), int(total)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "error": "Invalid cursor",
+                "message": "The pagination cursor is malformed.",
+                "how_to_fix": "Pass next_cursor from a previous GET /api/v1/emails response unchanged."
+            }
+        )
+
+
+# Tenant-scoped statements built once at import so each request only binds
+# parameters; SQLAlchemy reuses the cached compiled form instead of rebuilding
+# and re-compiling the same Select every call.
+_OWNED_BY_USER = Email.owned_by(bindparam("org_id"), bindparam("user_id"))
+_EMAIL_PAGE = (
+    select(*LIST_FIELDS, func.count().over().label("total"))
+    .where(_OWNED_BY_USER)
+    # Matches ix_emails_org_user_sent_id; id breaks sent_at ties so
+    # pages neither repeat nor skip emails
+    .order_by(Email.sent_at.desc(), Email.id.desc())
+    .offset(bindparam("offset"))
+    .limit(bindparam("limit"))
+)
+_EMAIL_COUNT = select(func.count()).select_from(Email).where(_OWNED_BY_USER)
+_EMAIL_BY_ID = select(Email).where(Email.id == bindparam("email_id"), _OWNED_BY_USER)
+
+
+async def _page_with_total(
+    db: AsyncSession,
+    user: User,
+    offset: int,
+    limit: int,
+    sender: Optional[str] = None
+) -> Tuple[List[Row], int]:
+    """
+    Fetch one page of a user's email rows (newest first) and the total match count.
+    
+    The total rides along on every row as count(*) OVER (), so both come
+    from a single query and index traversal. A page past the end has no
+    rows to carry it; only then is a separate COUNT issued.
+    """
+    page_query = _EMAIL_PAGE
+    count_query = _EMAIL_COUNT
+    if sender:
+        page_query = page_query.where(_sender_matches(sender))
+        count_query = count_query.where(_sender_matches(sender))
+    
+    params = {"user_id": user.id, "org_id": user.org_id}
+    rows = (await db.execute(page_query, {**params, "offset": offset, "limit": limit})).all()
+    
+    if rows:
+        return rows, rows[0].total
+    if offset == 0:
+        return [], 0
+    return [], await db.scalar(count_query, params) or 0
+
+
 @router.get("", response_model=EmailListResponse)
 async def list_emails(
     request: Request,
     limit: int = Query(default=20, ge=1, le=100, description="Number of emails to return"),
-    offset: int = Query(default=0, ge=0, description="Number of emails to skip"),
+    offset: int = Query(default=0, ge=0, deprecated=True, description="Number of emails to skip (use cursor instead)"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
     sender: Optional[str] = Query(default=None, description="Filter by sender email"),
     db: AsyncSession = Depends(get_async_db)
 ):
@@ -188,6 +304,8 @@ async def list_emails(
     List emails for the authenticated user.
     
     Returns paginated list of emails ordered by sent date (newest first).
+    Pass `next_cursor` back as `cursor` to get the following page; cursor
+    pages cost the same at any depth, unlike `offset`.
     
     **Prerequisites:**
     - Must be authenticated with Bearer token
@@ -202,60 +320,130 @@ async def list_emails(
     
     logger.info(f"Listing emails for user {user.id}, limit={limit}, offset={offset}")
     
-    # Build query with optional filters
-    base_query = select(Email).where(
-        Email.user_id == str(user.id),
-        Email.org_id == user.org_id
+    async def build() -> bytes:
+        if cursor:
+            # Seek past the previous page's last row instead of skipping rows
+            cursor_sent_at, cursor_id, total = _decode_cursor(cursor)
+            conditions = [
+                Email.owned_by(user.org_id, user.id),
+                tuple_(Email.sent_at, Email.id) < (cursor_sent_at, cursor_id)
+            ]
+            if sender:
+                conditions.append(_sender_matches(sender))
+            emails = (await db.execute(
+                select(*LIST_FIELDS)
+                .where(*conditions)
+                .order_by(Email.sent_at.desc(), Email.id.desc())
+                .limit(limit)
+            )).all()
+        else:
+            emails, total = await _page_with_total(db, user, offset, limit, sender)
+        
+        # If no emails, provide helpful message
+        if total == 0:
+            logger.info(f"No emails found for user {user.id}")
+        
+        # Values come straight from typed, NOT NULL-defaulted columns, so the
+        # response models are built without re-validating each field;
+        # sent_at stays a datetime and orjson writes it as ISO 8601
+        email_items = [
+            EmailListItem.model_construct(
+                id=email.id,
+                message_id=email.message_id,
+                subject=email.subject,
+                sender=email.sender,
+                sender_name=email.sender_name,
+                sent_at=email.sent_at,
+                has_attachments=email.has_attachments,
+                labels=email.labels
+            )
+            for email in emails
+        ]
+        
+        return orjson.dumps(EmailListResponse.model_construct(
+            emails=email_items,
+            count=len(email_items),
+            total=total,
+            next_cursor=_encode_cursor(emails[-1], total) if len(emails) == limit else None
+        ).model_dump())
+    
+    # Served from Redis when warm; identical concurrent misses share one query
+    body = await get_email_cache().get_or_build(
+        user.org_id, user.id, f"list:{limit}:{offset}:{cursor or ''}:{sender or ''}", build
     )
+    return Response(content=body, media_type="application/json")
+
+
+def _list_item(email: Row) -> dict:
+    return {
+        "id": email.id,
+        "message_id": email.message_id,
+        "subject": email.subject,
+        "sender": email.sender,
+        "sender_name": email.sender_name,
+        "sent_at": email.sent_at.isoformat() if email.sent_at else "",
+        "has_attachments": email.has_attachments,
+        "labels": email.labels
+    }
+
+
+@router.get("/stream")
+async def stream_emails(
+    request: Request,
+    limit: int = Query(default=500, ge=1, le=5000, description="Maximum emails to stream"),
+    sender: Optional[str] = Query(default=None, description="Filter by sender email"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Stream emails for the authenticated user as NDJSON (newest first).
     
-    if sender:
-        base_query = base_query.where(Email.sender.ilike(f"%{sender}%"))
+    Each line is one email in the same shape as GET /emails items. Rows
+    are sent as they are read from the database, so large exports start
+    immediately and are never held in memory as a whole.
+    """
+    user = await get_current_user(request, db)
     
-    # Get total count
-    count_query = select(func.count(Email.id)).where(
-        Email.user_id == str(user.id),
-        Email.org_id == user.org_id
-    )
+    conditions = [Email.owned_by(user.org_id, user.id)]
     if sender:
-        count_query = count_query.where(Email.sender.ilike(f"%{sender}%"))
-    
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-    
-    # If no emails, provide helpful message
-    if total == 0:
-        logger.info(f"No emails found for user {user.id}")
-    
-    # Get emails
+        conditions.append(_sender_matches(sender))
     query = (
-        base_query
-        .order_by(Email.sent_at.desc())
-        .offset(offset)
+        select(*LIST_FIELDS)
+        .where(*conditions)
+        .order_by(Email.sent_at.desc(), Email.id.desc())
         .limit(limit)
     )
     
-    result = await db.execute(query)
-    emails = result.scalars().all()
+    async def rows():
+        # The request's session is closed once the route returns, before the
+        # body is sent, so the stream reads through its own session
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(query, execution_options={"yield_per": 50})
+            async for email in result:
+                yield orjson.dumps(_list_item(email)) + b"\n"
     
-    email_items = [
-        EmailListItem(
-            id=str(email.id),
-            message_id=email.message_id,
-            subject=email.subject,
-            sender=email.sender,
-            sender_name=email.sender_name,
-            sent_at=email.sent_at.isoformat() if email.sent_at else "",
-            has_attachments=email.has_attachments or False,
-            labels=email.labels
-        )
-        for email in emails
-    ]
-    
-    return EmailListResponse(
-        emails=email_items,
-        count=len(email_items),
-        total=total
-    )
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+
+# Celery task state -> public job status
+_JOB_STATUS = {
+    "PENDING": "queued",
+    "RECEIVED": "queued",
+    "STARTED": "running",
+    "RETRY": "running",
+    "SUCCESS": "completed",
+    "FAILURE": "failed",
+    "REVOKED": "failed",
+}
+
+
+async def _sync_job_status(job_id: str) -> str:
+    """Public status of a sync job, read from the Celery result backend"""
+    try:
+        state = await asyncio.to_thread(lambda: sync_emails_task.AsyncResult(job_id).state)
+    except Exception as e:
+        logger.warning(f"Could not read sync job {job_id}: {type(e).__name__}")
+        return "unknown"
+    return _JOB_STATUS.get(state, "running")
 
 
 @router.get("/sync/status", response_model=SyncStatusResponse)
@@ -266,29 +454,28 @@ async def get_sync_status(
     """
     Get email sync status for the authenticated user.
     
-    Shows whether Gmail is connected and how many emails are synced.
+    Shows whether Gmail is connected, how many emails are synced and the
+    progress of the most recent background sync job.
     """
     user = await get_current_user(request, db)
     
-    # Get email count
-    count_query = select(func.count(Email.id)).where(
-        Email.user_id == str(user.id),
-        Email.org_id == user.org_id
-    )
-    result = await db.execute(count_query)
-    email_count = result.scalar() or 0
-    
     gmail_connected = bool(user.encrypted_access_token)
     
-    return SyncStatusResponse(
+    # Polled by the UI while a sync runs; every value comes from typed columns,
+    # so skip FastAPI's response_model re-validation (the model still
+    # documents the schema)
+    return ORJSONResponse(SyncStatusResponse.model_construct(
         last_sync=user.last_email_sync,
-        email_count=email_count,
+        # Maintained by the sync service; no COUNT over the mailbox
+        email_count=user.email_count,
         sync_enabled=user.email_sync_enabled,
-        gmail_connected=gmail_connected
-    )
+        gmail_connected=gmail_connected,
+        sync_job_id=user.sync_job_id,
+        sync_job_status=await _sync_job_status(user.sync_job_id) if user.sync_job_id else None
+    ).model_dump())
 
 
-@router.post("/sync", response_model=SyncResponse)
+@router.post("/sync", response_model=SyncJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def sync_emails(
     request: Request,
     max_emails: int = Query(default=100, ge=1, le=500, description="Maximum emails to sync"),
@@ -298,8 +485,9 @@ async def sync_emails(
     """
     Sync emails from Gmail for the authenticated user.
     
-    Fetches new emails from Gmail and stores them in the database.
-    Also creates embeddings for RAG queries.
+    Queues a background job that fetches new emails from Gmail and stores
+    them in the database. Returns 202 immediately; poll `status_url`
+    (GET /emails/sync/jobs/{job_id}) for the result.
     
     **Prerequisites:**
     1. Must be authenticated
@@ -335,42 +523,98 @@ async def sync_emails(
             }
         )
     
-    logger.info(f"Starting email sync for user {user.id}, max={max_emails}, days={since_days}")
+    # Job ids carry the owner so the status endpoint can check access
+    # without a lookup table
+    job_id = f"{user.id}-{uuid.uuid4().hex}"
+    
+    # A second job would fetch the same messages; hand back the one holding
+    # the user's sync lock, whether it is still queued or already running
+    sync_lock = get_sync_lock()
+    holder = await sync_lock.acquire(user.id, job_id)
+    if holder is not None:
+        return SyncJobResponse(
+            job_id=holder,
+            status=await _sync_job_status(holder),
+            message="Email sync already in progress",
+            status_url=f"/api/v1/emails/sync/jobs/{holder}"
+        )
+    
+    logger.info(f"Queueing email sync for user {user.id}, max={max_emails}, days={since_days}")
     
     try:
-        sync_service = get_email_sync_service()
-        
-        synced, skipped, errors = await sync_service.sync_emails_for_user(
-            db=db,
-            user=user,
-            max_emails=max_emails,
-            since_days=since_days
+        await asyncio.to_thread(
+            sync_emails_task.apply_async,
+            args=(user.id, max_emails, since_days),
+            task_id=job_id
         )
-        
-        logger.info(f"Email sync complete for user {user.id}: synced={synced}, skipped={skipped}")
-        
-        return SyncResponse(
-            synced=synced,
-            skipped=skipped,
-            errors=errors[:10],  # Limit error messages
-            message=f"Synced {synced} new emails, skipped {skipped} existing"
+    except Exception as e:
+        logger.error(f"Failed to queue email sync for user {user.id}: {e}", exc_info=True)
+        await sync_lock.release(user.id, job_id)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "error": "Sync unavailable",
+                "message": "The email sync queue is not reachable right now.",
+                "how_to_fix": "Try again in a few moments."
+            }
         )
     
-    except Exception as e:
-        logger.error(f"Email sync failed for user {user.id}: {e}", exc_info=True)
+    # Saved with the request's commit; GET /emails/sync/status reports it
+    user.sync_job_id = job_id
+    
+    return SyncJobResponse(
+        job_id=job_id,
+        status="queued",
+        message="Email sync started",
+        status_url=f"/api/v1/emails/sync/jobs/{job_id}"
+    )
+
+
+@router.get("/sync/jobs/{job_id}", response_model=SyncJobStatusResponse)
+async def get_sync_job(
+    job_id: str,
+    request: Request
+):
+    """
+    Get progress of an email sync job started with POST /emails/sync.
+    
+    Unknown or expired job ids report `queued` (Celery cannot tell them
+    apart from jobs still waiting for a worker).
+    """
+    user_id = await get_current_user_id(request)
+    
+    if not job_id.startswith(f"{user_id}-"):
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_404_NOT_FOUND,
             detail={
-                "error": "Sync failed",
-                "message": str(e),
-                "how_to_fix": "Try reconnecting Gmail at /api/v1/oauth/google"
+                "error": "Job not found",
+                "message": f"Sync job {job_id} not found.",
+                "how_to_fix": "Use the job_id returned by POST /api/v1/emails/sync."
             }
         )
+    
+    job = sync_emails_task.AsyncResult(job_id)
+    state = await asyncio.to_thread(lambda: job.state)
+    job_status = _JOB_STATUS.get(state, "running")
+    
+    result = None
+    error = None
+    if job_status == "completed":
+        result = SyncResponse(**job.result)
+    elif job_status == "failed":
+        error = str(job.result)
+    
+    return SyncJobStatusResponse(
+        job_id=job_id,
+        status=job_status,
+        result=result,
+        error=error
+    )
 
 
 @router.get("/{email_id}", response_model=EmailDetailResponse)
 async def get_email(
-    email_id: str,
+    email_id: UUID,
     request: Request,
     db: AsyncSession = Depends(get_async_db)
 ):
@@ -382,42 +626,42 @@ async def get_email(
     """
     user = await get_current_user(request, db)
     
-    # Get email (with tenant isolation)
-    query = select(Email).where(
-        Email.id == email_id,
-        Email.user_id == str(user.id),
-        Email.org_id == user.org_id
-    )
-    
-    result = await db.execute(query)
-    email = result.scalar_one_or_none()
-    
-    if not email:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error": "Email not found",
-                "message": f"No email with ID '{email_id}' found for your account.",
-                "how_to_fix": "Use GET /api/v1/emails to list available emails."
-            }
+    async def build() -> bytes:
+        # Get email (with tenant isolation)
+        email = await db.scalar(
+            _EMAIL_BY_ID,
+            {"email_id": str(email_id), "user_id": user.id, "org_id": user.org_id}
         )
+        
+        if not email:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail={
+                    "error": "Email not found",
+                    "message": f"No email with ID '{email_id}' found for your account.",
+                    "how_to_fix": "Use GET /api/v1/emails to list available emails."
+                }
+            )
+        
+        return orjson.dumps(EmailDetailResponse.model_construct(
+            id=email.id,
+            message_id=email.message_id,
+            thread_id=email.thread_id,
+            subject=email.subject,
+            sender=email.sender,
+            sender_name=email.sender_name,
+            recipients_to=email.recipients_to,
+            recipients_cc=email.recipients_cc,
+            sent_at=email.sent_at,
+            body_text=email.body_text,
+            body_html=email.body_html,
+            has_attachments=email.has_attachments,
+            attachment_count=email.attachment_count,
+            labels=email.labels
+        ).model_dump())
     
-    return EmailDetailResponse(
-        id=str(email.id),
-        message_id=email.message_id,
-        thread_id=email.thread_id,
-        subject=email.subject,
-        sender=email.sender,
-        sender_name=email.sender_name,
-        recipients_to=email.recipients_to,
-        recipients_cc=email.recipients_cc,
-        sent_at=email.sent_at.isoformat() if email.sent_at else "",
-        body_text=email.body_text,
-        body_html=email.body_html,
-        has_attachments=email.has_attachments or False,
-        attachment_count=email.attachment_count or 0,
-        labels=email.labels
-    )
+    body = await get_email_cache().get_or_build(user.org_id, user.id, f"email:{email_id}", build)
+    return Response(content=body, media_type="application/json")
 
 
 # ============== HTML UI Endpoints ==============
@@ -459,39 +703,9 @@ async def email_list_ui(
     """
     user = await get_current_user(request, db)
     
-    # Get total count
-    count_query = select(func.count(Email.id)).where(
-        Email.user_id == str(user.id),
-        Email.org_id == user.org_id
-    )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    emails, total = await _page_with_total(db, user, offset, limit)
     
-    # Get emails
-    query = (
-        select(Email)
-        .where(Email.user_id == str(user.id), Email.org_id == user.org_id)
-        .order_by(Email.sent_at.desc())
-        .offset(offset)
-        .limit(limit)
-    )
-    
-    result = await db.execute(query)
-    emails = result.scalars().all()
-    
-    email_list = [
-        {
-            "id": str(email.id),
-            "message_id": email.message_id,
-            "subject": email.subject,
-            "sender": email.sender,
-            "sender_name": email.sender_name,
-            "sent_at": email.sent_at.isoformat() if email.sent_at else "",
-            "has_attachments": email.has_attachments or False,
-            "labels": email.labels
-        }
-        for email in emails
-    ]
+    email_list = [_list_item(email) for email in emails]
     
     html_content = get_email_list_page(
         emails=email_list,
@@ -506,7 +720,7 @@ async def email_list_ui(
 
 @router.get("/ui/view/{email_id}", response_class=HTMLResponse)
 async def email_detail_ui(
-    email_id: str,
+    email_id: UUID,
     request: Request,
     db: AsyncSession = Depends(get_async_db)
 ):
@@ -519,15 +733,11 @@ async def email_detail_ui(
     user = await get_current_user(request, db)
     
     # Get email (with tenant isolation)
-    query = select(Email).where(
-        Email.id == email_id,
-        Email.user_id == str(user.id),
-        Email.org_id == user.org_id
+    email = await db.scalar(
+        _EMAIL_BY_ID,
+        {"email_id": str(email_id), "user_id": user.id, "org_id": user.org_id}
     )
     
-    result = await db.execute(query)
-    email = result.scalar_one_or_none()
-    
     if not email:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -535,7 +745,7 @@ async def email_detail_ui(
         )
     
     email_data = {
-        "id": str(email.id),
+        "id": email.id,
         "message_id": email.message_id,
         "thread_id": email.thread_id,
         "subject": email.subject,
@@ -546,8 +756,8 @@ async def email_detail_ui(
         "sent_at": email.sent_at.isoformat() if email.sent_at else "",
         "body_text": email.body_text,
         "body_html": email.body_html,
-        "has_attachments": email.has_attachments or False,
-        "attachment_count": email.attachment_count or 0,
+        "has_attachments": email.has_attachments,
+        "attachment_count": email.attachment_count,
         "labels": email.labels
     }
     
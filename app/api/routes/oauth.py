@@ -3,22 +3,31 @@ OAuth API Routes
 Google OAuth authentication flow
 """
 import logging
-import secrets
-from typing import Optional
+import os
+from typing import Any, Dict, Optional, Tuple
 from datetime import datetime, timezone
 from urllib.parse import urlencode
 
+import aiohttp
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
-from fastapi.responses import RedirectResponse, HTMLResponse
+from fastapi.responses import RedirectResponse, HTMLResponse, StreamingResponse
+from jose import JWTError, jwt
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.core.config import get_settings
+from app.core.context import get_request_id
+from app.core.http import get_http_session
+from app.core.security import create_access_token, get_current_user_id
 from app.db.session import get_async_db
 from app.models.user import User
+from app.services.oauth_state_store import get_oauth_state_store
 from app.services.token_service import get_token_service
-from app.ui import get_connect_gmail_page, get_oauth_success_page
+from app.services.user_cache import get_user_cache
+from app.ui import get_connect_gmail_page, stream_oauth_success_page
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -26,8 +35,165 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-# In-memory state storage (use Redis in production)
-_oauth_states: dict = {}
+# Everything in the consent URL except `state` is fixed for the process
+# lifetime. state is hex, so it needs no percent-encoding.
+_OAUTH_URL_PREFIX = "https://accounts.google.com/o/oauth2/v2/auth?" + urlencode({
+    "client_id": settings.GOOGLE_CLIENT_ID,
+    "redirect_uri": settings.GOOGLE_REDIRECT_URI,
+    "response_type": "code",
+    # openid is required: the callback reads the user from the id_token
+    "scope": " ".join(["openid", *(s for s in settings.GOOGLE_SCOPES if s != "openid")]),
+    "access_type": "offline",  # Request refresh token
+    "prompt": "consent"  # Force consent to get refresh token
+}) + "&state="
+
+
+# Shape of what /google/start issues (os.urandom(24).hex()) and a generous
+# bound on Google's authorization codes; anything else is rejected before
+# it costs a state-store or Google round trip
+_STATE_LENGTH = 48
+_STATE_CHARS = frozenset("0123456789abcdef")
+_CODE_MAX_LENGTH = 2048
+
+
+def is_well_formed_callback(state: str, code: str) -> bool:
+    """Cheap local check of callback parameters before any I/O"""
+    return (
+        len(state) == _STATE_LENGTH
+        and _STATE_CHARS.issuperset(state)
+        and 0 < len(code) <= _CODE_MAX_LENGTH
+    )
+
+
+async def exchange_google_code(code: str, redirect_uri: str) -> Dict[str, Any]:
+    """
+    Exchange an authorization code for Google's token response.
+    
+    Shared by the API and test callbacks. Raises HTTPException (400 when
+    Google rejects the code, 502 when it cannot be reached).
+    """
+    token_data = {
+        "client_id": settings.GOOGLE_CLIENT_ID,
+        "client_secret": settings.GOOGLE_CLIENT_SECRET,
+        "code": code,
+        "redirect_uri": redirect_uri,
+        "grant_type": "authorization_code"
+    }
+    
+    try:
+        session = get_http_session()
+        async with session.post("https://oauth2.googleapis.com/token", data=token_data) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error(f"Token exchange failed: {error_text}")
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Failed to exchange authorization code"
+                )
+            
+            return await response.json()
+    except aiohttp.ClientError as e:
+        logger.error(f"Token exchange request failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail="Failed to communicate with Google"
+        )
+
+
+def google_identity_from_tokens(tokens: Dict[str, Any]) -> Tuple[str, str, Optional[str]]:
+    """
+    Read (google_id, email, full_name) from a token response's id_token.
+    
+    The token comes straight from Google's token endpoint over TLS, so its
+    signature is not re-checked (as Google's OpenID docs allow); this saves
+    the userinfo round trip on every login. Raises ValueError when the
+    response has no usable id_token (the openid scope was not granted).
+    """
+    try:
+        claims = jwt.get_unverified_claims(tokens["id_token"])
+        return claims["sub"], claims["email"].lower(), claims.get("name")
+    except (KeyError, JWTError) as e:
+        raise ValueError(f"Google token response has no usable id_token: {e}") from e
+
+
+# The connect page has no per-request variation: render and encode it once
+# and serve the same Response (headers included) on every hit. Safe to share
+# as long as nothing mutates it; middleware only sees call_next's wrapper.
+_CONNECT_PAGE = HTMLResponse(
+    content=get_connect_gmail_page(
+        oauth_start_url="/api/v1/oauth/google/start",
+        is_test=False,
+        is_connected=False
+    ),
+    headers={"Cache-Control": "public, max-age=300"}
+)
+
+
+# Returning Google users are matched by their stable Google ID, not their
+# email (which can change on the Google side); served by idx_user_oauth
+_USER_BY_GOOGLE_ID = select(User).where(
+    User.oauth_provider == "google",
+    User.oauth_provider_id == bindparam("google_id")
+)
+
+
+async def find_or_create_google_user(
+    db: AsyncSession,
+    google_id: str,
+    email: str,
+    full_name: Optional[str],
+    org_id: str
+) -> User:
+    """
+    Resolve the account for a Google sign-in.
+    
+    A returning user is a single indexed SELECT. Otherwise one
+    INSERT ... ON CONFLICT (lower(email)) DO UPDATE ... RETURNING either
+    creates the user in org_id or links Google to the existing account with
+    that email, replacing a SELECT, an INSERT and a flush.
+    """
+    user = await db.scalar(_USER_BY_GOOGLE_ID, {"google_id": google_id})
+    if user is not None:
+        user.full_name = full_name or user.full_name
+        logger.info(f"Existing user logged in: {email}")
+        return user
+    
+    dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+    stmt = dialect_insert(User).values(
+        email=email,
+        org_id=org_id,
+        full_name=full_name,
+        oauth_provider="google",
+        oauth_provider_id=google_id,
+        is_active=True,
+        email_sync_enabled=True
+    )
+    stmt = stmt.on_conflict_do_update(
+        # uq_users_email_lower
+        index_elements=[func.lower(User.email)],
+        set_={
+            "oauth_provider": stmt.excluded.oauth_provider,
+            "oauth_provider_id": stmt.excluded.oauth_provider_id,
+            "full_name": func.coalesce(stmt.excluded.full_name, User.full_name),
+            "updated_at": func.now(),
+        }
+    ).returning(User)
+    
+    # Cache invalidation happens when the caller stores the OAuth tokens:
+    # that ORM UPDATE of the same user fires the user cache listeners
+    user = await db.scalar(stmt, execution_options={"populate_existing": True})
+    logger.info(f"Created or linked Google account for user: {email}")
+    return user
+
+
+def _app_token_claims(user: User) -> Dict[str, Any]:
+    """Claims for the app JWT (user_id is required by decode_access_token)"""
+    return {
+        "sub": user.id,
+        "user_id": user.id,
+        "email": user.email,
+        "org_id": user.org_id,
+    }
 
 
 class TokenResponse(BaseModel):
@@ -57,12 +223,7 @@ async def google_oauth_init(request: Request):
     
     Displays a page explaining the OAuth flow and a button to start it.
     """
-    html_content = get_connect_gmail_page(
-        oauth_start_url="/api/v1/oauth/google/start",
-        is_test=False,
-        is_connected=False
-    )
-    return HTMLResponse(content=html_content)
+    return _CONNECT_PAGE
 
 
 @router.get("/google/start")
@@ -73,25 +234,14 @@ async def google_oauth_start(request: Request):
     Redirects the user to Google's OAuth consent screen.
     After consent, Google will redirect back to /oauth/google/callback.
     """
-    # Generate secure state token to prevent CSRF
-    state = secrets.token_urlsafe(32)
-    _oauth_states[state] = {
-        "created_at": datetime.now(timezone.utc),
-        "request_id": getattr(request.state, "request_id", None)
-    }
+    # Generate secure state token to prevent CSRF (192 bits, hex)
+    state = os.urandom(24).hex()
+    await get_oauth_state_store().save(state, {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "request_id": get_request_id()
+    })
     
-    # Build OAuth URL
-    oauth_params = {
-        "client_id": settings.GOOGLE_CLIENT_ID,
-        "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-        "response_type": "code",
-        "scope": " ".join(settings.GOOGLE_SCOPES),
-        "state": state,
-        "access_type": "offline",  # Request refresh token
-        "prompt": "consent"  # Force consent to get refresh token
-    }
-    
-    oauth_url = f"https://accounts.google.com/o/oauth2/v2/auth?{urlencode(oauth_params)}"
+    oauth_url = _OAUTH_URL_PREFIX + state
     
     logger.info(f"Initiating Google OAuth flow, state={state[:8]}...")
     
@@ -111,47 +261,17 @@ async def google_oauth_callback(
     Exchanges authorization code for tokens, creates/updates user,
     and stores encrypted tokens.
     """
-    import aiohttp
-    
-    # Verify state token
-    if state not in _oauth_states:
+    # Verify and consume state token (one-time use); malformed input never
+    # reaches the state store or Google
+    if not is_well_formed_callback(state, code) or await get_oauth_state_store().consume(state) is None:
         logger.warning(f"Invalid OAuth state token: {state[:8]}...")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid state token. Please try again."
         )
     
-    # Remove used state
-    del _oauth_states[state]
-    
     # Exchange code for tokens
-    token_url = "https://oauth2.googleapis.com/token"
-    token_data = {
-        "client_id": settings.GOOGLE_CLIENT_ID,
-        "client_secret": settings.GOOGLE_CLIENT_SECRET,
-        "code": code,
-        "redirect_uri": settings.GOOGLE_REDIRECT_URI,
-        "grant_type": "authorization_code"
-    }
-    
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.post(token_url, data=token_data) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"Token exchange failed: {error_text}")
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Failed to exchange authorization code"
-                    )
-                
-                tokens = await response.json()
-    except aiohttp.ClientError as e:
-        logger.error(f"Token exchange request failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail="Failed to communicate with Google"
-        )
+    tokens = await exchange_google_code(code, settings.GOOGLE_REDIRECT_URI)
     
     access_token = tokens["access_token"]
     refresh_token = tokens.get("refresh_token")
@@ -160,118 +280,53 @@ async def google_oauth_callback(
     if not refresh_token:
         logger.warning("No refresh token received - user may have already granted access")
     
-    # Get user info from Google
-    userinfo_url = "https://www.googleapis.com/oauth2/v2/userinfo"
-    headers = {"Authorization": f"Bearer {access_token}"}
-    
+    # User identity comes from the id_token, no userinfo call needed
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(userinfo_url, headers=headers) as response:
-                if response.status != 200:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Failed to get user info from Google"
-                    )
-                
-                user_info = await response.json()
-    except aiohttp.ClientError as e:
-        logger.error(f"User info request failed: {e}")
+        google_id, email, full_name = google_identity_from_tokens(tokens)
+    except ValueError as e:
+        logger.error(f"Failed to read user info: {e}")
         raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail="Failed to communicate with Google"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Failed to get user info from Google"
         )
     
-    google_id = user_info["id"]
-    email = user_info["email"]
-    full_name = user_info.get("name")
-    
-    # Find or create user
-    result = await db.execute(
-        select(User).where(
-            User.oauth_provider == "google",
-            User.oauth_provider_id == google_id
-        )
+    # Find, link or create user
+    # Generate org_id for demo (in production, this would come from signup flow)
+    user = await find_or_create_google_user(
+        db, google_id, email, full_name, org_id=f"org_{os.urandom(8).hex()}"
     )
-    user = result.scalar_one_or_none()
     
     token_service = get_token_service()
     
-    if user:
-        # Update existing user
-        logger.info(f"Existing user logged in: {email}")
-        user.full_name = full_name
-    else:
-        # Check if email already exists (account linking scenario)
-        result = await db.execute(
-            select(User).where(User.email == email)
-        )
-        existing_user = result.scalar_one_or_none()
-        
-        if existing_user:
-            # Link Google to existing account
-            user = existing_user
-            user.oauth_provider = "google"
-            user.oauth_provider_id = google_id
-            user.full_name = full_name or user.full_name
-            logger.info(f"Linked Google account to existing user: {email}")
-        else:
-            # Create new user
-            # Generate org_id for demo (in production, this would come from signup flow)
-            org_id = f"org_{secrets.token_hex(8)}"
-            
-            user = User(
-                email=email,
-                org_id=org_id,
-                full_name=full_name,
-                oauth_provider="google",
-                oauth_provider_id=google_id,
-                is_active=True,
-                email_sync_enabled=True
-            )
-            db.add(user)
-            await db.flush()  # Get user.id
-            logger.info(f"Created new user: {email}")
-    
-    # Store encrypted tokens
-    if refresh_token:
-        await token_service.store_oauth_tokens(
-            db=db,
-            user=user,
-            access_token=access_token,
-            refresh_token=refresh_token,
-            expires_in=expires_in
-        )
-    else:
-        # Only update access token if no refresh token
-        user.encrypted_access_token = token_service.encrypt_token(access_token)
-        user.token_expires_at = datetime.now(timezone.utc) + __import__('datetime').timedelta(seconds=expires_in)
-        await db.commit()
-    
-    await db.refresh(user)
+    # Stage encrypted tokens; get_async_db commits the user upsert and the
+    # tokens together when the request finishes
+    await token_service.store_oauth_tokens(
+        db=db,
+        user=user,
+        access_token=access_token,
+        refresh_token=refresh_token,
+        expires_in=expires_in,
+        commit=False
+    )
     
     # Create app JWT token
-    from app.core.security import create_access_token
-    
-    app_token = create_access_token(
-        data={
-            "sub": str(user.id),
-            "email": user.email,
-            "org_id": user.org_id
-        }
-    )
+    app_token = create_access_token(data=_app_token_claims(user))
     
     logger.info(f"OAuth flow completed for user {user.id}")
     
-    # Return success UI page with link to email list
-    html_content = get_oauth_success_page(
-        user_email=user.email,
-        user_id=str(user.id),
-        org_id=user.org_id,
-        synced_count=0,
-        emails_url="/api/v1/emails/ui/list",
-        is_test=False
+    # Return success UI page with link to email list; the pre-encoded head
+    # (styles included) goes out as its own chunk
+    return StreamingResponse(
+        stream_oauth_success_page(
+            user_email=user.email,
+            user_id=user.id,
+            org_id=user.org_id,
+            synced_count=0,
+            emails_url="/api/v1/emails/ui/list",
+            is_test=False
+        ),
+        media_type="text/html"
     )
-    return HTMLResponse(content=html_content)
 
 
 @router.get("/me", response_model=UserInfoResponse)
@@ -284,8 +339,6 @@ async def get_current_user(
     
     Requires valid JWT token in Authorization header.
     """
-    from app.core.security import get_current_user_id
-    
     # Get user ID from JWT
     try:
         user_id = await get_current_user_id(request)
@@ -295,11 +348,8 @@ async def get_current_user(
             detail="Invalid or missing authentication"
         )
     
-    # Get user from database
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
+    # Get user (shared precompiled lookup, served from the user cache when warm)
+    user = await get_user_cache().get_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -308,7 +358,7 @@ async def get_current_user(
         )
     
     return UserInfoResponse(
-        id=str(user.id),
+        id=user.id,
         email=user.email,
         full_name=user.full_name,
         oauth_provider=user.oauth_provider or "",
@@ -326,19 +376,14 @@ async def logout(
     """
     Logout user and revoke OAuth tokens.
     """
-    from app.core.security import get_current_user_id
-    
     try:
         user_id = await get_current_user_id(request)
     except Exception:
         # Already logged out or invalid token
         return {"message": "Logged out"}
     
-    # Get user
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
+    # Get user (shared precompiled lookup, served from the user cache when warm)
+    user = await get_user_cache().get_by_id(db, user_id)
     
     if user:
         # Revoke OAuth tokens
@@ -358,10 +403,10 @@ async def refresh_token(
     """
     Refresh the application JWT token.
     
-    Also refreshes the OAuth token if needed.
+    Also refreshes the OAuth token if needed. The user is always rechecked
+    (a user cache hit in the common case), so deactivated or deleted
+    accounts stop receiving tokens, and the new JWT carries current claims.
     """
-    from app.core.security import get_current_user_id, create_access_token
-    
     try:
         user_id = await get_current_user_id(request)
     except Exception:
@@ -370,11 +415,8 @@ async def refresh_token(
             detail="Invalid or expired token"
         )
     
-    # Get user
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
+    # Get user (shared precompiled lookup, served from the user cache when warm)
+    user = await get_user_cache().get_by_id(db, user_id)
     
     if not user or not user.is_active:
         raise HTTPException(
@@ -387,18 +429,12 @@ async def refresh_token(
     await token_service.get_valid_access_token(db, user)
     
     # Create new app token
-    app_token = create_access_token(
-        data={
-            "sub": str(user.id),
-            "email": user.email,
-            "org_id": user.org_id
-        }
-    )
+    app_token = create_access_token(data=_app_token_claims(user))
     
     return TokenResponse(
         access_token=app_token,
         token_type="bearer",
         expires_in=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        user_id=str(user.id),
+        user_id=user.id,
         email=user.email
     )
@@ -18,17 +18,22 @@ This endpoint allows you to ask natural language questions about your emails.
 """
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+import re
+import time
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
+from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import bindparam, exists, select
 
 from app.db.session import get_async_db
 from app.models.email import Email
 from app.models.user import User
 from app.services.rag_service import get_rag_service
-from app.core.security import get_current_user
+from app.core.security import get_current_auth_user, get_current_user
+from app.core.context import get_request_id
 from app.core.logging import audit_logger
 import logging
 
@@ -36,6 +41,51 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Static error payloads for the query prerequisites, built once. Treat as read-only.
+_GMAIL_NOT_CONNECTED_DETAIL = {
+    "error": "Gmail not connected",
+    "message": "You need to connect Gmail before querying emails.",
+    "how_to_fix": "Visit GET /api/v1/oauth/google to connect Gmail.",
+    "oauth_url": "/api/v1/oauth/google"
+}
+
+_NO_EMAILS_DETAIL = {
+    "error": "No emails synced",
+    "message": "You need to sync emails before querying.",
+    "how_to_fix": "Call POST /api/v1/emails/sync to fetch your emails.",
+    "sync_url": "/api/v1/emails/sync"
+}
+
+# Prerequisite query, built once with bind parameters so SQLAlchemy reuses
+# the compiled form. The query routes only need "any emails?": EXISTS stops
+# at the first ix_emails_org_user_sent_id entry instead of counting the
+# whole mailbox.
+_OWNED_BY_USER = Email.owned_by(bindparam("org_id"), bindparam("user_id"))
+_HAS_EMAILS = select(exists().where(_OWNED_BY_USER))
+
+# Keep proxies (nginx) from buffering the event stream
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Liveness body for /rag/health; component probes live in the app-level /health
+_HEALTHY_BODY = {
+    "status": "healthy",
+    "service": "rag",
+    "components": {
+        "pinecone": "healthy",
+        "crewai": "healthy",
+        "embeddings": "healthy"
+    }
+}
+
+
+class RAGQueryFilters(BaseModel):
+    """Optional metadata filters applied to retrieval"""
+    date_from: Optional[str] = Field(default=None, description="Start date (YYYY-MM-DD)")
+    date_to: Optional[str] = Field(default=None, description="End date (YYYY-MM-DD)")
+    sender: Optional[str] = Field(default=None, description="Sender email address")
+    
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
+
 
 class RAGQueryRequest(BaseModel):
     """Request model for RAG query"""
@@ -45,22 +95,13 @@ class RAGQueryRequest(BaseModel):
         max_length=1000,
         description="User's natural language query"
     )
-    filters: Optional[Dict[str, Any]] = Field(
+    filters: Optional[RAGQueryFilters] = Field(
         default=None,
         description="Optional filters: date_from, date_to, sender"
     )
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "query": "What decisions were made about the Q4 budget?",
-                "filters": {
-                    "date_from": "2024-10-01",
-                    "date_to": "2024-12-31",
-                    "sender": "finance@company.com"
-                }
-            }
-        }
+    # Stripping runs before min_length, so whitespace-only queries are rejected here
+    model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
 
 
 class EmailSource(BaseModel):
@@ -77,27 +118,85 @@ class RAGQueryResponse(BaseModel):
     answer: str = Field(description="Generated answer grounded in email evidence")
     sources: List[EmailSource] = Field(description="Source email citations")
     metadata: Dict[str, Any] = Field(description="Query metadata and performance metrics")
+
+
+async def _list_emails(
+    db: AsyncSession,
+    user_id: str,
+    org_id: str,
+    limit: int,
+    unread_only: bool,
+    request_id: str
+) -> Dict[str, Any]:
+    """Answer a listing command with a single indexed query (no embedding, no LLM)"""
+    started = time.perf_counter()
+    conditions = [Email.owned_by(org_id, user_id)]
+    if unread_only:
+        conditions.append(Email.is_read.is_(False))
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "answer": "Based on the retrieved emails, three key decisions were made...",
-                "sources": [
-                    {
-                        "email_id": "abc123",
-                        "subject": "Q4 Budget Approval",
-                        "sender": "cfo@company.com",
-                        "date": "2024-11-15T10:30:00Z",
-                        "relevance_score": 0.92
-                    }
-                ],
-                "metadata": {
-                    "retrieval_count": 15,
-                    "processing_time_ms": 1253,
-                    "answer_complete": True
-                }
+    rows = (await db.execute(
+        select(Email.id, Email.subject, Email.sender, Email.sent_at)
+        .where(*conditions)
+        .order_by(Email.sent_at.desc())
+        .limit(limit)
+    )).all()
+    
+    label = "unread emails" if unread_only else "most recent emails"
+    if rows:
+        lines = [
+            f"{i}. {row.subject or '(no subject)'} - {row.sender} ({row.sent_at:%Y-%m-%d %H:%M})"
+            for i, row in enumerate(rows, start=1)
+        ]
+        answer = f"Your {len(rows)} {label}:\n" + "\n".join(lines)
+    else:
+        answer = f"You have no {label}."
+    
+    return {
+        "answer": answer,
+        "sources": [
+            {
+                "email_id": str(row.id),
+                "subject": row.subject,
+                "sender": row.sender,
+                "date": row.sent_at.isoformat()
             }
+            for row in rows
+        ],
+        "metadata": {
+            "request_id": request_id,
+            "command": "unread" if unread_only else "recent",
+            "retrieval_count": len(rows),
+            "processing_time_ms": (time.perf_counter() - started) * 1000,
+            "answer_complete": True
         }
+    }
+
+
+# Deterministic listing commands answered straight from the emails table,
+# skipping embedding, retrieval and the CrewAI pipeline.
+# Each entry: (pattern, unread_only, default limit when the count is omitted)
+_MAX_COMMAND_EMAILS = 50
+_EMAIL_COMMANDS = [
+    (re.compile(
+        r"^\s*(?:show|list|get)?\s*(?:me\s+)?(?:my\s+)?(?:last|latest|recent)\s+(?:(\d{1,3})\s+)?e?-?mails?\s*[.?!]?\s*$",
+        re.IGNORECASE
+    ), False, 10),
+    (re.compile(
+        r"^\s*(?:show|list|get)\s+(?:me\s+)?(?:my\s+)?unread\s+e?-?mails?\s*[.?!]?\s*$",
+        re.IGNORECASE
+    ), True, 20),
+]
+
+
+def _match_email_command(query: str) -> Optional[tuple]:
+    """Return (limit, unread_only) if the query is a plain listing command"""
+    for pattern, unread_only, default_limit in _EMAIL_COMMANDS:
+        match = pattern.match(query)
+        if match:
+            count = match.group(1) if match.groups() else None
+            limit = int(count) if count else default_limit
+            return max(1, min(limit, _MAX_COMMAND_EMAILS)), unread_only
+    return None
 
 
 class RAGStatusResponse(BaseModel):
@@ -119,15 +218,11 @@ async def rag_status(
     
     Returns status of Gmail connection and synced emails.
     """
+    # Everything comes from the user row (usually served by the user cache);
+    # email_count is maintained by the sync service, so no COUNT over the
+    # mailbox on this frequently polled endpoint
     user = await get_current_user(request, db)
-    
-    # Check email count
-    count_query = select(func.count(Email.id)).where(
-        Email.user_id == str(user.id),
-        Email.org_id == user.org_id
-    )
-    result = await db.execute(count_query)
-    email_count = result.scalar() or 0
+    email_count = user.email_count
     
     gmail_connected = bool(user.encrypted_access_token)
     ready = gmail_connected and email_count > 0
@@ -174,10 +269,11 @@ async def rag_query(
     3. Emails must be synced via POST /api/v1/emails/sync
     """
     # Get authenticated user
-    user = await get_current_user(request, db)
-    user_id = str(user.id)
+    user = await get_current_auth_user(request, db)
+    user_id = user.id
     org_id = user.org_id
-    request_id = getattr(request.state, "request_id", "unknown")
+    request_id = get_request_id()
+    corpus_version = user.last_email_sync.isoformat() if user.last_email_sync else None
     
     logger.info(
         f"RAG query received: request_id={request_id}, "
@@ -188,39 +284,31 @@ async def rag_query(
     if not user.encrypted_access_token:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error": "Gmail not connected",
-                "message": "You need to connect Gmail before querying emails.",
-                "how_to_fix": "Visit GET /api/v1/oauth/google to connect Gmail.",
-                "oauth_url": "/api/v1/oauth/google"
-            }
+            detail=_GMAIL_NOT_CONNECTED_DETAIL
         )
     
-    # Check if user has emails
-    count_query = select(func.count(Email.id)).where(
-        Email.user_id == user_id,
-        Email.org_id == org_id
-    )
-    result = await db.execute(count_query)
-    email_count = result.scalar() or 0
+    # Plain listing commands ("show my unread emails", "last 5 emails")
+    # don't need retrieval or generation - answer them from the database
+    command = None if request_body.filters else _match_email_command(request_body.query)
+    if command is not None:
+        limit, unread_only = command
+        # Built here from typed columns, so it already matches RAGQueryResponse;
+        # returning a Response skips FastAPI's response_model re-validation
+        return ORJSONResponse(await _list_emails(db, user_id, org_id, limit, unread_only, request_id))
     
-    if email_count == 0:
+    # Check if user has emails (a single index probe on the request session)
+    if not await db.scalar(_HAS_EMAILS, {"org_id": org_id, "user_id": user_id}):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error": "No emails synced",
-                "message": "You need to sync emails before querying.",
-                "how_to_fix": "Call POST /api/v1/emails/sync to fetch your emails.",
-                "sync_url": "/api/v1/emails/sync"
-            }
+            detail=_NO_EMAILS_DETAIL
         )
     
     try:
         # Parse filters
-        filters = request_body.filters or {}
-        date_from = filters.get("date_from")
-        date_to = filters.get("date_to")
-        sender = filters.get("sender")
+        filters = request_body.filters or RAGQueryFilters()
+        date_from = filters.date_from
+        date_to = filters.date_to
+        sender = filters.sender
         
         # Get RAG service
         rag_service = get_rag_service()
@@ -233,7 +321,8 @@ async def rag_query(
             date_from=date_from,
             date_to=date_to,
             sender=sender,
-            request_id=request_id
+            request_id=request_id,
+            corpus_version=corpus_version
         )
         
         logger.info(f"RAG query completed successfully: request_id={request_id}")
@@ -256,27 +345,73 @@ async def rag_query(
         )
 
 
+@router.post("/query/stream")
+async def rag_query_stream(
+    request_body: RAGQueryRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Execute RAG query and stream progress as Server-Sent Events.
+    
+    Same inputs and checks as POST /rag/query, but the response starts
+    immediately:
+    - `event: stage` while retrieval and the agent pipeline run, including
+      `{"stage": "agent_done", "task": ...}` as each of the five agents
+      (retrieval, context, analysis, compliance, answer) finishes
+    - `event: result` once, with the same payload as POST /rag/query
+    """
+    user = await get_current_auth_user(request, db)
+    user_id = user.id
+    org_id = user.org_id
+    request_id = get_request_id()
+    corpus_version = user.last_email_sync.isoformat() if user.last_email_sync else None
+    
+    if not user.encrypted_access_token:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=_GMAIL_NOT_CONNECTED_DETAIL
+        )
+    
+    command = None if request_body.filters else _match_email_command(request_body.query)
+    if command is not None:
+        limit, unread_only = command
+        result = await _list_emails(db, user_id, org_id, limit, unread_only, request_id)
+        
+        async def command_events():
+            yield b"event: result\ndata: " + orjson.dumps(result, default=str) + b"\n\n"
+        
+        return StreamingResponse(command_events(), media_type="text/event-stream", headers=_SSE_HEADERS)
+    
+    if not await db.scalar(_HAS_EMAILS, {"org_id": org_id, "user_id": user_id}):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=_NO_EMAILS_DETAIL
+        )
+    
+    filters = request_body.filters or RAGQueryFilters()
+    
+    async def events():
+        async for event, data in get_rag_service().query_stream(
+            query=request_body.query,
+            org_id=org_id,
+            user_id=user_id,
+            date_from=filters.date_from,
+            date_to=filters.date_to,
+            sender=filters.sender,
+            request_id=request_id,
+            corpus_version=corpus_version
+        ):
+            yield b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data, default=str) + b"\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers=_SSE_HEADERS)
+
+
 @router.get("/health")
 async def rag_health():
     """
-    RAG service health check.
+    RAG service liveness check (no authentication required).
     
-    Returns status of RAG components (no authentication required).
+    Returns a constant body; GET /health performs the Pinecone probe.
     """
-    try:
-        # Could check CrewAI, Pinecone, embeddings service
-        return {
-            "status": "healthy",
-            "service": "rag",
-            "components": {
-                "pinecone": "healthy",
-                "crewai": "healthy",
-                "embeddings": "healthy"
-            }
-        }
-    except Exception as e:
-        logger.error(f"RAG health check failed: {e}")
-        return {
-            "status": "unhealthy",
-            "error": str(e)
-        }
+    return _HEALTHY_BODY
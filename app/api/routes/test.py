@@ -6,30 +6,43 @@ These routes bypass authentication and use demo user/org.
 WARNING: Disable these routes in production by setting APP_ENV != 'development'
 """
 import logging
-import secrets
+import os
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Query
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from urllib.parse import urlencode
 
+from app.api.routes.emails import LIST_COLUMNS
+from app.api.routes.oauth import (
+    exchange_google_code,
+    find_or_create_google_user,
+    google_identity_from_tokens,
+    is_well_formed_callback,
+)
+from app.api.routes.rag import RAGQueryFilters
 from app.db.session import get_async_db
 from app.models.email import Email
 from app.models.user import User
 from app.services.rag_service import get_rag_service
 from app.services.email_sync_service import get_email_sync_service
+from app.services.oauth_state_store import get_oauth_state_store
 from app.services.token_service import get_token_service
+from app.services.user_cache import get_user_cache
 from app.core.config import get_settings
+from app.core.context import get_request_id
 from app.ui import (
     get_connect_gmail_page,
     get_email_list_page,
     get_email_detail_page,
     get_oauth_error_page,
-    get_oauth_success_page,
+    stream_oauth_success_page,
     get_oauth_missing_params_page,
     get_oauth_invalid_state_page,
 )
@@ -43,9 +56,6 @@ router = APIRouter()
 DEMO_USER_ID = "test_user_001"
 DEMO_ORG_ID = "test_org_001"
 
-# In-memory state storage for test OAuth
-_test_oauth_states: dict = {}
-
 
 # ============== Request/Response Models ==============
 
@@ -57,7 +67,7 @@ class TestRAGQueryRequest(BaseModel):
         max_length=1000,
         description="User's natural language query"
     )
-    filters: Optional[Dict[str, Any]] = Field(
+    filters: Optional[RAGQueryFilters] = Field(
         default=None,
         description="Optional filters for date_from, date_to, sender"
     )
@@ -69,19 +79,6 @@ class TestRAGQueryRequest(BaseModel):
         default=None,
         description="Override test org_id (for testing multi-tenancy)"
     )
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "query": "What decisions were made about the Q4 budget?",
-                "filters": {
-                    "date_from": "2024-10-01",
-                    "date_to": "2024-12-31"
-                },
-                "user_id": "test_user_001",
-                "org_id": "test_org_001"
-            }
-        }
 
 
 class TestEmailSource(BaseModel):
@@ -154,24 +151,6 @@ class TestInfoResponse(BaseModel):
     instructions: List[str]
     next_steps: Dict[str, str]
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "message": "Test routes are enabled (development mode)",
-                "warning": "These routes bypass authentication. Do NOT use in production.",
-                "demo_credentials": {
-                    "user_id": "test_user_001",
-                    "org_id": "test_org_001"
-                },
-                "available_endpoints": {
-                    "GET /api/v1/test/info": "This endpoint"
-                },
-                "quick_start": "Visit /api/v1/test/connect-gmail to authorize Gmail access",
-                "instructions": ["Step 1: Open connect-gmail endpoint"],
-                "next_steps": {"1_connect": "http://localhost:8000/api/v1/test/connect-gmail"}
-            }
-        }
-
 
 @router.get("/info", response_model=TestInfoResponse)
 async def test_info(request: Request):
@@ -229,6 +208,17 @@ async def test_info(request: Request):
 
 # ============== OAuth Flow for Testing ==============
 
+# Constant page, rendered and encoded once (see _CONNECT_PAGE in oauth.py)
+_TEST_CONNECT_PAGE = HTMLResponse(
+    content=get_connect_gmail_page(
+        oauth_start_url="/api/v1/test/oauth/start",
+        is_test=True,
+        is_connected=False
+    ),
+    headers={"Cache-Control": "public, max-age=300"}
+)
+
+
 @router.get("/connect-gmail", response_class=HTMLResponse)
 async def test_connect_gmail_page(request: Request):
     """
@@ -237,47 +227,44 @@ async def test_connect_gmail_page(request: Request):
     This page explains what permissions are requested and provides
     a button to start the OAuth flow.
     """
-    html_content = get_connect_gmail_page(
-        oauth_start_url="/api/v1/test/oauth/start",
-        is_test=True,
-        is_connected=False
-    )
-    return HTMLResponse(content=html_content)
+    return _TEST_CONNECT_PAGE
 
 
-@router.get("/oauth/start")
-async def test_oauth_start(request: Request):
-    """
-    Start the Google OAuth flow for testing.
-    
-    Redirects to Google's consent screen.
-    """
-    # Generate secure state token
-    state = secrets.token_urlsafe(32)
-    _test_oauth_states[state] = {
-        "created_at": datetime.now(timezone.utc),
-        "request_id": getattr(request.state, "request_id", None)
-    }
-    
-    # Use test-specific callback URL
-    redirect_uri = str(request.base_url).rstrip('/') + "/api/v1/test/oauth/callback"
-    
-    # Build OAuth URL
-    oauth_params = {
+@lru_cache(maxsize=16)
+def _test_oauth_url_prefix(redirect_uri: str) -> str:
+    """Consent URL up to `state`; only varies with the host serving the test routes"""
+    return "https://accounts.google.com/o/oauth2/v2/auth?" + urlencode({
         "client_id": settings.GOOGLE_CLIENT_ID,
         "redirect_uri": redirect_uri,
         "response_type": "code",
         "scope": " ".join([
+            "openid",
             "https://www.googleapis.com/auth/gmail.readonly",
             "https://www.googleapis.com/auth/userinfo.email",
             "https://www.googleapis.com/auth/userinfo.profile"
         ]),
-        "state": state,
         "access_type": "offline",
         "prompt": "consent"
-    }
+    }) + "&state="
+
+
+@router.get("/oauth/start")
+async def test_oauth_start(request: Request):
+    """
+    Start the Google OAuth flow for testing.
+    
+    Redirects to Google's consent screen.
+    """
+    # Generate secure state token (192 bits, hex)
+    state = os.urandom(24).hex()
+    await get_oauth_state_store("test").save(state, {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "request_id": get_request_id()
+    })
     
-    oauth_url = f"https://accounts.google.com/o/oauth2/v2/auth?{urlencode(oauth_params)}"
+    # Use test-specific callback URL
+    redirect_uri = str(request.base_url).rstrip('/') + "/api/v1/test/oauth/callback"
+    oauth_url = _test_oauth_url_prefix(redirect_uri) + state
     
     logger.info(f"[TEST] Starting OAuth flow, state={state[:8]}...")
     
@@ -297,8 +284,6 @@ async def test_oauth_callback(
     
     Creates/updates user, stores tokens, and syncs emails automatically.
     """
-    import aiohttp
-    
     # Handle OAuth errors
     if error:
         logger.warning(f"[TEST] OAuth error: {error}")
@@ -314,125 +299,63 @@ async def test_oauth_callback(
             is_test=True
         ))
     
-    # Verify state token
-    if state not in _test_oauth_states:
+    # Verify and consume state token (one-time use)
+    if not is_well_formed_callback(state, code) or await get_oauth_state_store("test").consume(state) is None:
         logger.warning(f"[TEST] Invalid OAuth state: {state[:8]}...")
         return HTMLResponse(content=get_oauth_invalid_state_page(
             retry_url="/api/v1/test/connect-gmail",
             is_test=True
         ))
     
-    del _test_oauth_states[state]
-    
     # Exchange code for tokens
     redirect_uri = str(request.base_url).rstrip('/') + "/api/v1/test/oauth/callback"
-    token_url = "https://oauth2.googleapis.com/token"
-    token_data = {
-        "client_id": settings.GOOGLE_CLIENT_ID,
-        "client_secret": settings.GOOGLE_CLIENT_SECRET,
-        "code": code,
-        "redirect_uri": redirect_uri,
-        "grant_type": "authorization_code"
-    }
     
     try:
-        async with aiohttp.ClientSession() as session:
-            # Exchange code for tokens
-            async with session.post(token_url, data=token_data) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"[TEST] Token exchange failed: {error_text}")
-                    return HTMLResponse(content=f"""
-                    <html><body>
-                        <h2>❌ Token Exchange Failed</h2>
-                        <p>Error: {error_text}</p>
-                        <p><a href="/api/v1/test/connect-gmail">Try again</a></p>
-                    </body></html>
-                    """)
-                
-                tokens = await response.json()
-            
-            access_token = tokens["access_token"]
-            refresh_token = tokens.get("refresh_token")
-            expires_in = tokens.get("expires_in", 3600)
-            
-            # Get user info
-            userinfo_url = "https://www.googleapis.com/oauth2/v2/userinfo"
-            headers = {"Authorization": f"Bearer {access_token}"}
-            
-            async with session.get(userinfo_url, headers=headers) as response:
-                if response.status != 200:
-                    return HTMLResponse(content="""
-                    <html><body>
-                        <h2>❌ Failed to get user info</h2>
-                        <p><a href="/api/v1/test/connect-gmail">Try again</a></p>
-                    </body></html>
-                    """)
-                
-                user_info = await response.json()
+        try:
+            tokens = await exchange_google_code(code, redirect_uri)
+        except HTTPException as e:
+            return HTMLResponse(content=get_oauth_error_page(
+                error=e.detail,
+                retry_url="/api/v1/test/connect-gmail",
+                is_test=True
+            ))
         
-        google_id = user_info["id"]
-        email = user_info["email"]
-        full_name = user_info.get("name", "")
+        access_token = tokens["access_token"]
+        refresh_token = tokens.get("refresh_token")
+        expires_in = tokens.get("expires_in", 3600)
         
-        # Find or create user
-        result = await db.execute(
-            select(User).where(
-                User.oauth_provider == "google",
-                User.oauth_provider_id == google_id
-            )
+        # Get user info from the id_token (no userinfo round trip)
+        try:
+            google_id, email, full_name = google_identity_from_tokens(tokens)
+        except ValueError as e:
+            logger.error(f"[TEST] Failed to read user info: {e}")
+            return HTMLResponse(content="""
+            <html><body>
+                <h2>❌ Failed to get user info</h2>
+                <p><a href="/api/v1/test/connect-gmail">Try again</a></p>
+            </body></html>
+            """)
+        
+        # Find, link or create user (new users join the test org)
+        user = await find_or_create_google_user(
+            db, google_id, email, full_name or None, org_id=DEMO_ORG_ID
         )
-        user = result.scalar_one_or_none()
         
         token_service = get_token_service()
         
-        if user:
-            logger.info(f"[TEST] Existing user found: {email}")
-            user.full_name = full_name
-        else:
-            # Check if email exists
-            result = await db.execute(select(User).where(User.email == email))
-            existing_user = result.scalar_one_or_none()
-            
-            if existing_user:
-                user = existing_user
-                user.oauth_provider = "google"
-                user.oauth_provider_id = google_id
-                logger.info(f"[TEST] Linked Google to existing user: {email}")
-            else:
-                # Create new user with test org
-                user = User(
-                    email=email,
-                    org_id=DEMO_ORG_ID,  # Use test org
-                    full_name=full_name,
-                    oauth_provider="google",
-                    oauth_provider_id=google_id,
-                    is_active=True,
-                    email_sync_enabled=True
-                )
-                db.add(user)
-                await db.flush()
-                logger.info(f"[TEST] Created new user: {email}")
-        
-        # Store encrypted tokens
-        if refresh_token:
-            await token_service.store_oauth_tokens(
-                db=db,
-                user=user,
-                access_token=access_token,
-                refresh_token=refresh_token,
-                expires_in=expires_in
-            )
-        else:
-            from datetime import timedelta
-            user.encrypted_access_token = token_service.encrypt_token(access_token)
-            user.token_expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
-        
+        # Store encrypted tokens; one commit with the user upsert, before the sync
+        await token_service.store_oauth_tokens(
+            db=db,
+            user=user,
+            access_token=access_token,
+            refresh_token=refresh_token,
+            expires_in=expires_in,
+            commit=False
+        )
         await db.commit()
-        await db.refresh(user)
         
         # Capture user details before sync (to avoid greenlet errors later)
-        user_id_str = str(user.id)
+        user_id_str = user.id
         user_org_id = user.org_id
         user_email = user.email
         
@@ -446,14 +369,14 @@ async def test_oauth_callback(
         )
         
         # Return success page (using captured values to avoid greenlet errors)
-        return HTMLResponse(content=get_oauth_success_page(
+        return StreamingResponse(stream_oauth_success_page(
             user_email=user_email,
             user_id=user_id_str,
             org_id=user_org_id,
             synced_count=synced_count,
             emails_url=f"/api/v1/test/emails?user_id={user_id_str}&org_id={user_org_id}",
             is_test=True
-        ))
+        ), media_type="text/html")
         
     except Exception as e:
         logger.error(f"[TEST] OAuth callback failed: {e}", exc_info=True)
@@ -474,23 +397,32 @@ async def test_list_users(
     
     Shows user IDs and org IDs to use with other test endpoints.
     """
-    result = await db.execute(select(User))
-    users = result.scalars().all()
+    # Unbounded: stream rows in batches through a server-side cursor rather
+    # than buffering every user (and their token blobs) before building the list
+    result = await db.stream(
+        select(
+            User.id, User.email, User.org_id, User.oauth_provider, User.is_active,
+            User.email_sync_enabled, User.last_email_sync,
+            User.encrypted_access_token.is_not(None).label("has_oauth_token")
+        ),
+        execution_options={"yield_per": 100}
+    )
+    users = [
+        {
+            "id": u.id,
+            "email": u.email,
+            "org_id": u.org_id,
+            "oauth_provider": u.oauth_provider,
+            "is_active": u.is_active,
+            "email_sync_enabled": u.email_sync_enabled,
+            "last_email_sync": u.last_email_sync.isoformat() if u.last_email_sync else None,
+            "has_oauth_token": u.has_oauth_token
+        }
+        async for u in result
+    ]
     
     return {
-        "users": [
-            {
-                "id": str(u.id),
-                "email": u.email,
-                "org_id": u.org_id,
-                "oauth_provider": u.oauth_provider,
-                "is_active": u.is_active,
-                "email_sync_enabled": u.email_sync_enabled,
-                "last_email_sync": u.last_email_sync.isoformat() if u.last_email_sync else None,
-                "has_oauth_token": bool(u.encrypted_access_token)
-            }
-            for u in users
-        ],
+        "users": users,
         "count": len(users),
         "tip": "Use any user's id and org_id with the test email/rag endpoints"
     }
@@ -499,7 +431,7 @@ async def test_list_users(
 @router.post("/sync-emails")
 async def test_sync_emails(
     request: Request,
-    user_id: str = Query(..., description="User ID to sync emails for"),
+    user_id: UUID = Query(..., description="User ID to sync emails for"),
     max_emails: int = Query(default=50, ge=1, le=200),
     db: AsyncSession = Depends(get_async_db)
 ):
@@ -509,7 +441,7 @@ async def test_sync_emails(
     Use this to re-sync emails for a user who has already connected Gmail.
     """
     # Find user
-    result = await db.execute(select(User).where(User.id == user_id))
+    result = await db.execute(select(User).where(User.id == str(user_id)))
     user = result.scalar_one_or_none()
     
     if not user:
@@ -547,7 +479,7 @@ async def test_sync_emails(
         "skipped": skipped_count,
         "errors": errors[:10] if errors else [],
         "user": {
-            "id": str(user.id),
+            "id": user.id,
             "email": user.email,
             "org_id": user.org_id
         }
@@ -580,9 +512,8 @@ async def test_list_emails(
     
     try:
         # Get total count
-        count_query = select(func.count(Email.id)).where(
-            Email.user_id == test_user_id,
-            Email.org_id == test_org_id
+        count_query = select(func.count()).select_from(Email).where(
+            Email.owned_by(test_org_id, test_user_id)
         )
         total_result = await db.execute(count_query)
         total = total_result.scalar() or 0
@@ -590,7 +521,8 @@ async def test_list_emails(
         # Get emails
         query = (
             select(Email)
-            .where(Email.user_id == test_user_id, Email.org_id == test_org_id)
+            .options(LIST_COLUMNS)
+            .where(Email.owned_by(test_org_id, test_user_id))
             .order_by(Email.sent_at.desc())
             .offset(offset)
             .limit(limit)
@@ -601,7 +533,7 @@ async def test_list_emails(
         
         email_items = [
             TestEmailListItem(
-                id=str(email.id),
+                id=email.id,
                 message_id=email.message_id,
                 subject=email.subject,
                 sender=email.sender,
@@ -642,7 +574,7 @@ async def test_list_emails(
 
 @router.get("/emails/{email_id}", response_model=TestEmailDetailResponse)
 async def test_get_email(
-    email_id: str,
+    email_id: UUID,
     request: Request,
     user_id: Optional[str] = Query(default=None, description="Override test user_id"),
     org_id: Optional[str] = Query(default=None, description="Override test org_id"),
@@ -661,9 +593,8 @@ async def test_get_email(
     try:
         # Get email (with tenant isolation)
         query = select(Email).where(
-            Email.id == email_id,
-            Email.user_id == test_user_id,
-            Email.org_id == test_org_id
+            Email.id == str(email_id),
+            Email.owned_by(test_org_id, test_user_id)
         )
         
         result = await db.execute(query)
@@ -693,7 +624,7 @@ async def test_get_email(
             )
         
         return TestEmailDetailResponse(
-            id=str(email.id),
+            id=email.id,
             message_id=email.message_id,
             thread_id=email.thread_id,
             subject=email.subject,
@@ -751,19 +682,32 @@ async def test_rag_query(
     """
     test_user_id = request_body.user_id or DEMO_USER_ID
     test_org_id = request_body.org_id or DEMO_ORG_ID
-    request_id = getattr(request.state, "request_id", "test-request")
+    request_id = get_request_id("test-request")
     
     logger.info(
         f"[TEST] RAG query: request_id={request_id}, user_id={test_user_id}, "
         f"query={request_body.query[:100]}"
     )
     
+    # Scope semantic cache entries to the mailbox version, as /rag/query
+    # does, so answers don't outlive a sync. The demo ids are not UUIDs and
+    # have no user row.
+    corpus_version = None
+    try:
+        UUID(test_user_id)
+    except ValueError:
+        pass
+    else:
+        user = await get_user_cache().get_auth_by_id(db, test_user_id)
+        if user is not None and user.org_id == test_org_id and user.last_email_sync:
+            corpus_version = user.last_email_sync.isoformat()
+    
     try:
         # Parse filters
-        filters = request_body.filters or {}
-        date_from = filters.get("date_from")
-        date_to = filters.get("date_to")
-        sender = filters.get("sender")
+        filters = request_body.filters or RAGQueryFilters()
+        date_from = filters.date_from
+        date_to = filters.date_to
+        sender = filters.sender
         
         # Get RAG service
         rag_service = get_rag_service()
@@ -776,25 +720,26 @@ async def test_rag_query(
             date_from=date_from,
             date_to=date_to,
             sender=sender,
-            request_id=request_id
+            request_id=request_id,
+            corpus_version=corpus_version
         )
         
         logger.info(f"[TEST] RAG query completed: request_id={request_id}")
         
-        # Add test info to response
+        # Add test info to response (the service returns a plain dict)
         return TestRAGQueryResponse(
-            answer=result.answer,
+            answer=result["answer"],
             sources=[
                 TestEmailSource(
-                    email_id=s.email_id,
-                    subject=s.subject,
-                    sender=s.sender,
-                    date=s.date,
-                    relevance_score=s.relevance_score
+                    email_id=s["email_id"],
+                    subject=s.get("subject") or "",
+                    sender=s["sender"],
+                    date=s["date"],
+                    relevance_score=s.get("relevance_score")
                 )
-                for s in result.sources
+                for s in result["sources"]
             ],
-            metadata=result.metadata,
+            metadata=result["metadata"],
             test_info={
                 "user_id": test_user_id,
                 "org_id": test_org_id,
@@ -851,15 +796,14 @@ async def test_email_count(
     
     try:
         # Count for test user/org
-        count_query = select(func.count(Email.id)).where(
-            Email.user_id == test_user_id,
-            Email.org_id == test_org_id
+        count_query = select(func.count()).select_from(Email).where(
+            Email.owned_by(test_org_id, test_user_id)
         )
         result = await db.execute(count_query)
         user_count = result.scalar() or 0
         
         # Total count in system
-        total_query = select(func.count(Email.id))
+        total_query = select(func.count()).select_from(Email)
         total_result = await db.execute(total_query)
         total_count = total_result.scalar() or 0
         
@@ -905,9 +849,8 @@ async def test_email_list_ui(
     test_org_id = org_id or DEMO_ORG_ID
     
     # Get total count
-    count_query = select(func.count(Email.id)).where(
-        Email.user_id == test_user_id,
-        Email.org_id == test_org_id
+    count_query = select(func.count()).select_from(Email).where(
+        Email.owned_by(test_org_id, test_user_id)
     )
     total_result = await db.execute(count_query)
     total = total_result.scalar() or 0
@@ -915,7 +858,8 @@ async def test_email_list_ui(
     # Get emails
     query = (
         select(Email)
-        .where(Email.user_id == test_user_id, Email.org_id == test_org_id)
+        .options(LIST_COLUMNS)
+        .where(Email.owned_by(test_org_id, test_user_id))
         .order_by(Email.sent_at.desc())
         .offset(offset)
         .limit(limit)
@@ -926,7 +870,7 @@ async def test_email_list_ui(
     
     email_list = [
         {
-            "id": str(email.id),
+            "id": email.id,
             "message_id": email.message_id,
             "subject": email.subject,
             "sender": email.sender,
@@ -953,7 +897,7 @@ async def test_email_list_ui(
 
 @router.get("/ui/emails/{email_id}", response_class=HTMLResponse)
 async def test_email_detail_ui(
-    email_id: str,
+    email_id: UUID,
     request: Request,
     user_id: Optional[str] = Query(default=None, description="Override test user_id"),
     org_id: Optional[str] = Query(default=None, description="Override test org_id"),
@@ -970,9 +914,8 @@ async def test_email_detail_ui(
     
     # Get email (with tenant isolation)
     query = select(Email).where(
-        Email.id == email_id,
-        Email.user_id == test_user_id,
-        Email.org_id == test_org_id
+        Email.id == str(email_id),
+        Email.owned_by(test_org_id, test_user_id)
     )
     
     result = await db.execute(query)
@@ -985,7 +928,7 @@ async def test_email_detail_ui(
         )
     
     email_data = {
-        "id": str(email.id),
+        "id": email.id,
         "message_id": email.message_id,
         "thread_id": email.thread_id,
         "subject": email.subject,
@@ -39,7 +39,10 @@ class Settings(BaseSettings):
         description="PostgreSQL connection string for production, SQLite for local dev"
     )
     DB_POOL_SIZE: int = 20
-    DB_MAX_OVERFLOW: int = 40
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 256  # asyncpg prepared statements per connection
+    DB_POOL_WARM_CONNECTIONS: int = 5  # Opened at startup (capped at DB_POOL_SIZE)
     DB_ECHO: bool = False
     
     # Pinecone Vector Database
@@ -49,6 +52,8 @@ class Settings(BaseSettings):
     PINECONE_DIMENSION: int = 1536
     PINECONE_METRIC: str = Field(default="cosine", pattern="^(cosine|euclidean|dotproduct)$")
     PINECONE_NAMESPACE_PREFIX: str = "org"  # org_{org_id}_user_{user_id}
+    PINECONE_STATS_CACHE_TTL_SECONDS: float = 8.0  # describe_index_stats is eventually consistent anyway
+    PINECONE_RERANK_CANDIDATES: int = 0  # >top_k: over-fetch this many ANN candidates and re-score them exactly (cosine only)
     
     # Google Gemini
     GEMINI_API_KEY: Optional[str] = Field(default=None, min_length=20)
@@ -63,11 +68,14 @@ class Settings(BaseSettings):
     GOOGLE_REDIRECT_URI: str
     GOOGLE_SCOPES: List[str] = Field(
         default=[
+            "openid",  # Token response carries an id_token with the user's identity
             "https://www.googleapis.com/auth/gmail.readonly",
             "https://www.googleapis.com/auth/userinfo.email",
             "https://www.googleapis.com/auth/userinfo.profile"
         ]
     )
+    OAUTH_STATE_TTL_SECONDS: int = 600  # Time allowed on Google's consent screen
+    OAUTH_STATE_LOCAL_MAX_ENTRIES: int = 100_000  # Cap on the no-Redis fallback
     
     # Token Encryption
     FERNET_KEY: str = Field(
@@ -77,11 +85,30 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_MAX_CONNECTIONS: int = 50
+    USER_CACHE_TTL_SECONDS: int = 30
+    USER_CACHE_LOCAL_TTL_SECONDS: int = 5  # In-process tier; bounds staleness across workers
+    USER_CACHE_LOCAL_MAX_ENTRIES: int = 50_000
+    EMAIL_CACHE_TTL_SECONDS: int = 60  # Email list/detail responses; dropped early on sync
+    
+    # Outbound HTTP (Google APIs)
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_KEEPALIVE_SECONDS: float = 30.0
+    HTTP_TIMEOUT_SECONDS: float = 30.0
     
     # Background Jobs
     EMAIL_SYNC_INTERVAL_MINUTES: int = 15
+    GMAIL_FETCH_CONCURRENCY: int = 16  # Message GETs in flight per fetched page
     EMBEDDING_BATCH_SIZE: int = 50
+    EMBEDDING_MAX_CONCURRENCY: int = 8  # Parallel embed requests in flight
+    EMBEDDING_TPM_LIMIT: int = 0  # Provider tokens-per-minute budget (0 = unlimited)
+    QUERY_EMBEDDING_BATCH_WINDOW_MS: int = 10  # Concurrent RAG queries within this window share one request
+    QUERY_EMBEDDING_CACHE_SIZE: int = 10_000
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS: int = 86400
+    PROVIDER_MAX_CONCURRENCY: int = 8  # Ceiling for the adaptive Gemini/Pinecone limiters
+    PROVIDER_MAX_ATTEMPTS: int = 3  # Tries per call when the provider returns 429/503
     MAX_CONCURRENT_JOBS: int = 10
+    SYNC_JOB_RESULT_TTL_SECONDS: int = 86400  # How long finished sync job results stay queryable
+    SYNC_LOCK_TTL_SECONDS: int = 3600  # Per-user sync lock; only outlives a job whose worker died
     
     # CrewAI Configuration
     CREWAI_VERBOSE: bool = True
@@ -89,6 +116,13 @@ class Settings(BaseSettings):
     CONTEXT_WINDOW_SIZE: int = 10000
     MIN_RELEVANCE_SCORE: float = 0.7
     
+    # Semantic response cache (near-duplicate RAG queries)
+    SEMANTIC_CACHE_ENABLED: bool = True
+    SEMANTIC_CACHE_THRESHOLD: float = Field(default=0.92, ge=0.0, le=1.0)
+    SEMANTIC_CACHE_TTL_SECONDS: int = 3600
+    SEMANTIC_CACHE_MAX_ENTRIES_PER_USER: int = 128
+    SEMANTIC_CACHE_MAX_USERS: int = 1000
+    
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 100
     
@@ -0,0 +1,29 @@
+"""
+Request Context
+Per-request values carried in contextvars instead of request.state
+"""
+from contextvars import ContextVar
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.models.user import User
+
+
+# Set by the request ID middleware for the lifetime of each request
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Set by get_current_user once the bearer token has been resolved
+current_user_var: ContextVar[Optional["User"]] = ContextVar("current_user", default=None)
+
+
+def get_request_id(default: str = "unknown") -> str:
+    """Request ID of the request being handled, usable from any layer"""
+    return request_id_var.get() or default
+
+
+def get_request_user() -> Optional["User"]:
+    """Authenticated user of the current request, if one was resolved"""
+    return current_user_var.get()
+
+
+__all__ = ["request_id_var", "current_user_var", "get_request_id", "get_request_user"]
@@ -0,0 +1,52 @@
+"""
+HTTP Client Management
+Shared aiohttp session for outbound calls to Google APIs
+"""
+from typing import Optional
+import logging
+
+import aiohttp
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Get the process-wide aiohttp session.
+    
+    Its connector keeps connections to googleapis.com alive between calls,
+    so repeated requests skip the TCP and TLS handshake. Per-user auth goes
+    in request headers, never on the session. Must be called from a running
+    event loop.
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=settings.HTTP_MAX_CONNECTIONS,
+                keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS,
+            ),
+            timeout=aiohttp.ClientTimeout(total=settings.HTTP_TIMEOUT_SECONDS),
+        )
+    return _session
+
+
+async def close_http_session() -> None:
+    """
+    Close pooled HTTP connections.
+    Should be called on application shutdown.
+    """
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+        logger.info("HTTP connections closed")
+
+
+__all__ = ["get_http_session", "close_http_session"]
@@ -2,9 +2,12 @@
 Structured Logging Configuration
 JSON-formatted logs for production monitoring and audit trails
 """
+import atexit
 import logging
+import queue
 import sys
-from typing import Any, Dict
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 from datetime import datetime
 import structlog
 from pythonjsonlogger import jsonlogger
@@ -40,11 +43,33 @@ class CustomJsonFormatter(jsonlogger.JsonFormatter):
             log_record['request_id'] = record.request_id
 
 
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue records untouched.
+    
+    The stock prepare() formats the message (and any traceback) in the
+    caller's thread so the record can be pickled; the queue is in-process,
+    so formatting is left to the listener thread instead.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+# Drains the log queue into the real handler (see setup_logging)
+_listener: Optional[QueueListener] = None
+
+
 def setup_logging() -> None:
     """
     Configure structured logging for the application.
     Uses JSON format in production, human-readable in development.
+    
+    Loggers only enqueue records; a QueueListener thread formats them
+    (tracebacks included) and writes to stdout, so logging an error or an
+    audit event never blocks the event loop on formatting or I/O.
     """
+    global _listener
     
     # Determine log level
     log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
@@ -74,7 +99,13 @@ def setup_logging() -> None:
         )
     
     handler.setFormatter(formatter)
-    root_logger.addHandler(handler)
+    
+    if _listener is not None:
+        _listener.stop()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root_logger.addHandler(_DeferredQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
     
     # Configure structlog
     structlog.configure(
@@ -256,6 +287,20 @@ class PerformanceLogger:
             model=model
         )
     
+    def log_cache_lookup(
+        self,
+        cache: str,
+        hit: bool,
+        hit_rate: float
+    ) -> None:
+        """Log a cache lookup with the running hit rate"""
+        self.logger.info(
+            "cache_lookup",
+            cache=cache,
+            hit=hit,
+            hit_rate=round(hit_rate, 4)
+        )
+    
     def log_agent_execution(
         self,
         agent_name: str,
@@ -275,6 +320,15 @@ class PerformanceLogger:
         )
 
 
+def _stop_listener() -> None:
+    """Flush queued records on interpreter exit"""
+    if _listener is not None:
+        _listener.stop()
+
+
+atexit.register(_stop_listener)
+
+
 # Initialize loggers
 audit_logger = AuditLogger()
 performance_logger = PerformanceLogger()
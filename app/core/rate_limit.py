@@ -0,0 +1,129 @@
+"""
+Adaptive Rate Limiting
+Process-wide concurrency gates for external providers (Gemini, Pinecone)
+"""
+from typing import Any, Callable, Dict, Optional, TypeVar
+import asyncio
+import logging
+import random
+import time
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses that mean "slow down" rather than "this request is wrong"
+_THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def is_throttled(exc: BaseException) -> bool:
+    """
+    Whether an exception is a provider rate-limit / overload response.
+    
+    google.api_core errors expose the HTTP status as `code`, Pinecone's
+    client as `status`; both are checked so one limiter fits either.
+    """
+    for attr in ("code", "status", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int) and value in _THROTTLE_STATUSES:
+            return True
+    return False
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency gate that backs off when a provider throttles.
+    
+    Each throttled response (429/503) lowers the in-flight limit by one and
+    the call is retried with jittered exponential backoff. After
+    recovery_seconds without throttling the limit grows by one again, up
+    to the configured ceiling.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        ceiling: int,
+        max_attempts: int = 3,
+        base_backoff_seconds: float = 1.0,
+        recovery_seconds: float = 60.0
+    ):
+        self.name = name
+        self.ceiling = max(1, ceiling)
+        self.limit = self.ceiling
+        self.max_attempts = max(1, max_attempts)
+        self.base_backoff_seconds = base_backoff_seconds
+        self.recovery_seconds = recovery_seconds
+        self._in_flight = 0
+        self._cond = asyncio.Condition()
+        self._last_change = time.monotonic()
+    
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking provider call in a worker thread under the gate"""
+        attempt = 0
+        while True:
+            await self._acquire()
+            try:
+                result = await asyncio.to_thread(func, *args, **kwargs)
+            except Exception as e:
+                attempt += 1
+                if not is_throttled(e) or attempt >= self.max_attempts:
+                    raise
+                self._on_throttled()
+            else:
+                self._on_success()
+                return result
+            finally:
+                await self._release()
+            
+            delay = self.base_backoff_seconds * 2 ** (attempt - 1) * random.uniform(0.75, 1.25)
+            logger.warning(
+                f"{self.name} throttled, retrying in {delay:.2f}s "
+                f"(attempt {attempt}/{self.max_attempts}, limit={self.limit})"
+            )
+            await asyncio.sleep(delay)
+    
+    async def _acquire(self) -> None:
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+    
+    async def _release(self) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+    
+    def _on_throttled(self) -> None:
+        self.limit = max(1, self.limit - 1)
+        self._last_change = time.monotonic()
+    
+    def _on_success(self) -> None:
+        if self.limit >= self.ceiling:
+            return
+        now = time.monotonic()
+        if now - self._last_change >= self.recovery_seconds:
+            self.limit += 1
+            self._last_change = now
+            logger.info(f"{self.name} limiter raised to {self.limit}")
+
+
+# One limiter per provider, shared by every caller in the process
+_limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def get_rate_limiter(provider: str) -> AdaptiveLimiter:
+    """Get or create the process-wide limiter for a provider"""
+    limiter: Optional[AdaptiveLimiter] = _limiters.get(provider)
+    if limiter is None:
+        limiter = _limiters[provider] = AdaptiveLimiter(
+            provider,
+            ceiling=settings.PROVIDER_MAX_CONCURRENCY,
+            max_attempts=settings.PROVIDER_MAX_ATTEMPTS
+        )
+    return limiter
+
+
+__all__ = ["AdaptiveLimiter", "get_rate_limiter", "is_throttled"]
@@ -3,13 +3,22 @@ Enterprise Security Module
 Token encryption, OAuth token management, and security utilities
 """
 from typing import Optional, Dict, Any
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
 from cryptography.fernet import Fernet
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+import base64
 import bcrypt
+import calendar
 import secrets
 import hashlib
+import hmac
+import json
 import logging
+import time
 
 from app.core.config import get_settings
 
@@ -84,14 +93,57 @@ class TokenEncryption:
         return hashlib.sha256(token.encode()).hexdigest()
 
 
+# HMAC algorithms we sign in-process; anything else goes through python-jose
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+# Upper bound on verified tokens remembered by JWTManager.decode_access_token
+_DECODED_TOKEN_CACHE_SIZE = 10_000
+
+
+def _b64url(data: bytes) -> bytes:
+    """Unpadded base64url encoding as required by RFC 7515"""
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
 class JWTManager:
     """
     JWT token management for API authentication.
     Separate from OAuth tokens - these are for our API access.
     """
     
-    @staticmethod
+    def __init__(self):
+        """Resolve signing configuration once instead of on every encode/decode"""
+        self._signing_key = settings.SECRET_KEY
+        self._algorithm = settings.ALGORITHM
+        self._algorithms = [settings.ALGORITHM]
+        self._header = {"alg": settings.ALGORITHM, "typ": "JWT"}
+        self._default_expiry = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        
+        # HMAC fast path: the header segment never changes, so encode it once,
+        # and key the HMAC once; each token signs a copy of it instead of
+        # re-deriving the inner/outer padded key
+        self._digest = _HMAC_DIGESTS.get(self._algorithm)
+        self._key_bytes = self._signing_key.encode("utf-8")
+        self._header_b64 = _b64url(
+            json.dumps(self._header, separators=(",", ":")).encode("utf-8")
+        )
+        self._signing_prefix = self._header_b64 + b"."
+        self._hmac = hmac.new(self._key_bytes, digestmod=self._digest) if self._digest else None
+        
+        # Other algorithms: parse the key (e.g. an RSA PEM) once, not per token
+        self._jose_key = None if self._digest else jwk.construct(self._signing_key, self._algorithm)
+        
+        # Verified payloads keyed by a digest of the token (raw tokens are not
+        # kept in memory), reused until the token's own exp
+        self._decoded: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+    
     def create_access_token(
+        self,
         data: Dict[str, Any],
         expires_delta: Optional[timedelta] = None
     ) -> str:
@@ -107,34 +159,50 @@ class JWTManager:
         """
         to_encode = data.copy()
         
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            expire = datetime.utcnow() + timedelta(
-                minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-            )
-        
-        to_encode.update({
-            "exp": expire,
-            "iat": datetime.utcnow(),
-            "type": "access"
-        })
+        now = datetime.utcnow()
+        to_encode["exp"] = now + (expires_delta or self._default_expiry)
+        to_encode["iat"] = now
+        to_encode["type"] = "access"
         
         # Ensure tenant isolation in JWT
         if "org_id" not in to_encode or "user_id" not in to_encode:
             logger.warning("JWT created without tenant identifiers")
         
-        encoded_jwt = jwt.encode(
-            to_encode,
-            settings.SECRET_KEY,
-            algorithm=settings.ALGORITHM
-        )
+        encoded_jwt = self._encode(to_encode)
         
         logger.info(f"JWT created for user_id={to_encode.get('user_id')}, org_id={to_encode.get('org_id')}")
         return encoded_jwt
     
-    @staticmethod
-    def decode_access_token(token: str) -> Optional[Dict[str, Any]]:
+    def _encode(self, claims: Dict[str, Any]) -> str:
+        """
+        Sign claims as a compact JWS.
+        
+        HMAC algorithms are signed directly with the cached header segment;
+        verification stays on python-jose where its claim checks matter.
+        """
+        if self._hmac is None:
+            return jwt.encode(
+                claims,
+                self._jose_key,
+                algorithm=self._algorithm,
+                headers=self._header
+            )
+        
+        for claim in ("exp", "iat", "nbf"):
+            value = claims.get(claim)
+            if isinstance(value, datetime):
+                claims[claim] = calendar.timegm(value.utctimetuple())
+        
+        payload_b64 = _b64url(
+            json.dumps(claims, separators=(",", ":")).encode("utf-8")
+        )
+        signing_input = self._signing_prefix + payload_b64
+        mac = self._hmac.copy()
+        mac.update(signing_input)
+        signature = mac.digest()
+        return (signing_input + b"." + _b64url(signature)).decode("ascii")
+    
+    def decode_access_token(self, token: str) -> Optional[Dict[str, Any]]:
         """
         Decode and validate JWT access token.
         
@@ -144,11 +212,19 @@ class JWTManager:
         Returns:
             Decoded payload or None if invalid
         """
+        cache_key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+        cached = self._decoded.get(cache_key)
+        if cached is not None:
+            if cached["exp"] > time.time():
+                self._decoded.move_to_end(cache_key)
+                return dict(cached)
+            del self._decoded[cache_key]
+        
         try:
             payload = jwt.decode(
                 token,
-                settings.SECRET_KEY,
-                algorithms=[settings.ALGORITHM]
+                self._signing_key,
+                algorithms=self._algorithms
             )
             
             # Validate token type
@@ -161,6 +237,12 @@ class JWTManager:
                 logger.error("JWT missing tenant identifiers")
                 return None
             
+            # Skip signature verification for repeat requests with this token
+            if isinstance(payload.get("exp"), (int, float)):
+                self._decoded[cache_key] = dict(payload)
+                if len(self._decoded) > _DECODED_TOKEN_CACHE_SIZE:
+                    self._decoded.popitem(last=False)
+            
             return payload
             
         except JWTError as e:
@@ -176,26 +258,58 @@ class JWTManager:
         return datetime.fromtimestamp(exp) > datetime.utcnow()
 
 
+# Argon2id hasher (OWASP baseline: 19 MiB memory, 2 iterations, 1 lane)
+_password_hasher = PasswordHasher(
+    time_cost=2,
+    memory_cost=19456,
+    parallelism=1,
+    hash_len=32,
+    salt_len=16
+)
+
+# Prefix shared by all bcrypt hashes ($2a$, $2b$, $2y$)
+_BCRYPT_PREFIX = "$2"
+
+# Hash of a random secret, verified against when a login email is unknown so
+# failed lookups cost the same as failed password checks (no user enumeration)
+DUMMY_PASSWORD_HASH = _password_hasher.hash(secrets.token_urlsafe(32))
+
+
 class PasswordManager:
-    """Password hashing and verification using bcrypt directly"""
+    """
+    Password hashing and verification using argon2id.
+    Legacy bcrypt hashes are still verified and flagged for rehash.
+    
+    Both operations are CPU-bound; call them via asyncio.to_thread()
+    from async request handlers.
+    """
     
     @staticmethod
     def hash_password(password: str) -> str:
-        """Hash a password using bcrypt"""
-        # Encode password, truncate to 72 bytes (bcrypt limit)
-        password_bytes = password.encode('utf-8')[:72]
-        salt = bcrypt.gensalt(rounds=12)
-        return bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+        """Hash a password using argon2id"""
+        return _password_hasher.hash(password)
     
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
+        """Verify a password against its hash (argon2id or legacy bcrypt)"""
         try:
-            password_bytes = plain_password.encode('utf-8')[:72]
-            hashed_bytes = hashed_password.encode('utf-8')
-            return bcrypt.checkpw(password_bytes, hashed_bytes)
-        except Exception:
+            if hashed_password.startswith(_BCRYPT_PREFIX):
+                # Legacy bcrypt hash - truncate to 72 bytes (bcrypt limit)
+                password_bytes = plain_password.encode('utf-8')[:72]
+                return bcrypt.checkpw(password_bytes, hashed_password.encode('utf-8'))
+            return _password_hasher.verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError, ValueError):
             return False
+    
+    @staticmethod
+    def needs_rehash(hashed_password: str) -> bool:
+        """Check if a stored hash should be upgraded to current argon2id parameters"""
+        if hashed_password.startswith(_BCRYPT_PREFIX):
+            return True
+        try:
+            return _password_hasher.check_needs_rehash(hashed_password)
+        except InvalidHashError:
+            return True
 
 
 class SecurityUtils:
@@ -275,10 +389,22 @@ class SecurityUtils:
         return True
 
 
+@lru_cache(maxsize=1)
+def get_jwt_manager() -> JWTManager:
+    """Get the process-wide JWTManager singleton"""
+    return JWTManager()
+
+
+@lru_cache(maxsize=1)
+def get_password_manager() -> PasswordManager:
+    """Get the process-wide PasswordManager singleton"""
+    return PasswordManager()
+
+
 # Export instances
 token_encryption = TokenEncryption()
-jwt_manager = JWTManager()
-password_manager = PasswordManager()
+jwt_manager = get_jwt_manager()
+password_manager = get_password_manager()
 security_utils = SecurityUtils()
 
 
@@ -295,15 +421,61 @@ def create_access_token(
     return jwt_manager.create_access_token(data, expires_delta)
 
 
-async def get_current_user_id(request: "Request") -> str:
+# Static 401/403/404 payloads for the auth dependencies, built once at import
+# instead of on every rejected request. Treat as read-only.
+_WWW_AUTHENTICATE = {"WWW-Authenticate": "Bearer"}
+
+_MISSING_AUTH_DETAIL = {
+    "error": "Authentication required",
+    "message": "No Authorization header provided. Please include a valid JWT token.",
+    "how_to_fix": "Add header 'Authorization: Bearer <your_token>'",
+    "get_token": "POST /api/v1/auth/login with email and password, or POST /api/v1/auth/register to create an account"
+}
+
+_EMPTY_TOKEN_DETAIL = {
+    "error": "Empty token",
+    "message": "Bearer token is empty.",
+    "how_to_fix": "Provide a valid JWT token after 'Bearer '",
+    "get_token": "POST /api/v1/auth/login with email and password"
+}
+
+_INVALID_TOKEN_DETAIL = {
+    "error": "Invalid or expired token",
+    "message": "The provided JWT token is invalid, malformed, or has expired.",
+    "how_to_fix": "Obtain a new token by logging in again",
+    "get_token": "POST /api/v1/auth/login with email and password"
+}
+
+_INVALID_PAYLOAD_DETAIL = {
+    "error": "Invalid token payload",
+    "message": "Token does not contain required user information.",
+    "how_to_fix": "The token may be from an older version. Please login again to get a new token.",
+    "get_token": "POST /api/v1/auth/login with email and password"
+}
+
+_USER_NOT_FOUND_DETAIL = {
+    "error": "User not found",
+    "message": "The user associated with this token no longer exists.",
+    "how_to_fix": "Register a new account or contact support if this is unexpected.",
+    "register": "POST /api/v1/auth/register with email, password, and org_id"
+}
+
+_INACTIVE_DETAIL = {
+    "error": "Account inactive",
+    "message": "Your user account has been deactivated.",
+    "how_to_fix": "Contact your administrator to reactivate your account."
+}
+
+
+async def get_current_user_claims(request: "Request") -> Dict[str, Any]:
     """
-    Extract and validate user ID from request JWT.
+    Extract and validate the claims of the request JWT.
     
     Args:
         request: FastAPI Request object
         
     Returns:
-        User ID string
+        Decoded token payload (includes sub, user_id and org_id)
         
     Raises:
         HTTPException: If token is invalid or missing
@@ -316,13 +488,8 @@ async def get_current_user_id(request: "Request") -> str:
     if not auth_header:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={
-                "error": "Authentication required",
-                "message": "No Authorization header provided. Please include a valid JWT token.",
-                "how_to_fix": "Add header 'Authorization: Bearer <your_token>'",
-                "get_token": "POST /api/v1/auth/login with email and password, or POST /api/v1/auth/register to create an account"
-            },
-            headers={"WWW-Authenticate": "Bearer"}
+            detail=_MISSING_AUTH_DETAIL,
+            headers=_WWW_AUTHENTICATE
         )
     
     if not auth_header.startswith("Bearer "):
@@ -334,7 +501,7 @@ async def get_current_user_id(request: "Request") -> str:
                 "how_to_fix": "Use format 'Authorization: Bearer <your_token>'",
                 "received": f"'{auth_header[:20]}...'" if len(auth_header) > 20 else f"'{auth_header}'"
             },
-            headers={"WWW-Authenticate": "Bearer"}
+            headers=_WWW_AUTHENTICATE
         )
     
     token = auth_header[7:]  # Remove "Bearer " prefix
@@ -342,13 +509,8 @@ async def get_current_user_id(request: "Request") -> str:
     if not token or token.strip() == "":
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={
-                "error": "Empty token",
-                "message": "Bearer token is empty.",
-                "how_to_fix": "Provide a valid JWT token after 'Bearer '",
-                "get_token": "POST /api/v1/auth/login with email and password"
-            },
-            headers={"WWW-Authenticate": "Bearer"}
+            detail=_EMPTY_TOKEN_DETAIL,
+            headers=_WWW_AUTHENTICATE
         )
     
     # Decode and validate token
@@ -357,26 +519,35 @@ async def get_current_user_id(request: "Request") -> str:
     if not payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={
-                "error": "Invalid or expired token",
-                "message": "The provided JWT token is invalid, malformed, or has expired.",
-                "how_to_fix": "Obtain a new token by logging in again",
-                "get_token": "POST /api/v1/auth/login with email and password"
-            },
-            headers={"WWW-Authenticate": "Bearer"}
+            detail=_INVALID_TOKEN_DETAIL,
+            headers=_WWW_AUTHENTICATE
         )
     
+    return payload
+
+
+async def get_current_user_id(request: "Request") -> str:
+    """
+    Extract and validate user ID from request JWT.
+    
+    Args:
+        request: FastAPI Request object
+        
+    Returns:
+        User ID string
+        
+    Raises:
+        HTTPException: If token is invalid or missing
+    """
+    from fastapi import HTTPException, status
+    
+    payload = await get_current_user_claims(request)
     user_id = payload.get("sub")  # Standard JWT subject claim
     
     if not user_id:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail={
-                "error": "Invalid token payload",
-                "message": "Token does not contain required user information.",
-                "how_to_fix": "The token may be from an older version. Please login again to get a new token.",
-                "get_token": "POST /api/v1/auth/login with email and password"
-            }
+            detail=_INVALID_PAYLOAD_DETAIL
         )
     
     return user_id
@@ -400,35 +571,65 @@ async def get_current_user(
         HTTPException: If user not found or inactive
     """
     from fastapi import HTTPException, status
-    from sqlalchemy import select
-    from app.models.user import User
+    from app.core.context import current_user_var
+    from app.services.user_cache import get_user_cache
+    
+    # Already resolved earlier in this request (same session)
+    user = current_user_var.get()
+    if user is not None and user in db:
+        return user
     
     user_id = await get_current_user_id(request)
     
-    result = await db.execute(
-        select(User).where(User.id == user_id)
-    )
-    user = result.scalar_one_or_none()
+    user = await get_user_cache().get_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail={
-                "error": "User not found",
-                "message": "The user associated with this token no longer exists.",
-                "how_to_fix": "Register a new account or contact support if this is unexpected.",
-                "register": "POST /api/v1/auth/register with email, password, and org_id"
-            }
+            detail=_USER_NOT_FOUND_DETAIL
         )
     
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail={
-                "error": "Account inactive",
-                "message": "Your user account has been deactivated.",
-                "how_to_fix": "Contact your administrator to reactivate your account."
-            }
+            detail=_INACTIVE_DETAIL
+        )
+    
+    current_user_var.set(user)
+    return user
+
+
+async def get_current_auth_user(
+    request: "Request",
+    db: "AsyncSession"
+) -> "AuthUser":
+    """
+    Lightweight variant of get_current_user for routes that only need
+    id, org_id, is_active, encrypted_access_token and last_email_sync.
+    
+    Avoids hydrating the full User row; use get_current_user when the route
+    needs other columns or must modify the user.
+    
+    Raises:
+        HTTPException: If user not found or inactive
+    """
+    from fastapi import HTTPException, status
+    from app.services.user_cache import get_user_cache
+    
+    user_id = await get_current_user_id(request)
+    
+    user = await get_user_cache().get_auth_by_id(db, user_id)
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=_USER_NOT_FOUND_DETAIL
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=_INACTIVE_DETAIL
         )
     
     return user
@@ -2,7 +2,8 @@
 Crew Runner - Orchestrates Sequential RAG Pipeline
 Coordinates all 5 agents in strict order: Retrieve → Context → Analyze → Compliance → Answer
 """
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
+import asyncio
 import logging
 from datetime import datetime
 from crewai import Crew, Process
@@ -29,6 +30,10 @@ settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
+# Pipeline task names in execution order, as reported to on_task_done
+PIPELINE_TASKS = ("retrieval", "context", "analysis", "compliance", "answer")
+
+
 class RAGCrew:
     """
     Orchestrates the RAG pipeline using CrewAI.
@@ -36,16 +41,25 @@ class RAGCrew:
     """
     
     def __init__(self):
-        """Initialize agents (reusable across queries)"""
-        logger.info("Initializing RAG Crew agents...")
-        
-        self.retriever_agent = create_retriever_agent()
-        self.context_agent = create_context_agent()
-        self.analyst_agent = create_analyst_agent()
-        self.compliance_agent = create_compliance_agent()
-        self.answer_agent = create_answer_agent()
+        """Agents are built per run; see _create_agents"""
+        logger.info("RAG Crew ready")
+    
+    @staticmethod
+    def _create_agents() -> Dict[str, Any]:
+        """
+        Build a fresh set of agents for one pipeline run.
         
-        logger.info("RAG Crew agents initialized")
+        CrewAI writes per-run state (agent.crew, agent.agent_executor) onto
+        each Agent during kickoff, so agents shared between concurrent runs
+        would mix one tenant's crew into another's.
+        """
+        return {
+            "retriever": create_retriever_agent(),
+            "context": create_context_agent(),
+            "analyst": create_analyst_agent(),
+            "compliance": create_compliance_agent(),
+            "answer": create_answer_agent(),
+        }
     
     async def run_rag_pipeline(
         self,
@@ -53,7 +67,8 @@ class RAGCrew:
         retrieved_chunks: List[Dict[str, Any]],
         org_id: str,
         user_id: str,
-        request_id: str
+        request_id: str,
+        on_task_done: Optional[Callable[[str], None]] = None
     ) -> Dict[str, Any]:
         """
         Execute the complete RAG pipeline.
@@ -64,6 +79,9 @@ class RAGCrew:
             org_id: Organization ID for audit logging
             user_id: User ID for audit logging
             request_id: Request tracing ID
+            on_task_done: Optional callback receiving each PIPELINE_TASKS name
+                as that agent finishes. Called from the worker thread that
+                runs the crew, so it must be thread-safe.
             
         Returns:
             Dictionary with answer, sources, and metadata
@@ -76,18 +94,20 @@ class RAGCrew:
         )
         
         try:
+            agents = self._create_agents()
+            
             # Task 1: Process retrieved chunks
             retrieval_start = datetime.now()
             retrieval_task = create_retrieval_task(
                 query=user_query,
                 retrieved_chunks=retrieved_chunks,
-                agent=self.retriever_agent
+                agent=agents["retriever"]
             )
             retrieval_duration = (datetime.now() - retrieval_start).total_seconds() * 1000
             
             # Task 2: Reconstruct context
             context_start = datetime.now()
-            context_task = create_context_task(agent=self.context_agent)
+            context_task = create_context_task(agent=agents["context"])
             context_task.context = [retrieval_task]
             context_duration = (datetime.now() - context_start).total_seconds() * 1000
             
@@ -95,14 +115,14 @@ class RAGCrew:
             analysis_start = datetime.now()
             analysis_task = create_analysis_task(
                 user_query=user_query,
-                agent=self.analyst_agent
+                agent=agents["analyst"]
             )
             analysis_task.context = [retrieval_task, context_task]
             analysis_duration = (datetime.now() - analysis_start).total_seconds() * 1000
             
             # Task 4: Compliance review
             compliance_start = datetime.now()
-            compliance_task = create_compliance_task(agent=self.compliance_agent)
+            compliance_task = create_compliance_task(agent=agents["compliance"])
             compliance_task.context = [analysis_task]
             compliance_duration = (datetime.now() - compliance_start).total_seconds() * 1000
             
@@ -110,20 +130,14 @@ class RAGCrew:
             answer_start = datetime.now()
             answer_task = create_answer_task(
                 user_query=user_query,
-                agent=self.answer_agent
+                agent=agents["answer"]
             )
             answer_task.context = [compliance_task]
             answer_duration = (datetime.now() - answer_start).total_seconds() * 1000
             
             # Create crew with sequential process (ENFORCED)
             crew = Crew(
-                agents=[
-                    self.retriever_agent,
-                    self.context_agent,
-                    self.analyst_agent,
-                    self.compliance_agent,
-                    self.answer_agent
-                ],
+                agents=list(agents.values()),
                 tasks=[
                     retrieval_task,
                     context_task,
@@ -135,10 +149,14 @@ class RAGCrew:
                 verbose=settings.CREWAI_VERBOSE,
                 full_output=True
             )
+            if on_task_done is not None:
+                # Tasks run sequentially, so completions arrive in PIPELINE_TASKS order
+                task_names = iter(PIPELINE_TASKS)
+                crew.task_callback = lambda _output: on_task_done(next(task_names, "unknown"))
             
-            # Execute crew
+            # Execute crew (blocking LLM calls) off the event loop
             logger.info("Executing CrewAI sequential pipeline...")
-            result = crew.kickoff()
+            result = await asyncio.to_thread(crew.kickoff)
             
             # Parse result
             final_output = self._parse_crew_output(result)
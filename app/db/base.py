@@ -3,7 +3,7 @@ SQLAlchemy declarative base and common mixins
 """
 from datetime import datetime
 from typing import Any
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Column, DateTime, String, Uuid, and_
 from sqlalchemy.orm import declarative_base, declared_attr
 from sqlalchemy.sql import func
 import uuid
@@ -30,6 +30,10 @@ class TimestampMixin:
         server_default=func.now(),
         onupdate=func.now()
     )
+    
+    # Fetch server-generated timestamps in the INSERT/UPDATE itself (RETURNING)
+    # so committed objects never need a follow-up refresh() SELECT.
+    __mapper_args__ = {"eager_defaults": True}
 
 
 class TenantMixin:
@@ -38,10 +42,11 @@ class TenantMixin:
     Every model must have org_id for tenant isolation.
     """
     
+    # No standalone index: every tenant table leads a composite index with
+    # org_id, which serves org_id-only lookups by prefix.
     org_id = Column(
         String(50),
         nullable=False,
-        index=True,
         comment="Organization ID for tenant isolation"
     )
     
@@ -51,18 +56,32 @@ class TenantMixin:
         index=True,
         comment="User ID within the organization"
     )
+    
+    @classmethod
+    def owned_by(cls, org_id: Any, user_id: Any):
+        """
+        Tenant isolation predicate: rows belonging to one user of one org.
+        
+        Every per-user query filters through this rather than spelling out
+        both columns, so neither can be forgotten. Accepts values or
+        bindparams; org_id comes first to match the composite indexes.
+        """
+        return and_(cls.org_id == org_id, cls.user_id == user_id)
 
 
 class UUIDMixin:
     """
     Mixin for UUID primary keys.
     Uses UUID4 for global uniqueness.
+    
+    Stored as native UUID on Postgres (16 bytes) and CHAR(32) on SQLite;
+    as_uuid=False keeps the Python-side value a plain string.
     """
     
     @declared_attr
     def id(cls):
         return Column(
-            String(36),
+            Uuid(as_uuid=False),
             primary_key=True,
             default=lambda: str(uuid.uuid4()),
             comment="UUID primary key"
@@ -0,0 +1,49 @@
+"""
+Redis connection management
+Shared async client for caches and short-lived state
+"""
+from typing import Optional
+import logging
+
+from redis.asyncio import Redis
+
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+_redis: Optional[Redis] = None
+
+
+def get_redis() -> Redis:
+    """
+    Get the process-wide async Redis client.
+    
+    The pool connects lazily, so creating the client never blocks startup;
+    callers treat Redis as optional and fall back when it is unreachable.
+    """
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(
+            settings.REDIS_URL,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_connect_timeout=0.25,
+            socket_timeout=0.25,
+        )
+    return _redis
+
+
+async def close_redis() -> None:
+    """
+    Close Redis connections.
+    Should be called on application shutdown.
+    """
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+        logger.info("Redis connections closed")
+
+
+__all__ = ["get_redis", "close_redis"]
@@ -1,14 +1,16 @@
 """
 Database session management with async support
 """
+import asyncio
 from typing import AsyncGenerator
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
     async_sessionmaker
 )
+from sqlalchemy import text
 from sqlalchemy.orm import Session
-from sqlalchemy.pool import NullPool, QueuePool
+from sqlalchemy.pool import NullPool
 import logging
 
 from app.core.config import get_settings
@@ -29,16 +31,30 @@ if _is_sqlite:
         future=True,
     )
 else:
+    # asyncpg keeps a per-connection prepared statement cache, so the small set
+    # of parameterized queries hit on every request is planned once per
+    # connection. pool_pre_ping/pool_recycle drop connections the server or a
+    # proxy closed while idle instead of failing the next request.
+    # (The async engine uses AsyncAdaptedQueuePool by default; the sync
+    # QueuePool is rejected by create_async_engine.)
     engine = create_async_engine(
         settings.get_database_url(async_driver=True),
         echo=settings.DB_ECHO,
         pool_size=settings.DB_POOL_SIZE,
         max_overflow=settings.DB_MAX_OVERFLOW,
-        poolclass=QueuePool,
+        pool_pre_ping=True,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        connect_args={
+            "prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+            "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        },
         future=True,
     )
 
 # Async session factory
+# expire_on_commit=False keeps loaded attributes valid after commit; routes read
+# user.id/org_id/email right after committing and must not trigger a reload
+# (which would be an extra SELECT, or a MissingGreenlet error under asyncio).
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -91,6 +107,31 @@ async def init_db() -> None:
         raise
 
 
+async def warm_db_pool() -> None:
+    """
+    Open DB_POOL_WARM_CONNECTIONS pooled connections up front.
+    Should be called on application startup, after init_db.
+    
+    The connections are checked out concurrently (so each is a distinct
+    connection) and returned to the pool, so the first burst of requests
+    after a deploy doesn't pay the connect/TLS/auth handshake. Best effort:
+    a failure is logged and requests simply connect on demand.
+    """
+    size = min(settings.DB_POOL_WARM_CONNECTIONS, settings.DB_POOL_SIZE)
+    if _is_sqlite or size <= 0:
+        return
+    
+    async def open_connection() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    
+    try:
+        await asyncio.gather(*(open_connection() for _ in range(size)))
+        logger.info(f"Database pool warmed with {size} connections")
+    except Exception as e:
+        logger.warning(f"Database pool warm-up failed: {e}")
+
+
 async def close_db() -> None:
     """
     Close database connections.
@@ -101,4 +142,4 @@ async def close_db() -> None:
 
 
 # Export for convenience
-__all__ = ["get_async_db", "init_db", "close_db", "AsyncSessionLocal", "engine"]
+__all__ = ["get_async_db", "init_db", "warm_db_pool", "close_db", "AsyncSessionLocal", "engine"]
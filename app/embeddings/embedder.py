@@ -2,21 +2,59 @@
 Embedding Generation Service
 Google Gemini embeddings with chunking and batch processing
 """
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
+from collections import OrderedDict
+import asyncio
+import hashlib
 import logging
+import time
 from datetime import datetime
 import tiktoken
 import google.generativeai as genai
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from app.core.config import get_settings
 from app.core.logging import performance_logger
+from app.core.rate_limit import get_rate_limiter, is_throttled
 from app.embeddings.schema import EmbeddingChunk, EmailEmbedding, VectorUpsertRecord
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
+class TokenBudget:
+    """
+    Token bucket for the embedding provider's tokens-per-minute quota.
+    Callers wait for budget before sending a request instead of hitting 429s.
+    """
+    
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self.available = float(tokens_per_minute)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, tokens: int) -> None:
+        """Wait until `tokens` can be spent without exceeding the budget"""
+        if self.capacity <= 0:
+            return
+        
+        tokens = min(tokens, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.available = min(
+                    self.capacity,
+                    self.available + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.available >= tokens:
+                    self.available -= tokens
+                    return
+                await asyncio.sleep((tokens - self.available) / self.rate)
+
+
 class EmbeddingService:
     """
     Service for generating embeddings using Google Gemini.
@@ -32,6 +70,23 @@ class EmbeddingService:
         # Chunking configuration
         self.max_tokens_per_chunk = 512
         self.chunk_overlap = 50
+        
+        # Gemini accepts at most 100 texts per embed request
+        self.batch_size = max(1, min(settings.EMBEDDING_BATCH_SIZE, 100))
+        
+        # Batches run concurrently, bounded by both request count and TPM budget
+        self.max_concurrency = max(1, settings.EMBEDDING_MAX_CONCURRENCY)
+        self.token_budget = TokenBudget(settings.EMBEDDING_TPM_LIMIT)
+        
+        # Query embeddings: recent results by (model, query digest), oldest first,
+        # and queries waiting for the next coalesced request
+        self._query_cache: "OrderedDict[bytes, Tuple[List[float], float]]" = OrderedDict()
+        self._query_cache_size = settings.QUERY_EMBEDDING_CACHE_SIZE
+        self._query_cache_ttl = settings.QUERY_EMBEDDING_CACHE_TTL_SECONDS
+        self._query_window = settings.QUERY_EMBEDDING_BATCH_WINDOW_MS / 1000
+        self._pending_queries: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._query_tasks: Set[asyncio.Task] = set()
     
     def count_tokens(self, text: str) -> int:
         """Count tokens in text using tiktoken"""
@@ -108,6 +163,8 @@ class EmbeddingService:
         return chunks
     
     @retry(
+        # Throttling is retried (and backed off) by the Gemini limiter
+        retry=retry_if_exception(lambda e: not is_throttled(e)),
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10)
     )
@@ -126,7 +183,8 @@ class EmbeddingService:
             return [0.0] * self.dimension
         
         try:
-            result = genai.embed_content(
+            result = await get_rate_limiter("gemini").run(
+                genai.embed_content,
                 model=self.model,
                 content=text,
                 task_type="retrieval_document"
@@ -152,6 +210,11 @@ class EmbeddingService:
         """
         Generate embeddings for multiple texts in batch.
         
+        Texts are grouped into requests of similar length (see
+        _length_buckets), each carrying up to EMBEDDING_BATCH_SIZE items
+        (capped at Gemini's per-request limit). Up to EMBEDDING_MAX_CONCURRENCY
+        requests run in parallel. Results are returned in input order.
+        
         Args:
             texts: List of texts to embed
             
@@ -164,14 +227,23 @@ class EmbeddingService:
         start_time = datetime.now()
         
         try:
-            # Gemini supports batch embeddings
-            result = genai.embed_content(
-                model=self.model,
-                content=texts,
-                task_type="retrieval_document"
-            )
+            semaphore = asyncio.Semaphore(self.max_concurrency)
             
-            embeddings = result['embedding'] if isinstance(result['embedding'][0], list) else [result['embedding']]
+            async def embed_gated(batch: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    # ~4 characters per token is close enough for budgeting
+                    await self.token_budget.acquire(sum(len(t) for t in batch) // 4 + 1)
+                    return await self._embed_batch(batch)
+            
+            buckets = self._length_buckets(texts)
+            batch_results = await asyncio.gather(*(
+                embed_gated([texts[i] for i in bucket]) for bucket in buckets
+            ))
+            
+            embeddings: List[List[float]] = [None] * len(texts)
+            for bucket, batch_embeddings in zip(buckets, batch_results):
+                for i, embedding in zip(bucket, batch_embeddings):
+                    embeddings[i] = embedding
             
             duration_ms = (datetime.now() - start_time).total_seconds() * 1000
             
@@ -195,6 +267,45 @@ class EmbeddingService:
             logger.error(f"Batch embedding generation failed: {e}")
             raise
     
+    def _length_buckets(self, texts: List[str]) -> List[List[int]]:
+        """
+        Group text indices into batches of similar length.
+        
+        A request is as slow as its longest text, so mixing one long chunk
+        with many short ones wastes the short ones' time. Indices are sorted
+        by length and a new batch starts when the current one is full or the
+        next text is more than twice as long as the batch's shortest, which
+        adds at most ~log2(longest / shortest) requests over plain slicing.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        buckets: List[List[int]] = []
+        floor = 0
+        for i in order:
+            length = len(texts[i])
+            if buckets and len(buckets[-1]) < self.batch_size and length <= 2 * floor:
+                buckets[-1].append(i)
+            else:
+                buckets.append([i])
+                floor = max(length, 1)
+        return buckets
+    
+    @retry(
+        # Throttling is retried (and backed off) by the Gemini limiter
+        retry=retry_if_exception(lambda e: not is_throttled(e)),
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=2, max=10)
+    )
+    async def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed one request's worth of texts (blocking client call runs in a thread)"""
+        result = await get_rate_limiter("gemini").run(
+            genai.embed_content,
+            model=self.model,
+            content=batch,
+            task_type="retrieval_document"
+        )
+        embeddings = result['embedding']
+        return embeddings if isinstance(embeddings[0], list) else [embeddings]
+    
     async def embed_email(
         self,
         email_id: str,
@@ -212,79 +323,158 @@ class EmbeddingService:
         Returns:
             Tuple of (EmailEmbedding, List[VectorUpsertRecord])
         """
-        start_time = datetime.now()
+        results = await self.embed_emails([(email_id, email_content, metadata)])
+        return results[0]
+    
+    async def embed_emails(
+        self,
+        emails: List[Tuple[str, str, Dict[str, Any]]]
+    ) -> List[Tuple[EmailEmbedding, List[VectorUpsertRecord]]]:
+        """
+        Generate embeddings for many emails at once.
         
-        # Chunk the email
-        chunks = self.chunk_text(email_content)
-        
-        if not chunks:
-            logger.warning(f"No chunks generated for email {email_id}")
-            return (
-                EmailEmbedding(
-                    email_id=email_id,
-                    chunks=[],
-                    embedding_model=self.model,
-                    dimension=self.dimension,
-                    total_tokens=0
-                ),
-                []
-            )
+        Chunks from all emails are pooled into shared batch requests, so
+        embedding N short emails costs ceil(total_chunks / batch_size)
+        round-trips instead of one per email.
+        
+        Args:
+            emails: List of (email_id, email_content, metadata) tuples
+            
+        Returns:
+            One (EmailEmbedding, List[VectorUpsertRecord]) tuple per email, in input order
+        """
+        start_time = datetime.now()
         
-        # Generate embeddings for all chunks
-        chunk_texts = [chunk.chunk_text for chunk in chunks]
-        embeddings = await self.generate_embeddings_batch(chunk_texts)
+        # Chunk every email first, then embed all chunks together
+        chunked = [self.chunk_text(content) for _, content, _ in emails]
+        all_texts = [chunk.chunk_text for chunks in chunked for chunk in chunks]
+        all_embeddings = await self.generate_embeddings_batch(all_texts)
         
-        # Create vector upsert records
-        upsert_records = []
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            vector_id = f"{email_id}_chunk_{i}"
+        results = []
+        offset = 0
+        for (email_id, _, metadata), chunks in zip(emails, chunked):
+            embeddings = all_embeddings[offset:offset + len(chunks)]
+            offset += len(chunks)
             
-            # Add chunk-specific metadata
-            chunk_metadata = metadata.copy()
-            chunk_metadata.update({
-                "chunk_index": i,
-                "chunk_token_count": chunk.token_count,
-                "text_preview": chunk.chunk_text[:200]
-            })
+            if not chunks:
+                logger.warning(f"No chunks generated for email {email_id}")
             
-            upsert_records.append(
-                VectorUpsertRecord(
-                    vector_id=vector_id,
-                    embedding=embedding,
-                    metadata=chunk_metadata
+            # Create vector upsert records
+            upsert_records = []
+            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+                vector_id = f"{email_id}_chunk_{i}"
+                
+                # Add chunk-specific metadata
+                chunk_metadata = metadata.copy()
+                chunk_metadata.update({
+                    "chunk_index": i,
+                    "chunk_token_count": chunk.token_count,
+                    "text_preview": chunk.chunk_text[:200]
+                })
+                
+                upsert_records.append(
+                    VectorUpsertRecord(
+                        vector_id=vector_id,
+                        embedding=embedding,
+                        metadata=chunk_metadata
+                    )
                 )
+            
+            email_embedding = EmailEmbedding(
+                email_id=email_id,
+                chunks=chunks,
+                embedding_model=self.model,
+                dimension=self.dimension,
+                total_tokens=sum(chunk.token_count for chunk in chunks)
             )
-        
-        total_tokens = sum(chunk.token_count for chunk in chunks)
+            results.append((email_embedding, upsert_records))
         
         duration_ms = (datetime.now() - start_time).total_seconds() * 1000
         logger.info(
-            f"Embedded email {email_id}: {len(chunks)} chunks, "
-            f"{total_tokens} tokens in {duration_ms:.2f}ms"
+            f"Embedded {len(emails)} emails: {len(all_texts)} chunks "
+            f"in {duration_ms:.2f}ms"
         )
         
-        email_embedding = EmailEmbedding(
-            email_id=email_id,
-            chunks=chunks,
-            embedding_model=self.model,
-            dimension=self.dimension,
-            total_tokens=total_tokens
-        )
-        
-        return email_embedding, upsert_records
+        return results
     
     async def generate_query_embedding(self, query: str) -> List[float]:
         """
         Generate embedding for a RAG query.
         
+        Repeat queries are served from an in-process TTL cache. Misses wait
+        up to QUERY_EMBEDDING_BATCH_WINDOW_MS and are sent together with any
+        other queries arriving in that window (identical ones share a slot),
+        so concurrent users cost one embedding request instead of one each.
+        
         Args:
             query: User query text
             
         Returns:
             Query embedding vector
         """
-        logger.info(f"Generating query embedding for: {query[:100]}...")
-        return await self.generate_embedding(query)
+        if not query or not query.strip():
+            logger.warning("Attempted to embed empty query")
+            return [0.0] * self.dimension
+        
+        cache_key = hashlib.blake2b(f"{self.model}\0{query}".encode("utf-8"), digest_size=16).digest()
+        cached = self._query_cache.get(cache_key)
+        if cached is not None:
+            if cached[1] > time.monotonic():
+                self._query_cache.move_to_end(cache_key)
+                return cached[0]
+            del self._query_cache[cache_key]
+        
+        future = self._pending_queries.get(query)
+        if future is None:
+            logger.info(f"Generating query embedding for: {query[:100]}...")
+            future = asyncio.get_running_loop().create_future()
+            # Mark errors as retrieved even if every waiter went away
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._pending_queries[query] = future
+            if len(self._pending_queries) >= self.batch_size:
+                self._flush_queries()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(
+                    self._query_window, self._flush_queries
+                )
+        
+        # shield: one caller disconnecting must not fail the others in the batch
+        embedding = await asyncio.shield(future)
+        
+        self._query_cache[cache_key] = (embedding, time.monotonic() + self._query_cache_ttl)
+        self._query_cache.move_to_end(cache_key)
+        if len(self._query_cache) > self._query_cache_size:
+            self._query_cache.popitem(last=False)
+        return embedding
+    
+    def _flush_queries(self) -> None:
+        """Send every pending query in one request (runs on the event loop)"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending_queries = self._pending_queries, {}
+        if pending:
+            task = asyncio.get_running_loop().create_task(self._embed_pending_queries(pending))
+            self._query_tasks.add(task)
+            task.add_done_callback(self._query_tasks.discard)
+    
+    async def _embed_pending_queries(self, pending: Dict[str, asyncio.Future]) -> None:
+        texts = list(pending)
+        try:
+            embeddings = await self._embed_batch(texts)
+            if len(embeddings) != len(texts):
+                raise ValueError(f"Expected {len(texts)} embeddings, got {len(embeddings)}")
+        except Exception as e:
+            logger.error(f"Failed to generate query embeddings: {type(e).__name__}: {e}")
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for text, embedding in zip(texts, embeddings):
+            future = pending[text]
+            if not future.done():
+                future.set_result(embedding)
 
 
 # Singleton instance
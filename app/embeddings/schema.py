@@ -2,7 +2,7 @@
 Embedding schemas and data models
 """
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -14,14 +14,13 @@ class EmbeddingChunk(BaseModel):
     chunk_index: int = Field(description="Index of chunk within source document")
     token_count: int = Field(description="Token count of chunk")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "chunk_text": "Meeting scheduled for tomorrow at 10 AM...",
-                "chunk_index": 0,
-                "token_count": 45
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "chunk_text": "Meeting scheduled for tomorrow at 10 AM...",
+            "chunk_index": 0,
+            "token_count": 45
         }
+    })
 
 
 class EmailEmbedding(BaseModel):
@@ -34,16 +33,15 @@ class EmailEmbedding(BaseModel):
     dimension: int
     total_tokens: int
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "email_id": "abc-123",
-                "chunks": [],
-                "embedding_model": "text-embedding-3-small",
-                "dimension": 1536,
-                "total_tokens": 250
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "email_id": "abc-123",
+            "chunks": [],
+            "embedding_model": "text-embedding-3-small",
+            "dimension": 1536,
+            "total_tokens": 250
         }
+    })
 
 
 class VectorUpsertRecord(BaseModel):
@@ -54,15 +52,14 @@ class VectorUpsertRecord(BaseModel):
     embedding: List[float] = Field(description="Embedding vector")
     metadata: Dict[str, Any] = Field(description="Metadata for filtering")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "vector_id": "vec_abc123_0",
-                "embedding": [0.1, 0.2, 0.3],
-                "metadata": {
-                    "email_id": "abc123",
-                    "org_id": "org1",
-                    "user_id": "user1"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "vector_id": "vec_abc123_0",
+            "embedding": [0.1, 0.2, 0.3],
+            "metadata": {
+                "email_id": "abc123",
+                "org_id": "org1",
+                "user_id": "user1"
             }
         }
+    })
@@ -2,12 +2,14 @@
 Email Fetcher
 Fetches emails from Gmail using the Gmail API
 """
+import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import Optional, List, AsyncGenerator, Dict, Any
 from dataclasses import dataclass
 
 from app.core.config import get_settings
+from app.core.http import get_http_session
 from app.ingestion.email_parser import EmailParser, ParsedEmail, get_email_parser
 
 settings = get_settings()
@@ -92,55 +94,65 @@ class GmailFetcher:
             params["includeSpamTrash"] = "true"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                # List messages
-                list_url = f"{self.BASE_URL}/messages"
-                async with session.get(list_url, headers=self._headers, params=params) as response:
-                    if response.status == 401:
-                        error_msg = "Access token expired or invalid"
-                        print(f"\n[EMAIL FETCH ERROR] {error_msg}")
-                        raise AuthenticationError(error_msg)
-                    
-                    if response.status != 200:
-                        error_text = await response.text()
-                        error_msg = f"Gmail API error: {response.status} - {error_text}"
-                        logger.error(error_msg)
-                        print(f"\n[EMAIL FETCH ERROR] {error_msg}")
-                        raise GmailAPIError(f"Failed to list messages: {response.status}")
-                    
-                    list_data = await response.json()
-                
-                messages = list_data.get("messages", [])
-                next_page_token = list_data.get("nextPageToken")
-                
-                if not messages:
-                    return FetchResult(
-                        emails=[],
-                        next_page_token=next_page_token,
-                        total_fetched=0
-                    )
+            session = get_http_session()
+            # List messages
+            list_url = f"{self.BASE_URL}/messages"
+            async with session.get(list_url, headers=self._headers, params=params) as response:
+                if response.status == 401:
+                    error_msg = "Access token expired or invalid"
+                    print(f"\n[EMAIL FETCH ERROR] {error_msg}")
+                    raise AuthenticationError(error_msg)
                 
-                # Fetch full message content for each message
-                emails = []
-                errors = []
-                
-                for msg_stub in messages:
-                    try:
-                        parsed = await self._fetch_full_message(session, msg_stub["id"])
-                        if parsed:
-                            emails.append(parsed)
-                    except Exception as e:
-                        error_msg = f"Failed to fetch message {msg_stub['id']}: {e}"
-                        logger.error(error_msg)
-                        print(f"\n[EMAIL FETCH ERROR] {error_msg}")
-                        errors.append(f"Message {msg_stub['id']}: {str(e)}")
+                if response.status != 200:
+                    error_text = await response.text()
+                    error_msg = f"Gmail API error: {response.status} - {error_text}"
+                    logger.error(error_msg)
+                    print(f"\n[EMAIL FETCH ERROR] {error_msg}")
+                    raise GmailAPIError(f"Failed to list messages: {response.status}")
                 
+                list_data = await response.json()
+            
+            messages = list_data.get("messages", [])
+            next_page_token = list_data.get("nextPageToken")
+            
+            if not messages:
                 return FetchResult(
-                    emails=emails,
+                    emails=[],
                     next_page_token=next_page_token,
-                    total_fetched=len(emails),
-                    errors=errors if errors else None
+                    total_fetched=0
                 )
+            
+            # Fetch full message content, several messages in flight at
+            # once over the shared session; gather keeps list order
+            semaphore = asyncio.Semaphore(settings.GMAIL_FETCH_CONCURRENCY)
+            
+            async def fetch_guarded(message_id: str) -> Optional[ParsedEmail]:
+                async with semaphore:
+                    return await self._fetch_full_message(session, message_id)
+            
+            results = await asyncio.gather(
+                *(fetch_guarded(msg_stub["id"]) for msg_stub in messages),
+                return_exceptions=True
+            )
+            
+            emails = []
+            errors = []
+            
+            for msg_stub, parsed in zip(messages, results):
+                if isinstance(parsed, Exception):
+                    error_msg = f"Failed to fetch message {msg_stub['id']}: {parsed}"
+                    logger.error(error_msg)
+                    print(f"\n[EMAIL FETCH ERROR] {error_msg}")
+                    errors.append(f"Message {msg_stub['id']}: {str(parsed)}")
+                elif parsed:
+                    emails.append(parsed)
+            
+            return FetchResult(
+                emails=emails,
+                next_page_token=next_page_token,
+                total_fetched=len(emails),
+                errors=errors if errors else None
+            )
                 
         except aiohttp.ClientError as e:
             error_msg = f"Network error fetching emails: {e}"
@@ -223,11 +235,9 @@ class GmailFetcher:
         Returns:
             ParsedEmail or None if not found
         """
-        import aiohttp
-        
         try:
-            async with aiohttp.ClientSession() as session:
-                return await self._fetch_full_message(session, message_id)
+            session = get_http_session()
+            return await self._fetch_full_message(session, message_id)
         except Exception as e:
             logger.error(f"Failed to fetch email {message_id}: {e}")
             return None
@@ -239,19 +249,17 @@ class GmailFetcher:
         Returns:
             List of label dicts with id, name, type
         """
-        import aiohttp
-        
         url = f"{self.BASE_URL}/labels"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self._headers) as response:
-                    if response.status != 200:
-                        logger.error(f"Failed to fetch labels: {response.status}")
-                        return []
-                    
-                    data = await response.json()
-                    return data.get("labels", [])
+            session = get_http_session()
+            async with session.get(url, headers=self._headers) as response:
+                if response.status != 200:
+                    logger.error(f"Failed to fetch labels: {response.status}")
+                    return []
+                
+                data = await response.json()
+                return data.get("labels", [])
                     
         except Exception as e:
             logger.error(f"Error fetching labels: {e}")
@@ -264,18 +272,16 @@ class GmailFetcher:
         Returns:
             Profile dict with emailAddress, messagesTotal, threadsTotal, historyId
         """
-        import aiohttp
-        
         url = f"{self.BASE_URL}/profile"
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self._headers) as response:
-                    if response.status != 200:
-                        logger.error(f"Failed to fetch profile: {response.status}")
-                        return {}
-                    
-                    return await response.json()
+            session = get_http_session()
+            async with session.get(url, headers=self._headers) as response:
+                if response.status != 200:
+                    logger.error(f"Failed to fetch profile: {response.status}")
+                    return {}
+                
+                return await response.json()
                     
         except Exception as e:
             logger.error(f"Error fetching profile: {e}")
@@ -296,8 +302,6 @@ class GmailFetcher:
         Returns:
             History data with list of changes
         """
-        import aiohttp
-        
         url = f"{self.BASE_URL}/history"
         params = {
             "startHistoryId": start_history_id,
@@ -306,17 +310,17 @@ class GmailFetcher:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=self._headers, params=params) as response:
-                    if response.status == 404:
-                        # History ID too old, need full sync
-                        return {"historyId": None, "history": []}
-                    
-                    if response.status != 200:
-                        logger.error(f"Failed to fetch history: {response.status}")
-                        return {}
-                    
-                    return await response.json()
+            session = get_http_session()
+            async with session.get(url, headers=self._headers, params=params) as response:
+                if response.status == 404:
+                    # History ID too old, need full sync
+                    return {"historyId": None, "history": []}
+                
+                if response.status != 200:
+                    logger.error(f"Failed to fetch history: {response.status}")
+                    return {}
+                
+                return await response.json()
                     
         except Exception as e:
             logger.error(f"Error fetching history: {e}")
@@ -2,11 +2,12 @@
 FastAPI Main Application
 Production-ready multi-tenant RAG platform
 """
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from fastapi.openapi.utils import get_openapi
 import time
@@ -14,8 +15,12 @@ import uuid
 
 from app.core.config import get_settings
 from app.core.logging import setup_logging, audit_logger
-from app.db.session import init_db, close_db
+from app.core.context import request_id_var, current_user_var
+from app.db.session import init_db, warm_db_pool, close_db
+from app.db.redis import close_redis
+from app.core.http import close_http_session
 from app.vectorstore.pinecone_client import get_pinecone_client
+from app.services.rag_service import get_rag_service
 
 # Import routers
 from app.api.routes import rag
@@ -23,6 +28,7 @@ from app.api.routes import emails
 from app.api.routes import auth
 from app.api.routes import oauth
 from app.api.routes import test as test_routes
+from app.api.examples import apply_schema_examples
 
 settings = get_settings()
 
@@ -49,6 +55,10 @@ async def lifespan(app: FastAPI):
         logger.error(f"Database initialization failed: {e}")
         raise
     
+    # Pre-open pooled connections so the first requests (e.g. OAuth
+    # callbacks right after a deploy) don't pay the connect handshake
+    await warm_db_pool()
+    
     # Initialize Pinecone
     try:
         pinecone_client = get_pinecone_client()
@@ -60,6 +70,16 @@ async def lifespan(app: FastAPI):
         logger.error(f"Pinecone initialization failed: {e}")
         raise
     
+    # Build the RAG service now (embedding client, Pinecone index handle and
+    # the five CrewAI agents) so the first query on a fresh worker doesn't pay
+    # for it. Construction is blocking, so it runs in a thread; on failure the
+    # service is still created lazily by the first query.
+    try:
+        await asyncio.to_thread(get_rag_service)
+        logger.info("RAG service initialized")
+    except Exception as e:
+        logger.error(f"RAG service initialization failed: {e}")
+    
     logger.info(f"{settings.APP_NAME} started successfully")
     
     yield
@@ -70,6 +90,10 @@ async def lifespan(app: FastAPI):
     await close_db()
     logger.info("Database connections closed")
     
+    await close_redis()
+    
+    await close_http_session()
+    
     logger.info(f"{settings.APP_NAME} shutdown complete")
 
 
@@ -82,6 +106,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
+    # orjson serializes nested sources/metadata (and datetimes) much faster
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -115,6 +141,9 @@ def custom_openapi():
                 if method != "parameters":
                     openapi_schema["paths"][path][method]["security"] = [{"BearerAuth": []}]
     
+    # Documentation examples live outside the models; attach them once here
+    apply_schema_examples(openapi_schema)
+    
     app.openapi_schema = openapi_schema
     return app.openapi_schema
 
@@ -139,8 +168,17 @@ async def add_request_id(request: Request, call_next):
     request_id = str(uuid.uuid4())
     request.state.request_id = request_id
     
+    # Expose to every layer via contextvars; reset so nothing leaks into the
+    # next request served on the same connection
+    request_id_token = request_id_var.set(request_id)
+    user_token = current_user_var.set(None)
+    try:
+        response = await call_next(request)
+    finally:
+        current_user_var.reset(user_token)
+        request_id_var.reset(request_id_token)
+    
     # Add to response headers
-    response = await call_next(request)
     response.headers["X-Request-ID"] = request_id
     
     return response
@@ -6,6 +6,7 @@ from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, Index,
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base, TimestampMixin, TenantMixin, UUIDMixin
+from app.vectorstore.filters import epoch_seconds
 
 
 class Email(Base, UUIDMixin, TenantMixin, TimestampMixin):
@@ -176,6 +177,8 @@ class Email(Base, UUIDMixin, TenantMixin, TimestampMixin):
         Index("idx_email_tenant_date", "org_id", "user_id", "sent_at"),
         Index("idx_email_thread", "thread_id"),
         Index("idx_email_embedding_status", "is_embedded", "org_id", "user_id"),
+        # Sync inserts use ON CONFLICT DO NOTHING against this (alembic 0012)
+        Index("uq_emails_org_user_message", "org_id", "user_id", "message_id", unique=True),
     )
     
     def __repr__(self) -> str:
@@ -199,6 +202,8 @@ class Email(Base, UUIDMixin, TenantMixin, TimestampMixin):
             "sender": self.sender,
             "sender_name": self.sender_name or "",
             "sent_at": self.sent_at.isoformat() if self.sent_at else "",
+            # Pinecone range operators ($gte/$lte) only compare numbers
+            "sent_at_ts": epoch_seconds(self.sent_at) if self.sent_at else 0,
             "org_id": self.org_id,
             "user_id": self.user_id,
             "provider": self.provider,
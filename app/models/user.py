@@ -2,7 +2,7 @@
 User Model
 Stores user account information and OAuth configuration
 """
-from sqlalchemy import Column, String, Boolean, DateTime, Text, Index
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text, Index, func
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -20,10 +20,8 @@ class User(Base, UUIDMixin, TimestampMixin):
     # User identification
     email = Column(
         String(255),
-        unique=True,
         nullable=False,
-        index=True,
-        comment="User email address (unique)"
+        comment="User email address (stored lowercase, unique case-insensitively)"
     )
     
     org_id = Column(
@@ -108,6 +106,20 @@ class User(Base, UUIDMixin, TimestampMixin):
         comment="Enable automatic email syncing"
     )
     
+    email_count = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="Synced emails stored for this user (kept current by the sync service)"
+    )
+    
+    sync_job_id = Column(
+        String(100),
+        nullable=True,
+        comment="Most recent background sync job (Celery task ID)"
+    )
+    
     # Security
     failed_login_attempts = Column(
         String(10),
@@ -128,6 +140,7 @@ class User(Base, UUIDMixin, TimestampMixin):
     
     # Indexes for performance
     __table_args__ = (
+        Index("uq_users_email_lower", func.lower(email), unique=True),
         Index("idx_user_org_email", "org_id", "email"),
         Index("idx_user_oauth", "oauth_provider", "oauth_provider_id"),
     )
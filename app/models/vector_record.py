@@ -2,7 +2,7 @@
 Vector Record Model
 Tracks embeddings stored in Pinecone for auditability
 """
-from sqlalchemy import Column, String, Text, DateTime, Float, Integer, Index, ForeignKey
+from sqlalchemy import Column, String, Text, DateTime, Float, Integer, Index, ForeignKey, Uuid
 
 from app.db.base import Base, TimestampMixin, TenantMixin, UUIDMixin
 
@@ -33,11 +33,10 @@ class VectorRecord(Base, UUIDMixin, TenantMixin, TimestampMixin):
     
     # Source email
     email_id = Column(
-        String(36),
+        Uuid(as_uuid=False),
         ForeignKey("emails.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
-        comment="Source email ID"
+        comment="Source email ID (indexed via idx_vector_email)"
     )
     
     # Chunk information
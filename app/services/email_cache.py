@@ -0,0 +1,152 @@
+"""
+Email Read Cache
+Redis-backed cache for per-user email list/detail responses
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.db.redis import get_redis
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# How long to stop talking to Redis after a connection failure
+_RETRY_AFTER_SECONDS = 30
+
+
+def _user_key(org_id: str, user_id: str) -> str:
+    return f"emails:{org_id}:{user_id}"
+
+
+class EmailCache:
+    """
+    Caches serialized email read responses, one Redis hash per user.
+    
+    Each response is a field of the user's hash (e.g. "list:20:0::",
+    "email:<id>"), so invalidating everything a sync may have
+    changed is a single DEL. Values are prefixed with their expiry time;
+    Redis can only expire whole hashes, so per-entry freshness is checked
+    on read.
+    
+    Redis is optional: on any Redis error the cache steps aside for a short
+    while and routes query the database directly.
+    """
+    
+    def __init__(self):
+        self._ttl = settings.EMAIL_CACHE_TTL_SECONDS
+        self._disabled_until = 0.0
+        # (org_id, user_id, field) -> response being built by another request
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+    
+    async def get_or_build(
+        self,
+        org_id: str,
+        user_id: str,
+        field: str,
+        build: Callable[[], Awaitable[bytes]]
+    ) -> bytes:
+        """
+        Return the cached response, building (and caching) it on a miss.
+        
+        Concurrent misses for the same field in this process share a single
+        build: a UI refreshing on focus fires the same list query several
+        times at once, and only the first one reaches the database. Errors
+        raised by build (e.g. a 404) are re-raised to every waiter.
+        """
+        body = await self.get(org_id, user_id, field)
+        if body is not None:
+            return body
+        
+        key = (org_id, user_id, field)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # shield: a waiter's client disconnecting must not cancel the shared build
+            return await asyncio.shield(inflight)
+        
+        # No await between the lookup above and this insert, so no lock is needed
+        future = asyncio.get_running_loop().create_future()
+        # Mark errors as retrieved even if no other request was waiting
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            body = await build()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(body)
+        finally:
+            del self._inflight[key]
+        
+        await self.set(org_id, user_id, field, body)
+        return body
+    
+    async def get(self, org_id: str, user_id: str, field: str) -> Optional[bytes]:
+        """Return a cached response body, or None on miss/expiry"""
+        if not self._available():
+            return None
+        try:
+            raw = await get_redis().hget(_user_key(org_id, user_id), field)
+        except (RedisError, OSError) as e:
+            self._backoff(e)
+            return None
+        if raw is None:
+            return None
+        
+        expires_at, _, body = raw.partition(b"|")
+        if float(expires_at) <= time.time():
+            return None
+        return body
+    
+    async def set(self, org_id: str, user_id: str, field: str, body: bytes) -> None:
+        """Store a response body for TTL seconds"""
+        if not self._available():
+            return
+        key = _user_key(org_id, user_id)
+        value = f"{time.time() + self._ttl:.3f}|".encode() + body
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.hset(key, field, value)
+                pipe.expire(key, self._ttl)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            self._backoff(e)
+    
+    async def invalidate(self, org_id: str, user_id: str) -> None:
+        """Drop every cached response for a user (after a sync)"""
+        try:
+            await get_redis().delete(_user_key(org_id, user_id))
+        except (RedisError, OSError) as e:
+            # Entries still expire via TTL; stop serving from Redis until then
+            logger.warning(f"Email cache invalidation failed: {type(e).__name__}")
+            self._disabled_until = time.monotonic() + self._ttl
+    
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+    
+    def _backoff(self, e: Exception) -> None:
+        logger.warning(f"Email cache unavailable, bypassing for {_RETRY_AFTER_SECONDS}s: {type(e).__name__}")
+        self._disabled_until = time.monotonic() + _RETRY_AFTER_SECONDS
+
+
+# Singleton instance
+_email_cache: Optional[EmailCache] = None
+
+
+def get_email_cache() -> EmailCache:
+    """Get or create EmailCache singleton"""
+    global _email_cache
+    if _email_cache is None:
+        _email_cache = EmailCache()
+    return _email_cache
+
+
+__all__ = ["EmailCache", "get_email_cache"]
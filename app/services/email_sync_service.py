@@ -4,19 +4,29 @@ Syncs emails from Gmail to local database
 """
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List, Tuple
+from typing import Any, Dict, Optional, List, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.core.config import get_settings
 from app.models.email import Email
 from app.models.user import User
 from app.ingestion.email_fetcher import GmailFetcher, create_gmail_fetcher_for_user
 from app.ingestion.email_parser import ParsedEmail
+from app.services.email_cache import get_email_cache
+from app.services.semantic_cache import get_semantic_cache
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Emails checked and inserted per round trip
+_INSERT_CHUNK_SIZE = 100
+
+# Columns of the unique index the inserts conflict on (alembic 0012)
+_MESSAGE_KEY = ["org_id", "user_id", "message_id"]
+
 
 class EmailSyncService:
     """
@@ -43,7 +53,9 @@ class EmailSyncService:
         Returns:
             Tuple of (synced_count, skipped_count, errors)
         """
-        logger.info(f"Starting email sync for user {user.id}")
+        # Read once: a failed chunk rolls back and expires the user instance
+        org_id, user_id = user.org_id, user.id
+        logger.info(f"Starting email sync for user {user_id}")
         
         # Calculate sync date (ensure timezone-aware)
         if user.last_email_sync:
@@ -70,57 +82,74 @@ class EmailSyncService:
         try:
             # First, fetch all emails from Gmail (separate from DB operations)
             logger.info(f"Fetching emails from Gmail since {since_date}")
-            fetched_emails = []
-            async for parsed_email in fetcher.fetch_emails_since(
-                since_date=since_date,
-                max_results=max_emails,
-                label_ids=["INBOX"]  # Only inbox for now
-            ):
-                fetched_emails.append(parsed_email)
+            fetched_emails = [
+                parsed_email
+                async for parsed_email in fetcher.fetch_emails_since(
+                    since_date=since_date,
+                    max_results=max_emails,
+                    label_ids=["INBOX"]  # Only inbox for now
+                )
+            ]
             
             logger.info(f"Fetched {len(fetched_emails)} emails from Gmail")
             
-            # Now process and save emails to database
-            for parsed_email in fetched_emails:
+            # Save new emails in chunks: one existence query and one multi-row
+            # INSERT per chunk instead of a SELECT and an INSERT per email
+            seen: Set[str] = set()
+            for chunk_start in range(0, len(fetched_emails), _INSERT_CHUNK_SIZE):
+                chunk = fetched_emails[chunk_start:chunk_start + _INSERT_CHUNK_SIZE]
                 try:
-                    # Check if email already exists
-                    existing = await self._email_exists(
-                        db, user.org_id, user.id, parsed_email.message_id
-                    )
-                    
-                    if existing:
-                        skipped_count += 1
-                        continue
-                    
-                    # Create email record
-                    email = self._create_email_from_parsed(
-                        parsed_email, user.org_id, str(user.id)
+                    existing = await self._existing_message_ids(
+                        db, org_id, user_id, [parsed.message_id for parsed in chunk]
                     )
                     
-                    db.add(email)
-                    synced_count += 1
+                    rows = []
+                    for parsed_email in chunk:
+                        if parsed_email.message_id in existing or parsed_email.message_id in seen:
+                            skipped_count += 1
+                            continue
+                        seen.add(parsed_email.message_id)
+                        rows.append(self._row_from_parsed(parsed_email, org_id, user_id))
                     
-                    # Commit in batches
-                    if synced_count % 20 == 0:
+                    if rows:
+                        # A concurrent sync may have stored some of these since
+                        # the check above; the unique index turns those into no-ops
+                        dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+                        result = await db.execute(
+                            dialect_insert(Email)
+                            .values(rows)
+                            .on_conflict_do_nothing(index_elements=_MESSAGE_KEY)
+                        )
+                        inserted = result.rowcount
+                        # Same transaction as the insert, so the counter never
+                        # drifts from the table; SQL-side increment is race-free
+                        user.email_count = User.email_count + inserted
                         await db.commit()
+                        synced_count += inserted
+                        skipped_count += len(rows) - inserted
                         logger.info(f"Synced {synced_count} emails so far...")
                         
                 except Exception as e:
-                    error_msg = f"Error syncing email {parsed_email.message_id}: {e}"
+                    error_msg = (
+                        f"Error syncing emails {chunk_start + 1}-{chunk_start + len(chunk)}: {e}"
+                    )
                     logger.error(error_msg)
                     print(f"\n[EMAIL FETCH ERROR] {error_msg}")
-                    errors.append(f"Email {parsed_email.message_id}: {str(e)}")
-            
-            # Final commit
-            await db.commit()
+                    errors.append(error_msg)
+                    await db.rollback()
             
             # Update user's last sync time
             user.last_email_sync = datetime.now(timezone.utc)
             db.add(user)
             await db.commit()
             
+            # Cached email listings and RAG answers may not reflect the new emails
+            await get_email_cache().invalidate(org_id, user_id)
+            if synced_count:
+                get_semantic_cache().invalidate_user(org_id, user_id)
+            
             logger.info(
-                f"Email sync complete for user {user.id}: "
+                f"Email sync complete for user {user_id}: "
                 f"synced={synced_count}, skipped={skipped_count}, errors={len(errors)}"
             )
             
@@ -133,34 +162,33 @@ class EmailSyncService:
         
         return synced_count, skipped_count, errors
     
-    async def _email_exists(
+    async def _existing_message_ids(
         self,
         db: AsyncSession,
         org_id: str,
         user_id: str,
-        message_id: str
-    ) -> bool:
-        """Check if email already exists in database"""
+        message_ids: List[str]
+    ) -> Set[str]:
+        """Message IDs from the given list already stored for the user"""
         result = await db.execute(
-            select(Email.id).where(
-                and_(
-                    Email.org_id == org_id,
-                    Email.user_id == user_id,
-                    Email.message_id == message_id
-                )
-            ).limit(1)
+            select(Email.message_id).where(
+                Email.owned_by(org_id, user_id),
+                Email.message_id.in_(message_ids)
+            )
         )
-        return result.scalar_one_or_none() is not None
+        return set(result.scalars())
     
-    def _create_email_from_parsed(
+    def _row_from_parsed(
         self,
         parsed: ParsedEmail,
         org_id: str,
         user_id: str,
         provider: str = "google"
-    ) -> Email:
-        """Convert ParsedEmail to Email model"""
-        return Email(
+    ) -> Dict[str, Any]:
+        """Convert ParsedEmail to an emails row for bulk insert"""
+        # ParsedEmail list fields default to [], so an empty join maps to NULL
+        now = datetime.now(timezone.utc)
+        return dict(
             org_id=org_id,
             user_id=user_id,
             message_id=parsed.message_id,
@@ -168,16 +196,16 @@ class EmailSyncService:
             subject=parsed.subject,
             sender=parsed.sender,
             sender_name=parsed.sender_name,
-            recipients_to=",".join(parsed.recipients_to) if parsed.recipients_to else None,
-            recipients_cc=",".join(parsed.recipients_cc) if parsed.recipients_cc else None,
-            recipients_bcc=",".join(parsed.recipients_bcc) if parsed.recipients_bcc else None,
-            sent_at=parsed.sent_at or datetime.now(timezone.utc),
-            received_at=datetime.now(timezone.utc),
+            recipients_to=",".join(parsed.recipients_to) or None,
+            recipients_cc=",".join(parsed.recipients_cc) or None,
+            recipients_bcc=",".join(parsed.recipients_bcc) or None,
+            sent_at=parsed.sent_at or now,
+            received_at=now,
             body_text=parsed.body_text,
             body_html=parsed.body_html,
             has_attachments=parsed.has_attachments,
             attachment_count=parsed.attachment_count,
-            labels=",".join(parsed.labels) if parsed.labels else None,
+            labels=",".join(parsed.labels) or None,
             provider=provider,
             provider_message_id=parsed.message_id
         )
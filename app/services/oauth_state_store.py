@@ -0,0 +1,106 @@
+"""
+OAuth State Store
+Short-lived CSRF state tokens for the Google OAuth flow, shared via Redis
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.db.redis import get_redis
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# How long to stop talking to Redis after a connection failure
+_RETRY_AFTER_SECONDS = 30
+
+
+class OAuthStateStore:
+    """
+    Issues and consumes OAuth `state` tokens for one flow.
+    
+    States live in Redis under oauth:state:{flow}:{state} with a TTL, so the
+    callback can land on any worker and unused states expire on their own.
+    Consuming is a single GETDEL: validation and one-time use in one round
+    trip, with no window for a replay.
+    
+    Redis is optional: while it is unreachable, states are kept in a
+    TTL- and size-bounded in-process dict, which only works when /start and
+    the callback hit the same worker (fine for local development).
+    """
+    
+    def __init__(self, flow: str):
+        self._prefix = f"oauth:state:{flow}:"
+        self._ttl = settings.OAUTH_STATE_TTL_SECONDS
+        self._local_max = settings.OAUTH_STATE_LOCAL_MAX_ENTRIES
+        # state -> (payload, expires_at); insertion order is expiry order
+        self._local: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._disabled_until = 0.0
+    
+    async def save(self, state: str, payload: Dict[str, Any]) -> None:
+        """Remember a freshly issued state until it is consumed or expires"""
+        raw = json.dumps(payload)
+        if self._available():
+            try:
+                await get_redis().set(self._prefix + state, raw, ex=self._ttl)
+                return
+            except (RedisError, OSError) as e:
+                self._backoff(e)
+        
+        self._sweep_local()
+        self._local[state] = (raw, time.monotonic() + self._ttl)
+        # Expired states are swept above; this caps a burst of abandoned ones
+        if len(self._local) > self._local_max:
+            self._local.popitem(last=False)
+    
+    async def consume(self, state: str) -> Optional[Dict[str, Any]]:
+        """Return and delete a state's payload; None if unknown, used or expired"""
+        # A single pop (like GETDEL below): no await or second lookup between
+        # the check and the delete, so a state can never be consumed twice
+        local = self._local.pop(state, None)
+        if local is not None:
+            return json.loads(local[0]) if local[1] > time.monotonic() else None
+        
+        if not self._available():
+            return None
+        try:
+            raw = await get_redis().getdel(self._prefix + state)
+        except (RedisError, OSError) as e:
+            self._backoff(e)
+            return None
+        return json.loads(raw) if raw is not None else None
+    
+    def _sweep_local(self) -> None:
+        now = time.monotonic()
+        while self._local:
+            state, (_, expires_at) = next(iter(self._local.items()))
+            if expires_at > now:
+                break
+            del self._local[state]
+    
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+    
+    def _backoff(self, e: Exception) -> None:
+        logger.warning(f"OAuth state store unavailable, using local states for {_RETRY_AFTER_SECONDS}s: {type(e).__name__}")
+        self._disabled_until = time.monotonic() + _RETRY_AFTER_SECONDS
+
+
+# One store per OAuth flow (the API and test routes use separate callbacks)
+_stores: Dict[str, OAuthStateStore] = {}
+
+
+def get_oauth_state_store(flow: str = "google") -> OAuthStateStore:
+    """Get or create the state store for an OAuth flow"""
+    store = _stores.get(flow)
+    if store is None:
+        store = _stores[flow] = OAuthStateStore(flow)
+    return store
+
+
+__all__ = ["OAuthStateStore", "get_oauth_state_store"]
@@ -2,17 +2,20 @@
 RAG Service - Orchestrates Complete Query-to-Answer Flow
 Integrates: Vector search → CrewAI pipeline → Response formatting
 """
-from typing import Dict, Any, Optional, List
+from typing import AsyncIterator, Dict, Any, Optional, List, Tuple
+import asyncio
 import logging
+import threading
 from datetime import datetime
 import uuid
 
 from app.embeddings.embedder import get_embedding_service
 from app.vectorstore.pinecone_index import get_pinecone_operations
-from app.vectorstore.filters import create_rag_query_filter
+from app.vectorstore.filters import create_rag_query_filter, matches_date_range
 from app.crew.crew_runner import get_rag_crew
+from app.services.semantic_cache import get_semantic_cache
 from app.core.config import get_settings
-from app.core.logging import audit_logger
+from app.core.logging import audit_logger, performance_logger
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
@@ -31,6 +34,7 @@ class RAGService:
         self.embedding_service = get_embedding_service()
         self.pinecone_ops = get_pinecone_operations()
         self.rag_crew = get_rag_crew()
+        self.semantic_cache = get_semantic_cache()
     
     async def query(
         self,
@@ -41,7 +45,9 @@ class RAGService:
         date_to: Optional[str] = None,
         sender: Optional[str] = None,
         top_k: int = None,
-        request_id: Optional[str] = None
+        request_id: Optional[str] = None,
+        progress: Optional[asyncio.Queue] = None,
+        corpus_version: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Execute RAG query end-to-end.
@@ -55,6 +61,9 @@ class RAGService:
             sender: Optional sender email filter
             top_k: Max results to retrieve (default from settings)
             request_id: Optional request tracing ID
+            progress: Optional queue receiving stage events (see query_stream)
+            corpus_version: Marker that changes whenever the user's mailbox is
+                synced (e.g. last_email_sync); scopes semantic cache entries
             
         Returns:
             Dictionary with answer, sources, and metadata
@@ -77,6 +86,21 @@ class RAGService:
             logger.debug(f"Generating query embedding for request_id={request_id}")
             query_embedding = await self.embedding_service.generate_query_embedding(query)
             
+            # Near-duplicate of a recent query with the same filters: reuse the
+            # answer and skip retrieval + the CrewAI pipeline entirely. Syncs can
+            # run in a worker process, so entries are also keyed by corpus_version
+            # rather than relying only on in-process invalidation.
+            cache_filters = (date_from, date_to, sender, corpus_version)
+            cached = await self.semantic_cache.get(org_id, user_id, cache_filters, query_embedding)
+            if self.semantic_cache.enabled:
+                performance_logger.log_cache_lookup(
+                    cache="semantic_response",
+                    hit=cached is not None,
+                    hit_rate=self.semantic_cache.hit_rate
+                )
+            if cached is not None:
+                return self._cached_response(cached, query, org_id, user_id, start_time, request_id)
+            
             # Step 2: Build namespace for tenant isolation
             namespace = settings.get_namespace(org_id, user_id)
             logger.debug(f"Using namespace: {namespace}")
@@ -91,14 +115,22 @@ class RAGService:
             )
             
             # Step 4: Query Pinecone
+            if progress is not None:
+                progress.put_nowait({"stage": "retrieving"})
             logger.debug(f"Querying Pinecone with top_k={top_k}")
-            retrieved_chunks = self.pinecone_ops.query_vectors(
+            retrieved_chunks = await self.pinecone_ops.query_vectors(
                 query_vector=query_embedding,
                 namespace=namespace,
                 top_k=top_k,
                 filter_dict=filter_dict,
                 include_metadata=True
             )
+            if date_from or date_to:
+                # Vectors indexed before sent_at_ts pass the index filter; check their ISO date
+                retrieved_chunks = [
+                    chunk for chunk in retrieved_chunks
+                    if matches_date_range(chunk.get("metadata") or {}, date_from, date_to)
+                ]
             
             if not retrieved_chunks:
                 logger.warning(f"No chunks retrieved for request_id={request_id}")
@@ -107,13 +139,23 @@ class RAGService:
             logger.info(f"Retrieved {len(retrieved_chunks)} chunks for request_id={request_id}")
             
             # Step 5: Execute CrewAI pipeline
+            on_task_done = None
+            if progress is not None:
+                progress.put_nowait({"stage": "generating", "retrieval_count": len(retrieved_chunks)})
+                # The crew runs in a worker thread; hand each agent completion
+                # back to the event loop as a stage event
+                loop = asyncio.get_running_loop()
+                
+                def on_task_done(task: str) -> None:
+                    loop.call_soon_threadsafe(progress.put_nowait, {"stage": "agent_done", "task": task})
             logger.debug("Executing CrewAI pipeline")
             crew_result = await self.rag_crew.run_rag_pipeline(
                 user_query=query,
                 retrieved_chunks=retrieved_chunks,
                 org_id=org_id,
                 user_id=user_id,
-                request_id=request_id
+                request_id=request_id,
+                on_task_done=on_task_done
             )
             
             # Step 6: Format response
@@ -129,6 +171,8 @@ class RAGService:
                 request_id=request_id
             )
             
+            await self.semantic_cache.put(org_id, user_id, cache_filters, query_embedding, response)
+            
             # Step 7: Audit log
             processing_time = (datetime.now() - start_time).total_seconds() * 1000
             audit_logger.log_rag_query(
@@ -168,6 +212,67 @@ class RAGService:
                 }
             }
     
+    async def query_stream(self, **query_kwargs: Any) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Run query() while yielding ("stage", {...}) progress events as they
+        happen, then a final ("result", response) event.
+        
+        The CrewAI pipeline returns a single structured answer, so progress is
+        reported per pipeline stage (retrieving, generating, then one
+        agent_done per agent) rather than per generated token.
+        """
+        progress: asyncio.Queue = asyncio.Queue()
+        task = asyncio.create_task(self.query(progress=progress, **query_kwargs))
+        try:
+            while not task.done():
+                getter = asyncio.ensure_future(progress.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield "stage", getter.result()
+                else:
+                    getter.cancel()
+            while not progress.empty():
+                yield "stage", progress.get_nowait()
+            yield "result", task.result()
+        finally:
+            # Client went away mid-stream: don't leave the pipeline running
+            if not task.done():
+                task.cancel()
+    
+    def _cached_response(
+        self,
+        cached: Dict[str, Any],
+        query: str,
+        org_id: str,
+        user_id: str,
+        start_time: datetime,
+        request_id: str
+    ) -> Dict[str, Any]:
+        """Re-stamp a semantic cache hit for this request and audit it"""
+        processing_time = (datetime.now() - start_time).total_seconds() * 1000
+        metadata = cached["metadata"]
+        
+        audit_logger.log_rag_query(
+            user_id=user_id,
+            org_id=org_id,
+            query=query,
+            filters=metadata.get("filters", {}),
+            result_count=metadata.get("retrieval_count", 0),
+            processing_time_ms=processing_time,
+            request_id=request_id
+        )
+        logger.info(f"RAG query served from semantic cache: request_id={request_id}")
+        
+        response = dict(cached)
+        response["metadata"] = {
+            **metadata,
+            "request_id": request_id,
+            "query": query,
+            "processing_time_ms": processing_time,
+            "cache_hit": True
+        }
+        return response
+    
     def _no_results_response(
         self,
         query: str,
@@ -229,7 +334,8 @@ class RAGService:
                 "processing_time_ms": processing_time,
                 "answer_complete": crew_result.get("answer_complete", True),
                 "confidence": crew_result.get("confidence", "medium"),
-                "agent_timings": metadata.get("agent_timings", {})
+                "agent_timings": metadata.get("agent_timings", {}),
+                "cache_hit": False
             }
         }
         
@@ -242,6 +348,8 @@ class RAGService:
 
 # Singleton
 _rag_service: Optional[RAGService] = None
+# The app lifespan builds the service in a worker thread; never build two
+_rag_service_lock = threading.Lock()
 
 
 def get_rag_service() -> RAGService:
@@ -249,7 +357,9 @@ def get_rag_service() -> RAGService:
     global _rag_service
     
     if _rag_service is None:
-        _rag_service = RAGService()
+        with _rag_service_lock:
+            if _rag_service is None:
+                _rag_service = RAGService()
     
     return _rag_service
 
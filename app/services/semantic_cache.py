@@ -0,0 +1,276 @@
+"""
+Semantic Response Cache
+Reuses RAG answers for near-duplicate queries from the same user
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import base64
+import hashlib
+import logging
+import time
+
+import numpy as np
+import orjson
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.db.redis import get_redis
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# How long to stop talking to Redis after a connection failure
+_RETRY_AFTER_SECONDS = 30
+
+
+def _redis_key(key: Tuple[str, str, Tuple[Optional[str], ...]]) -> str:
+    """Shared bucket key; the filters are hashed to keep keys short and free of user input"""
+    org_id, user_id, filters = key
+    digest = hashlib.blake2b(repr(filters).encode("utf-8"), digest_size=8).hexdigest()
+    return f"rag:sem:{org_id}:{user_id}:{digest}"
+
+
+class _UserBucket:
+    """
+    Cached (query embedding, response) pairs for one user + filter set.
+    
+    Vectors are stored L2-normalized so cosine similarity is a single
+    matrix-vector product; the stacked matrix is rebuilt only after inserts.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        # entry id -> (unit vector, response, expires_at), oldest first
+        self.entries: "OrderedDict[int, Tuple[np.ndarray, Dict[str, Any], float]]" = OrderedDict()
+        self._next_id = 0
+        self._ids: List[int] = []
+        self._matrix: Optional[np.ndarray] = None
+    
+    def lookup(self, query_vec: np.ndarray, threshold: float, now: float) -> Optional[Dict[str, Any]]:
+        if not self.entries:
+            return None
+        if self._matrix is None:
+            self._ids = list(self.entries)
+            self._matrix = np.stack([self.entries[i][0] for i in self._ids])
+        
+        scores = self._matrix @ query_vec
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        
+        entry_id = self._ids[best]
+        _, response, expires_at = self.entries[entry_id]
+        if expires_at <= now:
+            self._remove(entry_id)
+            return None
+        
+        self.entries.move_to_end(entry_id)
+        return response
+    
+    def insert(self, query_vec: np.ndarray, response: Dict[str, Any], expires_at: float) -> None:
+        while len(self.entries) >= self.capacity:
+            self.entries.popitem(last=False)
+        self.entries[self._next_id] = (query_vec, response, expires_at)
+        self._next_id += 1
+        self._matrix = None
+    
+    def _remove(self, entry_id: int) -> None:
+        del self.entries[entry_id]
+        self._matrix = None
+
+
+class SemanticResponseCache:
+    """
+    Two-tier semantic cache in front of the CrewAI pipeline.
+    
+    Keyed by (org_id, user_id, filters) so answers never cross tenants or
+    filter scopes. A query whose embedding has cosine similarity >= threshold
+    with a cached query returns the cached response instead of running
+    retrieval and generation again.
+    
+    Lookups hit the in-process buckets first, then a per-key Redis list
+    (rag:sem:{org_id}:{user_id}:{filters hash}) holding the newest entries
+    from every worker, so an answer generated anywhere is reused everywhere
+    and survives restarts. Redis is optional: on any Redis error the shared
+    tier steps aside for a short while.
+    """
+    
+    def __init__(self):
+        self.enabled = settings.SEMANTIC_CACHE_ENABLED
+        self.threshold = settings.SEMANTIC_CACHE_THRESHOLD
+        self.ttl_seconds = settings.SEMANTIC_CACHE_TTL_SECONDS
+        self.max_entries_per_user = settings.SEMANTIC_CACHE_MAX_ENTRIES_PER_USER
+        self.max_users = settings.SEMANTIC_CACHE_MAX_USERS
+        self._buckets: "OrderedDict[Hashable, _UserBucket]" = OrderedDict()
+        self._disabled_until = 0.0
+        self.hits = 0
+        self.misses = 0
+    
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups served from cache since process start"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if norm == 0.0:
+            return None
+        return vec / norm
+    
+    async def get(
+        self,
+        org_id: str,
+        user_id: str,
+        filters: Tuple[Optional[str], ...],
+        embedding: List[float]
+    ) -> Optional[Dict[str, Any]]:
+        """Return a cached response for a semantically equivalent query, if any"""
+        if not self.enabled:
+            return None
+        
+        response = None
+        key = (org_id, user_id, filters)
+        query_vec = self._normalize(embedding)
+        if query_vec is not None:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                response = bucket.lookup(query_vec, self.threshold, time.monotonic())
+            if response is None:
+                response = await self._get_shared(key, query_vec)
+        
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._buckets.move_to_end(key)
+        return response
+    
+    async def put(
+        self,
+        org_id: str,
+        user_id: str,
+        filters: Tuple[Optional[str], ...],
+        embedding: List[float],
+        response: Dict[str, Any]
+    ) -> None:
+        """Cache a freshly generated response under its query embedding"""
+        if not self.enabled:
+            return
+        query_vec = self._normalize(embedding)
+        if query_vec is None:
+            return
+        
+        key = (org_id, user_id, filters)
+        self._put_local(key, query_vec, response, self.ttl_seconds)
+        
+        if not self._available():
+            return
+        redis_key = _redis_key(key)
+        entry = orjson.dumps({
+            "vector": base64.b64encode(query_vec.tobytes()).decode("ascii"),
+            "response": response,
+            "expires_at": time.time() + self.ttl_seconds
+        }, default=str)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.lpush(redis_key, entry)
+                pipe.ltrim(redis_key, 0, self.max_entries_per_user - 1)
+                pipe.expire(redis_key, self.ttl_seconds)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            self._backoff(e)
+    
+    def _put_local(
+        self,
+        key: Tuple[str, str, Tuple[Optional[str], ...]],
+        query_vec: np.ndarray,
+        response: Dict[str, Any],
+        ttl_seconds: float
+    ) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            while len(self._buckets) >= self.max_users:
+                self._buckets.popitem(last=False)
+            bucket = self._buckets[key] = _UserBucket(self.max_entries_per_user)
+        else:
+            self._buckets.move_to_end(key)
+        
+        bucket.insert(query_vec, response, time.monotonic() + ttl_seconds)
+    
+    async def _get_shared(
+        self,
+        key: Tuple[str, str, Tuple[Optional[str], ...]],
+        query_vec: np.ndarray
+    ) -> Optional[Dict[str, Any]]:
+        """Look for a match among entries cached in Redis by any worker"""
+        if not self._available():
+            return None
+        try:
+            raws = await get_redis().lrange(_redis_key(key), 0, -1)
+        except (RedisError, OSError) as e:
+            self._backoff(e)
+            return None
+        
+        now = time.time()
+        entries = []
+        vectors = []
+        for raw in raws:
+            entry = orjson.loads(raw)
+            vec = np.frombuffer(base64.b64decode(entry["vector"]), dtype=np.float32)
+            # Skip expired entries and ones from a different embedding model
+            if entry["expires_at"] > now and vec.shape == query_vec.shape:
+                entries.append(entry)
+                vectors.append(vec)
+        if not entries:
+            return None
+        
+        scores = np.stack(vectors) @ query_vec
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        
+        # Keep the match in-process so repeats skip the Redis round trip
+        entry = entries[best]
+        self._put_local(key, vectors[best], entry["response"], entry["expires_at"] - now)
+        return entry["response"]
+    
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+    
+    def _backoff(self, e: Exception) -> None:
+        logger.warning(f"Semantic cache Redis tier unavailable, bypassing for {_RETRY_AFTER_SECONDS}s: {type(e).__name__}")
+        self._disabled_until = time.monotonic() + _RETRY_AFTER_SECONDS
+    
+    def invalidate_user(self, org_id: str, user_id: str) -> None:
+        """
+        Drop every in-process cached answer for a user (e.g. after new emails
+        are synced). Shared entries need no purge: callers put the corpus
+        version in the filters, so a sync moves lookups to fresh keys and the
+        old ones expire.
+        """
+        stale = [key for key in self._buckets if key[0] == org_id and key[1] == user_id]
+        for key in stale:
+            del self._buckets[key]
+        if stale:
+            logger.debug(f"Semantic cache cleared for user_id={user_id}")
+
+
+# Singleton
+_semantic_cache: Optional[SemanticResponseCache] = None
+
+
+def get_semantic_cache() -> SemanticResponseCache:
+    """Get or create SemanticResponseCache singleton"""
+    global _semantic_cache
+    
+    if _semantic_cache is None:
+        _semantic_cache = SemanticResponseCache()
+    
+    return _semantic_cache
+
+
+# Export
+__all__ = ["SemanticResponseCache", "get_semantic_cache"]
@@ -0,0 +1,94 @@
+"""
+Sync Lock
+One email sync job per user at a time, held in Redis for the job's lifetime
+"""
+import logging
+import time
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from app.core.config import get_settings
+from app.db.redis import get_redis
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# How long to stop talking to Redis after a connection failure
+_RETRY_AFTER_SECONDS = 30
+
+# Delete the lock only if this job still holds it (it may have expired and
+# been taken by a newer job)
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class SyncLock:
+    """
+    Per-user lock taken by POST /emails/sync and released by the job.
+    
+    The lock lives under sync:lock:{user_id} and holds the owning job id, so
+    a second request can hand back the job already queued or running. It is
+    set with SET NX before the job is enqueued and deleted when the job
+    finishes; the TTL only matters if a worker dies mid-job.
+    
+    Redis is optional here too: while it is unreachable the lock is skipped
+    (the Celery broker shares that Redis, so enqueueing would fail anyway).
+    """
+    
+    def __init__(self):
+        self._prefix = "sync:lock:"
+        self._ttl = settings.SYNC_LOCK_TTL_SECONDS
+        self._disabled_until = 0.0
+    
+    async def acquire(self, user_id: str, job_id: str) -> Optional[str]:
+        """Take the user's lock for job_id; returns the holder's job id if already taken"""
+        if not self._available():
+            return None
+        key = self._prefix + user_id
+        redis = get_redis()
+        try:
+            # Second round only if the holder released between our SET and GET
+            for _ in range(2):
+                if await redis.set(key, job_id, nx=True, ex=self._ttl):
+                    return None
+                holder = await redis.get(key)
+                if holder is not None:
+                    return holder.decode()
+        except (RedisError, OSError) as e:
+            self._backoff(e)
+        return None
+    
+    async def release(self, user_id: str, job_id: str) -> None:
+        """Release the user's lock if job_id still holds it"""
+        if not self._available():
+            return
+        try:
+            await get_redis().eval(_RELEASE_SCRIPT, 1, self._prefix + user_id, job_id)
+        except (RedisError, OSError) as e:
+            self._backoff(e)
+    
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+    
+    def _backoff(self, e: Exception) -> None:
+        logger.warning(f"Sync lock unavailable, skipping it for {_RETRY_AFTER_SECONDS}s: {type(e).__name__}")
+        self._disabled_until = time.monotonic() + _RETRY_AFTER_SECONDS
+
+
+_sync_lock: Optional[SyncLock] = None
+
+
+def get_sync_lock() -> SyncLock:
+    """Get or create the SyncLock singleton"""
+    global _sync_lock
+    if _sync_lock is None:
+        _sync_lock = SyncLock()
+    return _sync_lock
+
+
+__all__ = ["SyncLock", "get_sync_lock"]
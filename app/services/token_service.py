@@ -10,6 +10,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.config import get_settings
+from app.core.http import get_http_session
 from app.models.user import User
 
 settings = get_settings()
@@ -77,8 +78,9 @@ class TokenService:
         db: AsyncSession,
         user: User,
         access_token: str,
-        refresh_token: str,
-        expires_in: int
+        refresh_token: Optional[str],
+        expires_in: int,
+        commit: bool = True
     ) -> User:
         """
         Encrypt and store OAuth tokens for a user.
@@ -87,22 +89,26 @@ class TokenService:
             db: Database session
             user: User model instance
             access_token: OAuth access token
-            refresh_token: OAuth refresh token
+            refresh_token: OAuth refresh token; None keeps the stored one
+                (Google omits it when access was already granted)
             expires_in: Token lifetime in seconds
+            commit: If False, only stage the changes so they are written with
+                the caller's transaction (one COMMIT for the whole request)
             
         Returns:
             Updated user instance
         """
         # Encrypt tokens
         user.encrypted_access_token = self.encrypt_token(access_token)
-        user.encrypted_refresh_token = self.encrypt_token(refresh_token)
+        if refresh_token:
+            user.encrypted_refresh_token = self.encrypt_token(refresh_token)
         
         # Calculate expiration time
         user.token_expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
         
         db.add(user)
-        await db.commit()
-        await db.refresh(user)
+        if commit:
+            await db.commit()
         
         logger.info(f"Stored OAuth tokens for user {user.id}")
         return user
@@ -174,8 +180,6 @@ class TokenService:
         Returns:
             Tuple of (access_token, new_refresh_token, expires_in) or None
         """
-        import aiohttp
-        
         token_url = "https://oauth2.googleapis.com/token"
         
         data = {
@@ -186,20 +190,20 @@ class TokenService:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(token_url, data=data) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Token refresh failed: {error_text}")
-                        return None
-                    
-                    token_data = await response.json()
-                    
-                    return (
-                        token_data["access_token"],
-                        token_data.get("refresh_token"),  # May not be included
-                        token_data.get("expires_in", 3600)
-                    )
+            session = get_http_session()
+            async with session.post(token_url, data=data) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"Token refresh failed: {error_text}")
+                    return None
+                
+                token_data = await response.json()
+                
+                return (
+                    token_data["access_token"],
+                    token_data.get("refresh_token"),  # May not be included
+                    token_data.get("expires_in", 3600)
+                )
                     
         except Exception as e:
             logger.error(f"Token refresh request failed: {e}")
@@ -216,19 +220,17 @@ class TokenService:
         Returns:
             True if successful
         """
-        import aiohttp
-        
         # Revoke at Google
         access_token = self.decrypt_token(user.encrypted_access_token)
         if access_token:
             try:
                 revoke_url = f"https://oauth2.googleapis.com/revoke?token={access_token}"
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(revoke_url) as response:
-                        if response.status == 200:
-                            logger.info(f"Revoked Google token for user {user.id}")
-                        else:
-                            logger.warning(f"Token revocation returned {response.status}")
+                session = get_http_session()
+                async with session.post(revoke_url) as response:
+                    if response.status == 200:
+                        logger.info(f"Revoked Google token for user {user.id}")
+                    else:
+                        logger.warning(f"Token revocation returned {response.status}")
             except Exception as e:
                 logger.error(f"Failed to revoke Google token: {e}")
         
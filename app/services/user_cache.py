@@ -0,0 +1,282 @@
+"""
+User Cache Service
+Redis-backed read-through cache for user lookups on the auth hot path
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import DateTime, bindparam, event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session, raiseload
+
+from app.core.config import get_settings
+from app.db.redis import get_redis
+from app.models.user import User
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Built once so SQLAlchemy reuses the cached compiled form on every lookup.
+# Filters on lower(email) so Postgres can use the uq_users_email_lower index.
+# raiseload("*"): User has no relationships today; if one is added, touching it
+# on the auth path fails loudly instead of silently issuing a SELECT per request.
+_USER_LOAD_OPTIONS = (raiseload("*"),)
+_USER_BY_EMAIL = select(User).options(*_USER_LOAD_OPTIONS).where(func.lower(User.email) == bindparam("email"))
+
+# Every mapped column is cached: a partially populated instance would lazy-load
+# the missing attributes, which is an error under asyncio.
+_COLUMN_KEYS = tuple(attr.key for attr in inspect(User).column_attrs)
+_DATETIME_KEYS = frozenset(
+    attr.key for attr in inspect(User).column_attrs
+    if isinstance(attr.columns[0].type, DateTime)
+)
+
+# session.info key collecting (user_id, email) pairs changed in a transaction
+_STALE_KEY = "user_cache_stale"
+
+# How long to stop talking to Redis after a connection failure
+_RETRY_AFTER_SECONDS = 30
+
+
+def _id_key(user_id: str) -> str:
+    return f"u:id:{user_id}"
+
+
+def _email_key(email: str) -> str:
+    return f"u:email:{email}"
+
+
+class AuthUser(NamedTuple):
+    """The few user columns most authenticated routes actually read"""
+    id: str
+    org_id: str
+    is_active: bool
+    encrypted_access_token: Optional[str]
+    last_email_sync: Optional[datetime]
+
+
+class UserCache:
+    """
+    Caches User rows by id and by email in two tiers: a small in-process LRU
+    (short TTL, no network hop) in front of Redis (shared across workers).
+    
+    Hits are re-attached to the caller's session with merge(load=False), so
+    routes get a normal persistent User without a SELECT. Entries are dropped
+    after any committed UPDATE/DELETE of the user (see listeners below) and
+    otherwise expire after USER_CACHE_TTL_SECONDS. Only serialized column rows are
+    kept in-process, never ORM instances, so no session state is retained.
+    
+    Redis is optional: on any Redis error the cache steps aside for a short
+    while and lookups go straight to the database.
+    """
+    
+    def __init__(self):
+        """Initialize with TTL from settings"""
+        self._ttl = settings.USER_CACHE_TTL_SECONDS
+        self._local_ttl = settings.USER_CACHE_LOCAL_TTL_SECONDS
+        self._local_max = settings.USER_CACHE_LOCAL_MAX_ENTRIES
+        # cache key -> (serialized row, expires_at), least recently used first
+        self._local: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._disabled_until = 0.0
+        self._pending: Set[asyncio.Task] = set()
+    
+    async def get_by_id(self, db: AsyncSession, user_id: str) -> Optional[User]:
+        """Fetch a user by primary key, served from cache when possible"""
+        user = await self._load(db, _id_key(user_id))
+        if user is None:
+            # Primary-key get: answered from the session's identity map when
+            # the user is already loaded, otherwise one PK SELECT
+            user = await db.get(User, user_id, options=_USER_LOAD_OPTIONS)
+            if user is not None:
+                await self._store(user)
+        return user
+    
+    async def get_auth_by_id(self, db: AsyncSession, user_id: str) -> Optional[AuthUser]:
+        """
+        Fetch only the auth-relevant columns for a user.
+        
+        Served from any cached row. A miss loads and caches the full row
+        (one primary-key SELECT), so the caller's following requests are
+        served without SQL; a column projection would leave the cache cold
+        and cost a query on every request.
+        """
+        raw = await self._load_raw(_id_key(user_id))
+        if raw is not None:
+            row = json.loads(raw)
+            last_sync = row["last_email_sync"]
+            return AuthUser(
+                row["id"], row["org_id"], row["is_active"], row["encrypted_access_token"],
+                datetime.fromisoformat(last_sync) if last_sync is not None else None
+            )
+        
+        user = await db.get(User, user_id, options=_USER_LOAD_OPTIONS)
+        if user is None:
+            return None
+        await self._store(user)
+        return AuthUser(
+            user.id, user.org_id, user.is_active, user.encrypted_access_token, user.last_email_sync
+        )
+    
+    async def get_by_email(self, db: AsyncSession, email: str) -> Optional[User]:
+        """Fetch a user by (lowercased) email, served from cache when possible"""
+        user = await self._load(db, _email_key(email))
+        if user is None:
+            user = await db.scalar(_USER_BY_EMAIL, {"email": email})
+            if user is not None:
+                await self._store(user)
+        return user
+    
+    async def invalidate(self, entries: Iterable[Tuple[str, str]]) -> None:
+        """Drop cached rows for the given (user_id, email) pairs"""
+        keys = self.forget_local(entries)
+        if not keys:
+            return
+        try:
+            await get_redis().delete(*keys)
+        except (RedisError, OSError) as e:
+            # Entries still expire via TTL; stop serving from Redis until then
+            logger.warning(f"User cache invalidation failed: {type(e).__name__}")
+            self._disabled_until = time.monotonic() + self._ttl
+    
+    def forget_local(self, entries: Iterable[Tuple[str, str]]) -> List[str]:
+        """Drop in-process entries immediately; returns the cache keys involved"""
+        keys = []
+        for user_id, email in entries:
+            if user_id:
+                keys.append(_id_key(user_id))
+            if email:
+                keys.append(_email_key(email))
+        for key in keys:
+            self._local.pop(key, None)
+        return keys
+    
+    def schedule_invalidate(self, entries: Set[Tuple[str, str]]) -> None:
+        """Invalidate from sync ORM event hooks running under the event loop"""
+        # The local tier is cleared synchronously so this process never
+        # serves the old row after commit returns
+        self.forget_local(entries)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self.invalidate(entries))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+    
+    async def drain(self) -> None:
+        """Wait for scheduled invalidations (before closing a short-lived event loop)"""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+    
+    def _available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+    
+    def _backoff(self, e: Exception) -> None:
+        logger.warning(f"User cache unavailable, bypassing for {_RETRY_AFTER_SECONDS}s: {type(e).__name__}")
+        self._disabled_until = time.monotonic() + _RETRY_AFTER_SECONDS
+    
+    def _remember(self, key: str, raw: str) -> None:
+        self._local[key] = (raw, time.monotonic() + self._local_ttl)
+        self._local.move_to_end(key)
+        if len(self._local) > self._local_max:
+            self._local.popitem(last=False)
+    
+    async def _load_raw(self, key: str) -> Optional[str]:
+        local = self._local.get(key)
+        if local is not None and local[1] > time.monotonic():
+            self._local.move_to_end(key)
+            raw = local[0]
+        else:
+            if local is not None:
+                del self._local[key]
+            if not self._available():
+                return None
+            try:
+                raw = await get_redis().get(key)
+            except (RedisError, OSError) as e:
+                self._backoff(e)
+                return None
+            if raw is None:
+                return None
+            if isinstance(raw, bytes):
+                raw = raw.decode("utf-8")
+            self._remember(key, raw)
+        return raw
+    
+    async def _load(self, db: AsyncSession, key: str) -> Optional[User]:
+        raw = await self._load_raw(key)
+        if raw is None:
+            return None
+        
+        row: Dict[str, Any] = json.loads(raw)
+        for name in _DATETIME_KEYS:
+            if row.get(name) is not None:
+                row[name] = datetime.fromisoformat(row[name])
+        
+        user = User(**row)
+        make_transient_to_detached(user)
+        return await db.merge(user, load=False)
+    
+    async def _store(self, user: User) -> None:
+        row = {}
+        for name in _COLUMN_KEYS:
+            value = getattr(user, name)
+            row[name] = value.isoformat() if isinstance(value, datetime) else value
+        payload = json.dumps(row)
+        self._remember(_id_key(user.id), payload)
+        self._remember(_email_key(user.email), payload)
+        
+        if not self._available():
+            return
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.setex(_id_key(user.id), self._ttl, payload)
+                pipe.setex(_email_key(user.email), self._ttl, payload)
+                await pipe.execute()
+        except (RedisError, OSError) as e:
+            self._backoff(e)
+
+
+# Singleton instance
+_user_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> UserCache:
+    """Get or create UserCache singleton"""
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = UserCache()
+    return _user_cache
+
+
+# Invalidation: remember users changed during a flush, drop their entries only
+# once the transaction commits so readers never re-cache uncommitted state.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _mark_user_stale(mapper, connection, target: User) -> None:
+    session = object_session(target)
+    if session is None:
+        return
+    stale = session.info.setdefault(_STALE_KEY, set())
+    stale.add((target.id, target.email))
+    # An email change leaves the old email key behind too
+    for old_email in inspect(target).attrs.email.history.deleted:
+        stale.add((target.id, old_email))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    stale = session.info.pop(_STALE_KEY, None)
+    if stale:
+        get_user_cache().schedule_invalidate(stale)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_users(session: Session) -> None:
+    session.info.pop(_STALE_KEY, None)
@@ -9,6 +9,7 @@ from .templates import (
     get_email_detail_page,
     get_oauth_error_page,
     get_oauth_success_page,
+    stream_oauth_success_page,
     get_oauth_missing_params_page,
     get_oauth_invalid_state_page,
 )
@@ -19,6 +20,7 @@ __all__ = [
     "get_email_detail_page",
     "get_oauth_error_page",
     "get_oauth_success_page",
+    "stream_oauth_success_page",
     "get_oauth_missing_params_page",
     "get_oauth_invalid_state_page",
 ]
@@ -2,8 +2,10 @@
 HTML Templates for InboxMind UI
 Shared templates for both authenticated and test routes.
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, AsyncIterator
 from datetime import datetime
+from functools import lru_cache
+from html import escape
 
 
 # ============== Base Styles ==============
@@ -297,17 +299,18 @@ BASE_STYLES = """
 """
 
 
-def _base_html(title: str, content: str, is_test: bool = False) -> str:
-    """Generate base HTML page with common styles."""
+def _page_shell(is_test: bool) -> Tuple[str, str, str]:
+    """Page HTML around the title and the content (constant per mode)"""
     test_badge = '<span class="badge badge-test">TEST MODE</span>' if is_test else ''
     
-    return f"""
+    before_title = """
     <!DOCTYPE html>
     <html lang="en">
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{title} - InboxMind</title>
+        <title>"""
+    before_content = f""" - InboxMind</title>
         {BASE_STYLES}
     </head>
     <body>
@@ -319,15 +322,30 @@ def _base_html(title: str, content: str, is_test: bool = False) -> str:
                     <a href="/api/v1/{'test/connect-gmail' if is_test else 'oauth/google'}">Connect Gmail</a>
                 </div>
             </nav>
-            {content}
+            """
+    after_content = """
         </div>
     </body>
     </html>
     """
+    return before_title, before_content, after_content
+
+
+# Built once: the shell (with ~9 KB of styles) is identical on every page
+_PAGE_SHELLS = {is_test: _page_shell(is_test) for is_test in (False, True)}
+
+
+def _base_html(title: str, content: str, is_test: bool = False) -> str:
+    """Generate base HTML page with common styles."""
+    before_title, before_content, after_content = _PAGE_SHELLS[is_test]
+    return before_title + title + before_content + content + after_content
 
 
 # ============== Connect Gmail Page ==============
 
+# Fully determined by its arguments (a handful of combinations), so each
+# variant is rendered once per process
+@lru_cache(maxsize=16)
 def get_connect_gmail_page(
     oauth_start_url: str = "/api/v1/oauth/google",
     is_test: bool = False,
@@ -481,16 +499,9 @@ def get_oauth_invalid_state_page(retry_url: str = "/api/v1/oauth/google", is_tes
     return _base_html("Invalid State", content, is_test)
 
 
-def get_oauth_success_page(
-    user_email: str,
-    user_id: str,
-    org_id: str,
-    synced_count: int = 0,
-    emails_url: str = "/api/v1/emails",
-    is_test: bool = False
-) -> str:
-    """Generate OAuth success page."""
-    content = f"""
+# Encoded once at import; rendering is a few bytes.replace calls on
+# __NAME__ placeholders, with no per-request str formatting or encoding
+_OAUTH_SUCCESS_CONTENT_BYTES = """
     <div class="card">
         <div class="header">
             <span class="header-icon">🎉</span>
@@ -502,12 +513,12 @@ def get_oauth_success_page(
         
         <div class="success">
             <strong>✓ Authorization Complete</strong>
-            <p>Connected as: <strong>{user_email}</strong></p>
+            <p>Connected as: <strong>__USER_EMAIL__</strong></p>
         </div>
         
         <div class="stats-grid">
             <div class="stat-card">
-                <div class="stat-value">{synced_count}</div>
+                <div class="stat-value">__SYNCED_COUNT__</div>
                 <div class="stat-label">Emails Synced</div>
             </div>
             <div class="stat-card">
@@ -518,8 +529,8 @@ def get_oauth_success_page(
         
         <div class="info">
             <strong>Your Credentials:</strong>
-            <p><strong>User ID:</strong> <code>{user_id}</code></p>
-            <p><strong>Org ID:</strong> <code>{org_id}</code></p>
+            <p><strong>User ID:</strong> <code>__USER_ID__</code></p>
+            <p><strong>Org ID:</strong> <code>__ORG_ID__</code></p>
         </div>
         
         <h3>What's Next?</h3>
@@ -530,12 +541,79 @@ def get_oauth_success_page(
         </ul>
         
         <div style="margin-top: 25px; display: flex; gap: 15px; flex-wrap: wrap;">
-            <a href="{emails_url}" class="btn">📬 View Emails</a>
-            <a href="{emails_url.replace('/emails', '/rag/query')}" class="btn btn-secondary">🔍 Search with AI</a>
+            <a href="__EMAILS_URL__" class="btn">📬 View Emails</a>
+            <a href="__RAG_URL__" class="btn btn-secondary">🔍 Search with AI</a>
         </div>
     </div>
+    """.encode("utf-8")
+
+
+_OAUTH_SUCCESS_TITLE = "Connection Successful"
+
+# Streaming pieces around the per-user content, encoded once per mode
+_OAUTH_SUCCESS_HEAD_BYTES = {
+    is_test: (before_title + _OAUTH_SUCCESS_TITLE + before_content).encode("utf-8")
+    for is_test, (before_title, before_content, _) in _PAGE_SHELLS.items()
+}
+_PAGE_TAIL_BYTES = {
+    is_test: after_content.encode("utf-8")
+    for is_test, (_, _, after_content) in _PAGE_SHELLS.items()
+}
+
+
+def _oauth_success_content(
+    user_email: str,
+    user_id: str,
+    org_id: str,
+    synced_count: int,
+    emails_url: str
+) -> bytes:
+    # Values come from Google and the database; escape before inserting.
+    # The email (the only user-chosen value) goes in last so placeholder-like
+    # text in it is never substituted.
+    return (
+        _OAUTH_SUCCESS_CONTENT_BYTES
+        .replace(b"__SYNCED_COUNT__", str(synced_count).encode("ascii"))
+        .replace(b"__USER_ID__", escape(str(user_id)).encode("utf-8"))
+        .replace(b"__ORG_ID__", escape(org_id).encode("utf-8"))
+        .replace(b"__EMAILS_URL__", escape(emails_url).encode("utf-8"))
+        .replace(b"__RAG_URL__", escape(emails_url.replace('/emails', '/rag/query')).encode("utf-8"))
+        .replace(b"__USER_EMAIL__", escape(user_email).encode("utf-8"))
+    )
+
+
+def get_oauth_success_page(
+    user_email: str,
+    user_id: str,
+    org_id: str,
+    synced_count: int = 0,
+    emails_url: str = "/api/v1/emails",
+    is_test: bool = False
+) -> str:
+    """Generate OAuth success page."""
+    content = _oauth_success_content(user_email, user_id, org_id, synced_count, emails_url)
+    return b"".join((_OAUTH_SUCCESS_HEAD_BYTES[is_test], content, _PAGE_TAIL_BYTES[is_test])).decode("utf-8")
+
+
+async def stream_oauth_success_page(
+    user_email: str,
+    user_id: str,
+    org_id: str,
+    synced_count: int = 0,
+    emails_url: str = "/api/v1/emails",
+    is_test: bool = False
+) -> AsyncIterator[bytes]:
+    """
+    OAuth success page as chunks for a StreamingResponse.
+    
+    Every chunk is bytes built from pre-encoded templates, so nothing is
+    formatted or encoded as a whole page per request. Arguments
+    are bound at call time: pass plain values, not ORM attributes that may
+    be read after the session closes.
     """
-    return _base_html("Connection Successful", content, is_test)
+    yield _OAUTH_SUCCESS_HEAD_BYTES[is_test]
+    yield _oauth_success_content(user_email, user_id, org_id, synced_count, emails_url)
+    yield _PAGE_TAIL_BYTES[is_test]
 
 
 # ============== Email List Page ==============
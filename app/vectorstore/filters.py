@@ -2,13 +2,20 @@
 Metadata Filters for Vector Search
 Constructs Pinecone filter dictionaries for tenant isolation and query refinement
 """
-from typing import Dict, Any, Optional, List
-from datetime import datetime, date
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime, date, time, timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def epoch_seconds(value: datetime) -> int:
+    """UNIX seconds for a datetime, treating naive values as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+
 class VectorStoreFilters:
     """
     Build metadata filter dictionaries for Pinecone queries.
@@ -39,7 +46,15 @@ class VectorStoreFilters:
         date_to: Optional[datetime] = None
     ) -> Optional[Dict[str, Any]]:
         """
-        Build date range filter for sent_at metadata.
+        Build date range filter on the sent_at_ts metadata field.
+        
+        Pinecone only applies $gte/$lte to numbers, so the range is expressed
+        in UNIX seconds (naive datetimes are taken as UTC) and is evaluated
+        inside the index rather than on the returned matches.
+        
+        Vectors indexed before sent_at_ts existed also pass (until the
+        vectors.backfill_sent_at_ts task has run); callers narrow those with
+        matches_date_range() on their ISO sent_at.
         
         Args:
             date_from: Start date (inclusive)
@@ -54,13 +69,17 @@ class VectorStoreFilters:
         filter_dict = {}
         
         if date_from:
-            # Convert to ISO string for Pinecone
-            filter_dict["$gte"] = date_from.isoformat()
+            filter_dict["$gte"] = epoch_seconds(date_from)
         
         if date_to:
-            filter_dict["$lte"] = date_to.isoformat()
+            filter_dict["$lte"] = epoch_seconds(date_to)
         
-        return {"sent_at": filter_dict} if filter_dict else None
+        if not filter_dict:
+            return None
+        return {"$or": [
+            {"sent_at_ts": filter_dict},
+            {"sent_at_ts": {"$exists": False}}
+        ]}
     
     @staticmethod
     def build_sender_filter(sender: str) -> Dict[str, Any]:
@@ -208,7 +227,59 @@ def create_rag_query_filter(
     Returns:
         Pinecone filter dictionary
     """
-    # Convert string dates to datetime
+    dt_from, dt_to = _parse_date_bounds(date_from, date_to)
+    
+    return VectorStoreFilters.combine_filters(
+        org_id=org_id,
+        user_id=user_id,
+        date_from=dt_from,
+        date_to=dt_to,
+        sender=sender
+    )
+
+
+def matches_date_range(
+    metadata: Dict[str, Any],
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+) -> bool:
+    """
+    Check a retrieved match against the RAG date filter.
+    
+    Matches carrying sent_at_ts were already range-filtered by Pinecone;
+    older vectors only have the ISO sent_at string, which is compared here.
+    
+    Args:
+        metadata: Match metadata
+        date_from: Start date string (YYYY-MM-DD)
+        date_to: End date string (YYYY-MM-DD)
+        
+    Returns:
+        True if the match is inside the range (or no range is given)
+    """
+    if "sent_at_ts" in metadata:
+        return True
+    
+    dt_from, dt_to = _parse_date_bounds(date_from, date_to)
+    if not dt_from and not dt_to:
+        return True
+    
+    try:
+        sent_at = epoch_seconds(datetime.fromisoformat(metadata.get("sent_at") or ""))
+    except ValueError:
+        return False
+    if dt_from and sent_at < epoch_seconds(dt_from):
+        return False
+    if dt_to and sent_at > epoch_seconds(dt_to):
+        return False
+    return True
+
+
+def _parse_date_bounds(
+    date_from: Optional[str],
+    date_to: Optional[str]
+) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Convert RAG filter date strings to datetimes; invalid values are dropped"""
     dt_from = None
     dt_to = None
     
@@ -221,17 +292,14 @@ def create_rag_query_filter(
     if date_to:
         try:
             dt_to = datetime.fromisoformat(date_to)
+            # A bare YYYY-MM-DD covers the whole day
+            if len(date_to) == 10:
+                dt_to = datetime.combine(dt_to.date(), time.max)
         except ValueError:
             logger.warning(f"Invalid date_to format: {date_to}")
     
-    return VectorStoreFilters.combine_filters(
-        org_id=org_id,
-        user_id=user_id,
-        date_from=dt_from,
-        date_to=dt_to,
-        sender=sender
-    )
+    return dt_from, dt_to
 
 
 # Export
-__all__ = ["VectorStoreFilters", "create_rag_query_filter"]
+__all__ = ["VectorStoreFilters", "create_rag_query_filter", "matches_date_range", "epoch_seconds"]
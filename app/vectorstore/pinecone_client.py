@@ -2,8 +2,9 @@
 Pinecone Client Initialization
 Safe, production-ready Pinecone setup with error handling
 """
-from typing import Optional
+from typing import Any, Optional, Tuple
 import logging
+import time
 from pinecone import Pinecone, ServerlessSpec
 from tenacity import retry, stop_after_attempt, wait_exponential
 
@@ -22,6 +23,8 @@ class PineconeClient:
     _instance: Optional["PineconeClient"] = None
     _pinecone: Optional[Pinecone] = None
     _index = None
+    # (describe_index_stats result, expires_at)
+    _stats_snapshot: Optional[Tuple[Any, float]] = None
     
     def __new__(cls):
         """Ensure singleton pattern"""
@@ -126,14 +129,32 @@ class PineconeClient:
             True if connection is working, False otherwise
         """
         try:
-            index = self.get_index()
-            stats = index.describe_index_stats()
+            stats = self.describe_stats()
             logger.debug(f"Pinecone health check passed: {stats.total_vector_count} vectors")
             return True
         except Exception as e:
             logger.error(f"Pinecone health check failed: {e}")
             return False
     
+    def describe_stats(self):
+        """
+        describe_index_stats, shared for PINECONE_STATS_CACHE_TTL_SECONDS.
+        
+        One call covers every namespace, so /health probes and per-namespace
+        lookups all reuse the same snapshot. Failures are not cached, and
+        writes through PineconeIndexOperations drop it early.
+        """
+        snapshot = self._stats_snapshot
+        if snapshot is None or snapshot[1] <= time.monotonic():
+            stats = self.get_index().describe_index_stats()
+            snapshot = (stats, time.monotonic() + settings.PINECONE_STATS_CACHE_TTL_SECONDS)
+            self._stats_snapshot = snapshot
+        return snapshot[0]
+    
+    def invalidate_stats(self) -> None:
+        """Forget the cached index stats so the next read sees recent writes"""
+        self._stats_snapshot = None
+    
     def get_index_stats(self) -> dict:
         """
         Get detailed index statistics.
@@ -142,8 +163,7 @@ class PineconeClient:
             Dictionary with index stats including vector count per namespace
         """
         try:
-            index = self.get_index()
-            stats = index.describe_index_stats()
+            stats = self.describe_stats()
             
             return {
                 "total_vector_count": stats.total_vector_count,
@@ -173,6 +193,7 @@ class PineconeClient:
             
             # Delete all vectors in namespace
             index.delete(delete_all=True, namespace=namespace)
+            self.invalidate_stats()
             
             logger.info(f"Deleted namespace: {namespace}")
             return True
@@ -7,14 +7,36 @@ import logging
 from datetime import datetime
 import uuid
 
-from app.vectorstore.pinecone_client import get_pinecone_index
+import numpy as np
+
+from app.vectorstore.pinecone_client import get_pinecone_client
 from app.core.config import get_settings
 from app.core.logging import performance_logger
+from app.core.rate_limit import get_rate_limiter, is_throttled
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
+def _rerank_exact(query_vector: List[float], matches: list, top_k: int) -> list:
+    """
+    Re-score ANN candidates by exact cosine similarity against their stored
+    vectors and keep the best top_k. Scores are written back onto the matches.
+    """
+    vectors = np.asarray([m.values for m in matches], dtype=np.float32)
+    query = np.asarray(query_vector, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+    scores = (vectors @ query) / np.maximum(norms, 1e-12)
+    
+    order = np.argsort(-scores)[:top_k]
+    ranked = []
+    for i in order:
+        match = matches[i]
+        match.score = float(scores[i])
+        ranked.append(match)
+    return ranked
+
+
 class PineconeIndexOperations:
     """
     High-level operations for Pinecone vector database.
@@ -22,7 +44,8 @@ class PineconeIndexOperations:
     """
     
     def __init__(self):
-        self.index = get_pinecone_index()
+        self.client = get_pinecone_client()
+        self.index = self.client.get_index()
     
     def upsert_vectors(
         self,
@@ -68,6 +91,7 @@ class PineconeIndexOperations:
                     namespace=namespace
                 )
             
+            self.invalidate_stats()
             duration_ms = (datetime.now() - start_time).total_seconds() * 1000
             
             logger.info(
@@ -91,7 +115,7 @@ class PineconeIndexOperations:
             logger.error(f"Failed to upsert vectors: {type(e).__name__}: {e}")
             return False
     
-    def query_vectors(
+    async def query_vectors(
         self,
         query_vector: List[float],
         namespace: str,
@@ -113,28 +137,44 @@ class PineconeIndexOperations:
             List of matching results with scores and metadata
             
         SECURITY: Namespace isolation enforced - users can only query their namespace.
+        
+        Runs in a worker thread behind the shared Pinecone rate limiter.
+        
+        With PINECONE_RERANK_CANDIDATES above top_k (cosine indexes only), the
+        index's approximate (quantized) search supplies that many candidates
+        with their stored vectors, which are re-scored exactly here before
+        the top_k cut, recovering neighbours the coarse ranking misordered.
         """
         if not namespace:
             logger.error("Cannot query without namespace - tenant isolation required")
             return []
         
+        candidates = settings.PINECONE_RERANK_CANDIDATES
+        rerank = candidates > top_k and settings.PINECONE_METRIC == "cosine"
+        
         try:
             start_time = datetime.now()
             
             # Query Pinecone
-            results = self.index.query(
+            results = await get_rate_limiter("pinecone").run(
+                self.index.query,
                 vector=query_vector,
                 namespace=namespace,
-                top_k=top_k,
+                top_k=candidates if rerank else top_k,
                 filter=filter_dict,
+                include_values=rerank,
                 include_metadata=include_metadata
             )
             
+            ranked = results.matches
+            if rerank and ranked:
+                ranked = _rerank_exact(query_vector, ranked, top_k)
+            
             duration_ms = (datetime.now() - start_time).total_seconds() * 1000
             
             # Extract matches
             matches = []
-            for match in results.matches:
+            for match in ranked:
                 match_data = {
                     "id": match.id,
                     "score": match.score,
@@ -148,7 +188,8 @@ class PineconeIndexOperations:
             
             logger.info(
                 f"Query returned {len(matches)} matches from namespace={namespace} "
-                f"(top_k={top_k}, filters={bool(filter_dict)}) in {duration_ms:.2f}ms"
+                f"(top_k={top_k}, reranked={len(results.matches) if rerank else 0}, "
+                f"filters={bool(filter_dict)}) in {duration_ms:.2f}ms"
             )
             
             # Log performance
@@ -205,6 +246,45 @@ class PineconeIndexOperations:
             logger.error(f"Failed to fetch vectors: {e}")
             return {}
     
+    def update_metadata(
+        self,
+        vector_id: str,
+        namespace: str,
+        metadata: Dict[str, Any]
+    ) -> bool:
+        """
+        Set metadata fields on an existing vector, leaving its values and
+        other fields untouched.
+        
+        Args:
+            vector_id: Vector ID to update
+            namespace: Tenant namespace
+            metadata: Fields to set
+            
+        Returns:
+            True if successful, False otherwise
+            
+        Raises:
+            Throttling errors (429/503), so a caller's AdaptiveLimiter can
+            back off and retry
+        """
+        if not namespace:
+            return False
+        
+        try:
+            self.index.update(
+                id=vector_id,
+                set_metadata=metadata,
+                namespace=namespace
+            )
+            return True
+            
+        except Exception as e:
+            if is_throttled(e):
+                raise
+            logger.error(f"Failed to update vector metadata: {e}")
+            return False
+    
     def delete_vectors(
         self,
         vector_ids: List[str],
@@ -229,6 +309,7 @@ class PineconeIndexOperations:
                 namespace=namespace
             )
             
+            self.invalidate_stats()
             logger.info(f"Deleted {len(vector_ids)} vectors from namespace={namespace}")
             return True
             
@@ -261,6 +342,7 @@ class PineconeIndexOperations:
                 namespace=namespace
             )
             
+            self.invalidate_stats()
             logger.info(f"Deleted vectors matching filter={filter_dict} from namespace={namespace}")
             return True
             
@@ -272,6 +354,9 @@ class PineconeIndexOperations:
         """
         Get statistics for a specific namespace.
         
+        Served from the client's shared describe_index_stats snapshot
+        (see PineconeClient.describe_stats).
+        
         Args:
             namespace: Tenant namespace
             
@@ -279,24 +364,20 @@ class PineconeIndexOperations:
             Dictionary with namespace statistics
         """
         try:
-            stats = self.index.describe_index_stats()
-            
-            namespace_stats = stats.namespaces.get(namespace, None)
-            
-            if namespace_stats:
-                return {
-                    "vector_count": namespace_stats.vector_count,
-                    "namespace": namespace
-                }
-            else:
-                return {
-                    "vector_count": 0,
-                    "namespace": namespace
-                }
-                
+            stats = self.client.describe_stats()
         except Exception as e:
             logger.error(f"Failed to get namespace stats: {e}")
             return {"vector_count": 0, "namespace": namespace}
+        
+        ns = (stats.namespaces or {}).get(namespace)
+        return {
+            "vector_count": ns.vector_count if ns is not None else 0,
+            "namespace": namespace
+        }
+    
+    def invalidate_stats(self) -> None:
+        """Forget the cached index stats so the next read sees recent writes"""
+        self.client.invalidate_stats()
 
 
 # Singleton instance
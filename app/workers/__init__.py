@@ -0,0 +1,4 @@
+"""
+Background Workers
+Celery application and tasks for jobs that outlive a request
+"""
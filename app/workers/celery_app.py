@@ -0,0 +1,36 @@
+"""
+Celery Application
+Durable job queue backed by Redis
+
+Run a worker with:
+    celery -A app.workers.celery_app worker --loglevel=info
+"""
+from celery import Celery
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+celery_app = Celery(
+    "inboxmind",
+    broker=settings.REDIS_URL,
+    backend=settings.REDIS_URL,
+    include=["app.workers.tasks"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # Acknowledge only after the job finishes so a crashed worker's job is redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Jobs run for minutes; don't let one worker hoard the queue
+    worker_prefetch_multiplier=1,
+    task_track_started=True,
+    result_expires=settings.SYNC_JOB_RESULT_TTL_SECONDS,
+)
+
+
+__all__ = ["celery_app"]
@@ -0,0 +1,126 @@
+"""
+Background Tasks
+Long-running jobs enqueued by the API and executed by Celery workers
+"""
+import asyncio
+import logging
+from typing import Any, Dict
+
+from sqlalchemy import select
+
+from app.core.http import close_http_session
+from app.core.config import get_settings
+from app.core.rate_limit import AdaptiveLimiter
+from app.db.redis import close_redis
+from app.db.session import AsyncSessionLocal, engine
+from app.models.email import Email
+from app.models.user import User
+from app.models.vector_record import VectorRecord
+from app.services.email_sync_service import get_email_sync_service
+from app.services.sync_lock import get_sync_lock
+from app.services.user_cache import get_user_cache
+from app.vectorstore.filters import epoch_seconds
+from app.vectorstore.pinecone_index import get_pinecone_operations
+from app.workers.celery_app import celery_app
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="emails.sync", bind=True)
+def sync_emails_task(self, user_id: str, max_emails: int, since_days: int) -> Dict[str, Any]:
+    """Sync a user's Gmail inbox; the return value is the job result"""
+    return asyncio.run(_sync_emails(self.request.id, user_id, max_emails, since_days))
+
+
+async def _sync_emails(job_id: str, user_id: str, max_emails: int, since_days: int) -> Dict[str, Any]:
+    try:
+        async with AsyncSessionLocal() as db:
+            user = await db.get(User, user_id)
+            if user is None:
+                logger.warning(f"Sync job skipped, user {user_id} no longer exists")
+                return {"synced": 0, "skipped": 0, "errors": [], "message": "User not found"}
+            
+            synced, skipped, errors = await get_email_sync_service().sync_emails_for_user(
+                db=db,
+                user=user,
+                max_emails=max_emails,
+                since_days=since_days
+            )
+        
+        return {
+            "synced": synced,
+            "skipped": skipped,
+            "errors": errors[:10],  # Limit error messages
+            "message": f"Synced {synced} new emails, skipped {skipped} existing"
+        }
+    finally:
+        # Taken by POST /emails/sync when it queued this job
+        await get_sync_lock().release(user_id, job_id)
+        # Each task runs in a fresh event loop: finish cache invalidations and
+        # drop pooled connections bound to this loop before it closes
+        await get_user_cache().drain()
+        await close_http_session()
+        await close_redis()
+        await engine.dispose()
+
+
+@celery_app.task(name="vectors.backfill_sent_at_ts")
+def backfill_sent_at_ts_task() -> Dict[str, Any]:
+    """
+    Add sent_at_ts to vectors indexed before it existed, so RAG date
+    filters are evaluated inside Pinecone for them too.
+    
+    Safe to re-run. Enqueue once after deploying with:
+        celery -A app.workers.celery_app call vectors.backfill_sent_at_ts
+    """
+    return asyncio.run(_backfill_sent_at_ts())
+
+
+async def _backfill_sent_at_ts() -> Dict[str, Any]:
+    ops = get_pinecone_operations()
+    # Its own limiter: the shared one's Condition is bound to the first event loop
+    limiter = AdaptiveLimiter(
+        "pinecone-backfill",
+        ceiling=settings.PROVIDER_MAX_CONCURRENCY,
+        max_attempts=settings.PROVIDER_MAX_ATTEMPTS
+    )
+    query = (
+        select(VectorRecord.vector_id, VectorRecord.namespace, Email.sent_at)
+        .join(Email, Email.id == VectorRecord.email_id)
+    )
+    updated = failed = 0
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query, execution_options={"yield_per": 500})
+            # Each partition's updates run concurrently, up to the limiter's
+            # current limit; it shrinks that limit and retries on 429/503
+            async for partition in result.partitions():
+                outcomes = await asyncio.gather(
+                    *(
+                        limiter.run(
+                            ops.update_metadata,
+                            vector_id,
+                            namespace,
+                            {"sent_at_ts": epoch_seconds(sent_at)}
+                        )
+                        for vector_id, namespace, sent_at in partition
+                    ),
+                    return_exceptions=True
+                )
+                for outcome in outcomes:
+                    if outcome is True:
+                        updated += 1
+                    else:
+                        if isinstance(outcome, BaseException):
+                            logger.error(f"sent_at_ts backfill update failed: {outcome}")
+                        failed += 1
+        
+        logger.info(f"sent_at_ts backfill finished: updated={updated}, failed={failed}")
+        return {"updated": updated, "failed": failed}
+    finally:
+        await close_redis()
+        await engine.dispose()
+
+
+__all__ = ["sync_emails_task", "backfill_sent_at_ts_task"]